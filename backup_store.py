@@ -0,0 +1,229 @@
+import hashlib
+import json
+import mmap
+import os
+import re
+import tempfile
+import zlib
+from datetime import datetime
+from typing import Dict, List, Any, Iterator
+
+
+class BackupStore:
+    """Content-addressed store of incremental backups
+
+    Files are cut into content-defined chunks, and each unique chunk is
+    stored once under objects/<xx>/<sha256>. A backup is a small manifest in
+    manifests/<backup_id>.json listing the chunks of every file, so a backup
+    of unchanged data adds only a manifest.
+    """
+
+    # Chunks end after a "}" closing an object (compact or pretty JSON, or a
+    # journal line). An object ends a chunk when its CRC has the low bits
+    # clear, so boundaries depend on content rather than on offsets, and an
+    # edit only changes the chunks around it.
+    BOUNDARY = re.compile(rb"\}[,\n]")
+    BOUNDARY_MASK = 0x3FF
+    MIN_CHUNK = 64 * 1024
+    MAX_CHUNK = 1024 * 1024
+
+    def __init__(self, backup_dir: str):
+        self.backup_dir = backup_dir
+        self.objects_dir = os.path.join(backup_dir, "objects")
+        self.manifests_dir = os.path.join(backup_dir, "manifests")
+
+    # ------------------------------
+    # Backups
+    # ------------------------------
+
+    def create(self, files: Dict[str, str]) -> Dict[str, Any]:
+        """Back up files ({name in backup: path on disk}) and write a manifest
+
+        A file whose size and modification time match the latest backup
+        reuses that backup's chunk list without being read.
+        """
+        os.makedirs(self.manifests_dir, exist_ok=True)
+        latest = self.list()
+        previous = self.load_manifest(latest[-1]["id"])["files"] if latest else {}
+
+        entries = {}
+        new_chunks = 0
+        new_bytes = 0
+        for name, path in sorted(files.items()):
+            stat = os.stat(path)
+            old = previous.get(name)
+            if old is not None and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                entries[name] = old
+                continue
+            chunks = []
+            for chunk in self._read_chunks(path):
+                digest = hashlib.sha256(chunk).hexdigest()
+                written = self._put_object(digest, chunk)
+                new_chunks += written
+                new_bytes += len(chunk) if written else 0
+                chunks.append(digest)
+            entries[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "chunks": chunks}
+
+        created = datetime.now()
+        backup_id = created.strftime("%Y%m%d_%H%M%S")
+        suffix = 1
+        while os.path.exists(self._manifest_path(backup_id)):
+            suffix += 1
+            backup_id = f"{created.strftime('%Y%m%d_%H%M%S')}_{suffix}"
+        manifest = {
+            "id": backup_id,
+            "created": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "size": sum(entry["size"] for entry in entries.values()),
+            "new_chunks": new_chunks,
+            "new_bytes": new_bytes,
+            "files": entries
+        }
+        self._write_file(self._manifest_path(backup_id), json.dumps(manifest, indent=2).encode())
+        return manifest
+
+    def list(self) -> List[Dict[str, Any]]:
+        """Summaries of all backups, oldest first"""
+        if not os.path.isdir(self.manifests_dir):
+            return []
+        backups = []
+        for name in sorted(os.listdir(self.manifests_dir)):
+            if not name.endswith(".json"):
+                continue
+            manifest = self.load_manifest(name[:-len(".json")])
+            backups.append({
+                "id": manifest["id"],
+                "created": manifest["created"],
+                "files": len(manifest["files"]),
+                "size": manifest["size"],
+                "new_bytes": manifest["new_bytes"]
+            })
+        return backups
+
+    def load_manifest(self, backup_id: str) -> Dict[str, Any]:
+        """Read the manifest of a backup
+
+        Raises:
+            ValueError: If there is no backup with that ID
+        """
+        path = self._manifest_path(backup_id)
+        if not os.path.exists(path):
+            raise ValueError(f"No backup named {backup_id}")
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+
+    def restore_file(self, entry: Dict[str, Any], target: str) -> None:
+        """Reassemble a file from its chunks and atomically replace target with it
+
+        Raises:
+            ValueError: If a chunk is corrupted or the file does not come out
+                at the size it was backed up with
+        """
+        directory = os.path.dirname(target) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(target) + ".", suffix=".tmp")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as f:
+                for digest in entry["chunks"]:
+                    chunk = self._get_object(digest)
+                    f.write(chunk)
+                    size += len(chunk)
+                f.flush()
+                os.fsync(f.fileno())
+            if size != entry["size"]:
+                raise ValueError(f"Restored {os.path.basename(target)} has {size} bytes, expected {entry['size']}")
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def prune(self, keep: int) -> Dict[str, int]:
+        """Delete all but the newest keep backups, then every chunk no backup uses
+
+        Returns:
+            Number of backups and chunks removed
+        """
+        backups = self.list()
+        removed = backups[:-keep] if keep > 0 else []
+        for backup in removed:
+            os.remove(self._manifest_path(backup["id"]))
+
+        used = set()
+        for backup in self.list():
+            for entry in self.load_manifest(backup["id"])["files"].values():
+                used.update(entry["chunks"])
+        chunks = 0
+        if os.path.isdir(self.objects_dir):
+            for prefix in os.listdir(self.objects_dir):
+                prefix_dir = os.path.join(self.objects_dir, prefix)
+                for digest in os.listdir(prefix_dir):
+                    if digest not in used:
+                        os.remove(os.path.join(prefix_dir, digest))
+                        chunks += 1
+        return {"backups": len(removed), "chunks": chunks}
+
+    # ------------------------------
+    # Chunks and objects
+    # ------------------------------
+
+    def _read_chunks(self, path: str) -> Iterator[bytes]:
+        """Split a file into content-defined chunks, reading it through mmap"""
+        if os.path.getsize(path) == 0:
+            return
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            start = 0
+            previous = 0
+            for match in self.BOUNDARY.finditer(buf):
+                end = match.end()
+                crc = zlib.crc32(buf[previous:end])
+                previous = end
+                if end - start >= self.MAX_CHUNK or \
+                        (end - start >= self.MIN_CHUNK and crc & self.BOUNDARY_MASK == 0):
+                    yield from self._split(buf[start:end])
+                    start = end
+            if start < len(buf):
+                yield from self._split(buf[start:])
+
+    def _split(self, data: bytes) -> Iterator[bytes]:
+        """Cut stretches without boundaries (compressed files, databases) into MAX_CHUNK pieces"""
+        for offset in range(0, len(data), self.MAX_CHUNK):
+            yield data[offset:offset + self.MAX_CHUNK]
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _manifest_path(self, backup_id: str) -> str:
+        return os.path.join(self.manifests_dir, backup_id + ".json")
+
+    def _put_object(self, digest: str, chunk: bytes) -> bool:
+        """Store a chunk unless it is already present; returns whether it was written"""
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            return False
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._write_file(path, zlib.compress(chunk, 1))
+        return True
+
+    def _get_object(self, digest: str) -> bytes:
+        """Read a chunk back and check it against its digest"""
+        with open(self._object_path(digest), "rb") as f:
+            chunk = zlib.decompress(f.read())
+        if hashlib.sha256(chunk).hexdigest() != digest:
+            raise ValueError(f"Backup chunk {digest} is corrupted")
+        return chunk
+
+    @staticmethod
+    def _write_file(path: str, payload: bytes) -> None:
+        """Write payload to path via a fsynced temporary file"""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,70 @@
+"""Compare data file encodings: load/save time and bytes on disk
+
+Usage:
+    python benchmarks/bench_codec.py [--rows 200000] [--users 100] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_dataset
+from jsonhandler import JsonCodec, orjson, zstandard
+
+SETTINGS = [
+    ("pretty", "json", "none"),
+    ("compact", "json", "none"),
+    ("pretty", "orjson", "none"),
+    ("compact", "orjson", "none"),
+    ("compact", "orjson", "gzip"),
+    ("compact", "orjson", "zstd"),
+]
+
+
+def best_of(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"Generating {args.rows} transactions for {args.users} users...")
+    data = make_dataset(args.rows, args.users)
+    path = os.path.join(tempfile.mkdtemp(prefix="pfm_codec_"), "transactions.json")
+
+    print(f"\n   {'format':<8} {'parser':<7} {'compression':<12} {'save ms':>10} {'load ms':>10} {'MB':>8}")
+    for format, parser_name, compression in SETTINGS:
+        if parser_name == "orjson" and orjson is None or compression == "zstd" and zstandard is None:
+            print(f"   {format:<8} {parser_name:<7} {compression:<12} {'(not installed)':>30}")
+            continue
+        codec = JsonCodec(format, parser_name, compression)
+
+        def save():
+            with open(path, "wb") as f:
+                f.write(codec.encode(data))
+
+        def load():
+            with open(path, "rb") as f:
+                codec.decode(f.read(), {})
+
+        save_time = best_of(save, args.repeat)
+        load_time = best_of(load, args.repeat)
+        size = os.path.getsize(path)
+        print(f"   {format:<8} {parser_name:<7} {compression:<12} {save_time * 1000:>10.1f} "
+              f"{load_time * 1000:>10.1f} {size / 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
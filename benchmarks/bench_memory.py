@@ -0,0 +1,59 @@
+"""Measure memory held per transaction as plain dicts and as TransactionRecords
+
+Also reports the time to build each from JSON and to encode it back to
+compact JSON, as a journal compaction does.
+
+Usage:
+    python benchmarks/bench_memory.py [--rows 200000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_storage import make_dataset
+from records import TransactionRecord
+from jsonhandler import JsonCodec
+
+
+def measure(label: str, build, rows: int) -> None:
+    start = time.perf_counter()
+    data = build()
+    load_time = time.perf_counter() - start
+    start = time.perf_counter()
+    JsonCodec("compact").encode(data)
+    save_time = time.perf_counter() - start
+    del data
+    gc.collect()
+    tracemalloc.start()
+    data = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"   {label:<20} {current / rows:>8.1f} bytes/transaction"
+          f"   load {load_time * 1000:>9.2f} ms   save {save_time * 1000:>9.2f} ms")
+    del data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--users", type=int, default=1)
+    args = parser.parse_args()
+
+    # Parse from JSON so strings are not shared the way the generator shares them
+    raw = json.dumps(make_dataset(args.rows, args.users)).encode()
+    print(f"\n{args.rows:,} transactions, {len(raw) / 1e6:.1f} MB of JSON")
+    measure("dicts", lambda: json.loads(raw), args.rows)
+    measure("TransactionRecord", lambda: {user_id: TransactionRecord.from_dicts(transactions)
+                                          for user_id, transactions in json.loads(raw).items()}, args.rows)
+
+
+if __name__ == "__main__":
+    main()
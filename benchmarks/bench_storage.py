@@ -0,0 +1,103 @@
+"""Compare the JSON and SQLite storage backends
+
+Usage:
+    python benchmarks/bench_storage.py [--rows 1000000] [--users 100]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CATEGORIES = {
+    "expense": ["Food", "Transport", "Bills", "Shopping", "Entertainment", "Other"],
+    "income": ["Salary", "Freelance", "Investment", "Gift", "Other"]
+}
+PAYMENT_METHODS = ["Cash", "Credit Card", "Debit Card", "Bank Transfer"]
+
+
+def make_transaction(user_id: str, rng: random.Random) -> dict:
+    t_type = "expense" if rng.random() < 0.8 else "income"
+    return {
+        "transaction_id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "user_id": user_id,
+        "type": t_type,
+        "amount_cents": rng.randint(100, 500000),
+        "category": rng.choice(CATEGORIES[t_type]),
+        "date": f"20{rng.randint(15, 25):02d}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "description": f"benchmark row {rng.randint(0, 10 ** 6)}",
+        "payment_method": rng.choice(PAYMENT_METHODS)
+    }
+
+
+def make_dataset(rows: int, users: int, seed: int = 42) -> dict:
+    rng = random.Random(seed)
+    user_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(users)]
+    data = {user_id: [] for user_id in user_ids}
+    for i in range(rows):
+        user_id = user_ids[i % users]
+        data[user_id].append(make_transaction(user_id, rng))
+    return data
+
+
+def timed(label: str, func, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"   {label:<28} {elapsed * 1000:>12.2f} ms")
+    return elapsed
+
+
+def run(handler, data: dict, label: str) -> None:
+    rng = random.Random(7)
+    user_id = next(iter(data))
+    sample = data[user_id][len(data[user_id]) // 2]
+
+    print(f"\n{label}")
+    timed("save all", lambda: handler.save_transactions(data))
+    timed("load all", handler.load_transactions)
+    timed("load one user", lambda: handler.load_user_transactions(user_id))
+    timed("append one (avg of 20)", lambda: handler.append_transaction(make_transaction(user_id, rng)), 20)
+    timed("update one", lambda: handler.update_transaction(user_id, sample["transaction_id"], {"amount_cents": 100}))
+    timed("remove one", lambda: handler.remove_transaction(user_id, sample["transaction_id"]))
+    handler.compact_transactions()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=100)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="pfm_bench_")
+    os.environ["PFM_DATA_DIR"] = work_dir
+    os.environ["PFM_STORAGE_BACKEND"] = "json"
+
+    from jsonhandler import JsonHandler
+    from sqlite_store import SqliteStore
+
+    print(f"Generating {args.rows} transactions for {args.users} users in {work_dir}...")
+    data = make_dataset(args.rows, args.users)
+
+    handler = JsonHandler()
+    run(handler, data, "JSON backend")
+    json_bytes = sum(os.path.getsize(os.path.join(work_dir, name)) for name in os.listdir(work_dir)
+                     if name.startswith("transactions"))
+
+    store = SqliteStore(os.path.join(work_dir, "finance.db"))
+    handler.set_backend(store)
+    run(handler, data, "SQLite backend")
+    store.close()
+    handler.set_backend(None)
+    sqlite_bytes = os.path.getsize(store.db_file)
+
+    print(f"\nOn disk: JSON {json_bytes / 1e6:.1f} MB, SQLite {sqlite_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
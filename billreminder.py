@@ -42,10 +42,7 @@ class BillReminderManager:
                 return None
             
             # Save to storage
-            bills_data = self._json_handler.load_bills()
-            
-            if user_id not in bills_data:
-                bills_data[user_id] = []
+            user_bills = self._json_handler.load_user_bills(user_id)
             
             bill_data = {
                 "bill_id": self._utilities.generate_uuid(),
@@ -64,9 +61,9 @@ class BillReminderManager:
                 "created_at": bill.created_at.strftime('%Y-%m-%d %H:%M:%S')
             }
             
-            bills_data[user_id].append(bill_data)
+            user_bills.append(bill_data)
             
-            if self._json_handler.save_bills(bills_data):
+            if self._json_handler.save_user_bills(user_id, user_bills):
                 return bill_data
             else:
                 print("Failed to save bill reminder")
@@ -83,18 +80,15 @@ class BillReminderManager:
     def mark_bill_as_paid(self, user_id: str, bill_id: str) -> bool:
         """Mark a bill as paid"""
         try:
-            bills_data = self._json_handler.load_bills()
-            
-            if user_id not in bills_data:
-                return False
+            user_bills = self._json_handler.load_user_bills(user_id)
             
-            for bill in bills_data[user_id]:
+            for bill in user_bills:
                 if bill['bill_id'] == bill_id:
                     bill['status'] = 'Paid'
                     bill['paid_date'] = datetime.now().strftime('%Y-%m-%d')
                     bill['notification_sent'] = True
                     
-                    return self._json_handler.save_bills(bills_data)
+                    return self._json_handler.save_user_bills(user_id, user_bills)
             
             return False
             
@@ -105,15 +99,12 @@ class BillReminderManager:
     def delete_bill(self, user_id: str, bill_id: str) -> bool:
         """Delete a bill reminder"""
         try:
-            bills_data = self._json_handler.load_bills()
+            user_bills = self._json_handler.load_user_bills(user_id)
             
-            if user_id not in bills_data:
-                return False
-            
-            for i, bill in enumerate(bills_data[user_id]):
+            for i, bill in enumerate(user_bills):
                 if bill['bill_id'] == bill_id:
-                    del bills_data[user_id][i]
-                    return self._json_handler.save_bills(bills_data)
+                    del user_bills[i]
+                    return self._json_handler.save_user_bills(user_id, user_bills)
             
             return False
             
@@ -217,7 +208,7 @@ class BillReminder:
                 if days_left > 0:
                     print(f"\n🔔 BILL REMINDER")
                     print(f"Bill: {self.description}")
-                    print(f"Amount: {utilities.format_currency(self.amount, self.user.currency)}")
+                    print(f"Amount: {utilities.format_currency(utilities.to_cents(self.amount), self.user.currency)}")
                     print(f"Due Date: {self.expected_date}")
                     print(f"Days Left: {days_left}")
                     print("-" * 40)
@@ -227,7 +218,7 @@ class BillReminder:
                 elif days_left == 0:
                     print(f"\n⚠️  BILL DUE TODAY")
                     print(f"Bill: {self.description}")
-                    print(f"Amount: {utilities.format_currency(self.amount, self.user.currency)}")
+                    print(f"Amount: {utilities.format_currency(utilities.to_cents(self.amount), self.user.currency)}")
                     print(f"Due Date: {self.expected_date}")
                     print("-" * 40)
                     
@@ -236,7 +227,7 @@ class BillReminder:
                 else:
                     print(f"\n🚨 OVERDUE BILL")
                     print(f"Bill: {self.description}")
-                    print(f"Amount: {utilities.format_currency(self.amount, self.user.currency)}")
+                    print(f"Amount: {utilities.format_currency(utilities.to_cents(self.amount), self.user.currency)}")
                     print(f"Due Date: {self.expected_date}")
                     print(f"Days Overdue: {abs(days_left)}")
                     print("-" * 40)
@@ -492,7 +483,7 @@ class BillReminder:
             print("           BILL REMINDER DETAILS")
             print("="*50)
             print(f"Description: {self.description}")
-            print(f"Amount: {utilities.format_currency(self.amount, self.user.currency)}")
+            print(f"Amount: {utilities.format_currency(utilities.to_cents(self.amount), self.user.currency)}")
             print(f"Type: {self.bill_type.title()}")
             print(f"Category: {self.category.title()}")
             print(f"Expected Date: {self.expected_date}")
@@ -671,12 +662,7 @@ class BillReminder:
             from jsonhandler import JsonHandler
             
             json_handler = JsonHandler()
-            bills_data = json_handler.load_bills()
-            
-            if user_id not in bills_data:
-                return []
-            
-            return bills_data[user_id]
+            return json_handler.load_user_bills(user_id)
             
         except Exception as e:
             print(f"Error getting bills for user: {e}")
@@ -821,7 +807,7 @@ def bill_reminder_menu(current_user: Dict[str, Any]) -> None:
                 for idx, bill in enumerate(bills, 1):
                     status_icon = "✅" if bill['status'] == 'Paid' else "⏰"
                     print(f"\n[{idx}] {status_icon} {bill['description']}")
-                    print(f"    Amount: {utilities.format_currency(bill['amount'], current_user.get('currency', 'USD'))}")
+                    print(f"    Amount: {utilities.format_currency(utilities.to_cents(bill['amount']), current_user.get('currency', 'USD'))}")
                     print(f"    Type: {bill['bill_type'].title()} | Category: {bill['category'].title()}")
                     print(f"    Due Date: {bill['expected_date']} | Status: {bill['status']}")
                     if bill['recurring']:
@@ -838,7 +824,7 @@ def bill_reminder_menu(current_user: Dict[str, Any]) -> None:
                 print(f"\n--- Overdue Bills ({len(overdue_bills)}) ---")
                 for idx, bill in enumerate(overdue_bills, 1):
                     print(f"\n[{idx}] 🚨 {bill['description']}")
-                    print(f"    Amount: {utilities.format_currency(bill['amount'], current_user.get('currency', 'USD'))}")
+                    print(f"    Amount: {utilities.format_currency(utilities.to_cents(bill['amount']), current_user.get('currency', 'USD'))}")
                     print(f"    Due Date: {bill['expected_date']}")
                     print(f"    Type: {bill['bill_type'].title()}")
                     print("-" * 50)
@@ -854,7 +840,7 @@ def bill_reminder_menu(current_user: Dict[str, Any]) -> None:
                 for idx, bill in enumerate(upcoming_bills, 1):
                     days_left = BillReminder.calculate_days_left(bill['expected_date'])
                     print(f"\n[{idx}] ⏰ {bill['description']}")
-                    print(f"    Amount: {utilities.format_currency(bill['amount'], current_user.get('currency', 'USD'))}")
+                    print(f"    Amount: {utilities.format_currency(utilities.to_cents(bill['amount']), current_user.get('currency', 'USD'))}")
                     print(f"    Due Date: {bill['expected_date']} (in {days_left} days)")
                     print(f"    Type: {bill['bill_type'].title()}")
                     print("-" * 50)
@@ -873,7 +859,7 @@ def bill_reminder_menu(current_user: Dict[str, Any]) -> None:
             print("\n--- Your Bills ---")
             for idx, bill in enumerate(bills, 1):
                 if bill['status'] != 'Paid':
-                    print(f"[{idx}] {bill['description']} - {utilities.format_currency(bill['amount'], current_user.get('currency', 'USD'))}")
+                    print(f"[{idx}] {bill['description']} - {utilities.format_currency(utilities.to_cents(bill['amount']), current_user.get('currency', 'USD'))}")
             
             try:
                 choice_idx = int(input("\nEnter bill number to mark as paid (0 to cancel): "))
@@ -902,7 +888,7 @@ def bill_reminder_menu(current_user: Dict[str, Any]) -> None:
             print("\n--- Your Bills ---")
             for idx, bill in enumerate(bills, 1):
                 status_icon = "✅" if bill['status'] == 'Paid' else "⏰"
-                print(f"[{idx}] {status_icon} {bill['description']} - {utilities.format_currency(bill['amount'], current_user.get('currency', 'USD'))}")
+                print(f"[{idx}] {status_icon} {bill['description']} - {utilities.format_currency(utilities.to_cents(bill['amount']), current_user.get('currency', 'USD'))}")
             
             try:
                 choice_idx = int(input("\nEnter bill number to delete (0 to cancel): "))
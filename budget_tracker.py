@@ -29,27 +29,24 @@ class BudgetTracker:
                 raise ValueError(f"Invalid category. Must be one of: {', '.join(self._transaction_manager.CATEGORIES['expense'])}")
             
             budgets = self._load_budgets()
-            if self.user_id not in budgets:
-                budgets[self.user_id] = {}
+            if month not in budgets:
+                budgets[month] = {}
             
-            if month not in budgets[self.user_id]:
-                budgets[self.user_id][month] = {}
+            budgets[month][normalized_category] = float(amount)
             
-            budgets[self.user_id][month][normalized_category] = float(amount)
-            
-            return self._json_handler.save_budgets(budgets)
+            return self._json_handler.save_user_budgets(self.user_id, budgets)
         except Exception as e:
             print(f"Error setting budget: {e}")
             return False
     
     def get_budget_status(self, month: str = None) -> Dict[str, Any]:
-        """Get current budget status for the month"""
+        """Get current budget status for the month (amounts in integer cents)"""
         try:
             if not month:
                 month = datetime.now().strftime('%Y-%m')
             
             budgets = self._load_budgets()
-            user_budgets = budgets.get(self.user_id, {}).get(month, {})
+            user_budgets = budgets.get(month, {})
             
             if not user_budgets:
                 return {"message": "No budgets set for this month"}
@@ -57,7 +54,7 @@ class BudgetTracker:
             # First get all transactions to check existing spending
             transactions = self._transaction_manager.view_transactions(self.user_id)
             
-            # Calculate total spent per category for the current month
+            # Calculate total spent (in cents) per category for the current month
             category_totals = {}
             for t in transactions:
                 if t['type'].lower() == 'expense':
@@ -65,7 +62,7 @@ class BudgetTracker:
                         trans_date = datetime.strptime(t['date'], '%Y-%m-%d')
                         if trans_date.strftime('%Y-%m') == month:
                             category = t['category'].strip().title()
-                            amount = float(t['amount'])
+                            amount = t['amount_cents']
                             if category in category_totals:
                                 category_totals[category] += amount
                             else:
@@ -73,12 +70,14 @@ class BudgetTracker:
                     except ValueError:
                         continue
             
-            # Process each budget category and match with existing spending
+            # Process each budget category and match with existing spending;
+            # budgets are stored in currency units, the status is in cents
             status = {}
             for category, budget_amount in user_budgets.items():
                 budget_category = category.strip().title()
+                budget_amount = self._utilities.to_cents(budget_amount)
                 # Get amount already spent in this category
-                spent = category_totals.get(budget_category, 0.0)
+                spent = category_totals.get(budget_category, 0)
                 
                 # Calculate remaining and percentage
                 remaining = budget_amount - spent
@@ -106,22 +105,22 @@ class BudgetTracker:
                 month = datetime.now().strftime('%Y-%m')
             
             budgets = self._load_budgets()
-            if self.user_id in budgets and month in budgets[self.user_id]:
+            if month in budgets:
                 # Get the actual category key that matches our input (case-insensitive)
-                budget_categories = budgets[self.user_id][month]
+                budget_categories = budgets[month]
                 for budget_category in list(budget_categories.keys()):
                     if budget_category.lower() == category.lower():
-                        del budgets[self.user_id][month][budget_category]
-                        return self._json_handler.save_budgets(budgets)
+                        del budgets[month][budget_category]
+                        return self._json_handler.save_user_budgets(self.user_id, budgets)
             return False
         except Exception as e:
             print(f"Error deleting budget: {e}")
             return False
 
     def _load_budgets(self) -> Dict[str, Any]:
-        """Load budgets from storage"""
+        """Load this user's budgets from storage as {month: {category: amount}}"""
         try:
-            return self._json_handler.load_budgets()
+            return self._json_handler.load_user_budgets(self.user_id)
         except Exception as e:
             print(f"Error loading budgets: {e}")
             return {}
@@ -145,7 +144,8 @@ def budget_tracker_menu(current_user):
             return
         
         # Calculate total salary (income)
-        total_salary = sum(float(t['amount']) for t in transactions if t['type'] == 'income')
+        # Totals are summed in integer cents
+        total_salary = sum(t['amount_cents'] for t in transactions if t['type'] == 'income')
         
         if total_salary == 0:
             print("\n❌ No salary/income found. Add income transactions first!")
@@ -153,7 +153,7 @@ def budget_tracker_menu(current_user):
             return
         
         print(f"\n📊 SALARY OVERVIEW:")
-        print(f"   Total Salary: ${total_salary:.2f}")
+        print(f"   Total Salary: ${utilities.format_amount(total_salary)}")
         print(f"   Total Transactions: {len(transactions)}")
         
         print(f"\n💸 TRANSACTION BREAKDOWN:")
@@ -162,21 +162,21 @@ def budget_tracker_menu(current_user):
         
         # Show each transaction with percentage of salary
         for transaction in sorted(transactions, key=lambda x: x['date'], reverse=True):
-            amount = float(transaction['amount'])
+            amount = transaction['amount_cents']
             percentage = (amount / total_salary * 100) if total_salary > 0 else 0
             trans_type = "💰" if transaction['type'] == 'income' else "💸"
             
-            print(f"{transaction['date']:<12} {trans_type:<8} {transaction['category']:<15} ${amount:<11.2f} {percentage:<11.1f}%")
+            print(f"{transaction['date']:<12} {trans_type:<8} {transaction['category']:<15} ${utilities.format_amount(amount):<11} {percentage:<11.1f}%")
         
         # Show spending summary
-        total_expenses = sum(float(t['amount']) for t in transactions if t['type'] == 'expense')
-        total_income = sum(float(t['amount']) for t in transactions if t['type'] == 'income')
+        total_expenses = sum(t['amount_cents'] for t in transactions if t['type'] == 'expense')
+        total_income = sum(t['amount_cents'] for t in transactions if t['type'] == 'income')
         net_worth = total_income - total_expenses
         
         print(f"\n📈 FINANCIAL SUMMARY:")
-        print(f"   Total Income: ${total_income:.2f}")
-        print(f"   Total Expenses: ${total_expenses:.2f}")
-        print(f"   Net Worth: ${net_worth:.2f}")
+        print(f"   Total Income: ${utilities.format_amount(total_income)}")
+        print(f"   Total Expenses: ${utilities.format_amount(total_expenses)}")
+        print(f"   Net Worth: ${utilities.format_amount(net_worth)}")
         print(f"   Expense % of Income: {(total_expenses/total_income*100):.1f}%")
         
         print(f"\nOptions:")
@@ -210,7 +210,7 @@ def budget_tracker_menu(current_user):
                 print("-" * 70)
                 for category, data in status.items():
                     if not category.strip().isdigit():
-                        print(f"{category:<15} ${data['budget']:<11.2f} ${data['spent']:<11.2f} ${data['remaining']:<11.2f} {data['percentage']:<9.1f}%")
+                        print(f"{category:<15} ${utilities.format_amount(data['budget']):<11} ${utilities.format_amount(data['spent']):<11} ${utilities.format_amount(data['remaining']):<11} {data['percentage']:<9.1f}%")
             utilities.pause()
             
         elif choice == "3":
@@ -235,7 +235,7 @@ def budget_tracker_menu(current_user):
                 sorted_categories = sorted(valid_categories, key=str.lower)  # Case-insensitive sort
                 for idx, category in enumerate(sorted_categories, 1):
                     data = status[category]
-                    print(f"{idx:<4} {category:<15} ${data['budget']:<11.2f}")
+                    print(f"{idx:<4} {category:<15} ${utilities.format_amount(data['budget']):<11}")
                 
                 try:
                     choice = input(f"\nEnter number (1-{len(valid_categories)}) of budget to delete (or 0 to cancel): ").strip()
@@ -0,0 +1,259 @@
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from datetime import date
+from typing import Dict, List, Any, Iterable, Optional, Set
+from urllib.parse import quote
+
+
+class TransactionColumns:
+    """One user's transactions as packed, parse-free columns
+
+    Row i describes the i-th transaction of the user's transaction list:
+    dates are day ordinals, amounts integer cents, and type, category and
+    payment method are ids into small dictionaries of distinct names. The
+    columns are arrays or memoryviews over a memory-mapped file; both
+    support len(), indexing and iteration.
+    """
+
+    COLUMNS = ("dates", "amounts", "types", "categories", "payment_methods")
+    DICTIONARIES = {"types": "type", "categories": "category", "payment_methods": "payment_method"}
+
+    def __init__(self, signature: Any, columns: Dict[str, Any], names: Dict[str, List[str]]):
+        self.signature = signature
+        self.dates = columns["dates"]
+        self.amounts = columns["amounts"]
+        self.types = columns["types"]
+        self.categories = columns["categories"]
+        self.payment_methods = columns["payment_methods"]
+        self.type_names = names["types"]
+        self.category_names = names["categories"]
+        self.payment_method_names = names["payment_methods"]
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def apply(self, record: Dict[str, Any], row: Optional[int] = None) -> bool:
+        """Follow an add/edit/delete journal record in place
+
+        row is the position of the edited or deleted transaction. Returns
+        False when the record cannot be applied, in which case the columns
+        should be rebuilt.
+        """
+        op = record.get("op")
+        if op == "add":
+            self._make_writable()
+            transaction = record["transaction"]
+            self.dates.append(self.date_ordinal(transaction.get("date")))
+            self.amounts.append(transaction.get("amount_cents") or 0)
+            for column, field in self.DICTIONARIES.items():
+                self._encode(column, -1, transaction.get(field) or "")
+            return True
+        if op not in ("edit", "delete") or row is None or not 0 <= row < len(self):
+            return False
+        self._make_writable()
+        if op == "delete":
+            for column in self.COLUMNS:
+                del getattr(self, column)[row]
+            return True
+        fields = record["fields"]
+        if "amount" in fields:
+            # A float amount from before integer cents; rebuilding converts it
+            return False
+        if "date" in fields:
+            self.dates[row] = self.date_ordinal(fields["date"])
+        if "amount_cents" in fields:
+            self.amounts[row] = fields["amount_cents"] or 0
+        for column, field in self.DICTIONARIES.items():
+            if field in fields:
+                self._encode(column, row, fields[field] or "")
+        return True
+
+    def _make_writable(self) -> None:
+        """Copy columns mapped from a file into arrays that can change"""
+        for column in self.COLUMNS:
+            values = getattr(self, column)
+            if isinstance(values, memoryview):
+                copy = array(values.format)
+                copy.frombytes(values.cast("B"))
+                setattr(self, column, copy)
+
+    def _encode(self, column: str, row: int, value: str) -> None:
+        """Store value in a dictionary-encoded column at row (-1 appends)"""
+        names = getattr(self, self.DICTIONARIES[column] + "_names")
+        try:
+            code = names.index(value)
+        except ValueError:
+            code = len(names)
+            names.append(value)
+        values = getattr(self, column)
+        typecode = self._id_typecode(len(names))
+        if array(typecode).itemsize > values.itemsize:
+            values = array(typecode, values)
+            setattr(self, column, values)
+        if row < 0:
+            values.append(code)
+        else:
+            values[row] = code
+
+    @classmethod
+    def from_transactions(cls, transactions: List[Dict[str, Any]], signature: Any = None) -> "TransactionColumns":
+        """Encode a list of transactions, parsing each date and amount once"""
+        ordinals = {}
+        dates = array("i")
+        amounts = array("q")
+        ids = {name: {} for name in cls.DICTIONARIES}
+        codes = {name: [] for name in cls.DICTIONARIES}
+        for transaction in transactions:
+            day = transaction.get("date")
+            ordinal = ordinals.get(day)
+            if ordinal is None:
+                ordinal = ordinals[day] = cls.date_ordinal(day)
+            dates.append(ordinal)
+            amounts.append(transaction.get("amount_cents") or 0)
+            for column, field in cls.DICTIONARIES.items():
+                value = transaction.get(field) or ""
+                column_ids = ids[column]
+                code = column_ids.get(value)
+                if code is None:
+                    code = column_ids[value] = len(column_ids)
+                codes[column].append(code)
+
+        columns = {"dates": dates, "amounts": amounts}
+        for column in cls.DICTIONARIES:
+            columns[column] = array(cls._id_typecode(len(ids[column])), codes[column])
+        return cls(signature, columns, {column: list(ids[column]) for column in cls.DICTIONARIES})
+
+    @staticmethod
+    def _id_typecode(distinct: int) -> str:
+        """Smallest unsigned array type that holds distinct ids"""
+        if distinct <= 0x100:
+            return "B"
+        if distinct <= 0x10000:
+            return "H"
+        return "I"
+
+    @staticmethod
+    def date_ordinal(value: Any) -> int:
+        """Day ordinal of a YYYY-MM-DD date, or 0 when it is not a valid date"""
+        try:
+            return date.fromisoformat(str(value)[:10]).toordinal()
+        except (TypeError, ValueError):
+            return 0
+
+    @staticmethod
+    def month_range(month: int, year: int) -> tuple:
+        """(first, last) day ordinals of a month"""
+        first = date(year, month, 1).toordinal()
+        if month == 12:
+            return first, date(year + 1, 1, 1).toordinal() - 1
+        return first, date(year, month + 1, 1).toordinal() - 1
+
+    def ids(self, column: str, names: Iterable[str], ignore_case: bool = False) -> Set[int]:
+        """Ids in a dictionary-encoded column ("types", "categories" or
+        "payment_methods") whose name is one of names"""
+        dictionary = getattr(self, self.DICTIONARIES[column] + "_names")
+        if ignore_case:
+            wanted = {name.lower() for name in names}
+            return {code for code, name in enumerate(dictionary) if name.lower() in wanted}
+        wanted = set(names)
+        return {code for code, name in enumerate(dictionary) if name in wanted}
+
+    def rows(self, column: str, ids: Set[int]) -> List[int]:
+        """Row numbers whose value in a dictionary-encoded column is in ids"""
+        if not ids:
+            return []
+        values = getattr(self, column)
+        if len(ids) == 1:
+            (code,) = ids
+            return [row for row, value in enumerate(values) if value == code]
+        return [row for row, value in enumerate(values) if value in ids]
+
+
+class ColumnarStore:
+    """Files of per-user transaction columns, read back through mmap
+
+    A file holds a small JSON header (the signature of the data it was built
+    from, the dictionaries and the position of each column) followed by the
+    raw arrays, 8-byte aligned. load() only returns columns whose signature
+    matches the caller's, so a file left behind by older data is rebuilt.
+    """
+
+    MAGIC = b"PFMCOLS1"
+    PREFIX = struct.Struct("<8sI")
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, user_id: str) -> str:
+        """Path of a user's column file; user IDs are percent-encoded like shard names"""
+        return os.path.join(self.directory, quote(user_id, safe="") + ".cols")
+
+    def load(self, user_id: str, signature: Any) -> Optional[TransactionColumns]:
+        """Map a user's column file, or None when it is missing, stale or unreadable"""
+        path = self.path(user_id)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, header_size = self.PREFIX.unpack_from(buf, 0)
+            if magic != self.MAGIC:
+                return None
+            start = self.PREFIX.size
+            header = json.loads(buf[start:start + header_size])
+            if header["signature"] != signature or header["byteorder"] != sys.byteorder:
+                return None
+            view = memoryview(buf)
+            columns = {}
+            for name, (typecode, offset, length) in header["columns"].items():
+                offset += start + header_size
+                columns[name] = view[offset:offset + length * array(typecode).itemsize].cast(typecode)
+            return TransactionColumns(signature, columns, header["names"])
+        except (ValueError, KeyError, struct.error):
+            return None
+
+    def save(self, user_id: str, columns: TransactionColumns) -> None:
+        """Write a user's columns to disk, replacing the old file atomically"""
+        layout = {}
+        blobs = []
+        offset = 0
+        for name in TransactionColumns.COLUMNS:
+            values = getattr(columns, name)
+            blob = values.tobytes()
+            typecode = values.format if isinstance(values, memoryview) else values.typecode
+            layout[name] = [typecode, offset, len(values)]
+            blobs.append(blob + b"\0" * (-len(blob) % 8))
+            offset += len(blobs[-1])
+        names = {column: getattr(columns, field + "_names")
+                 for column, field in TransactionColumns.DICTIONARIES.items()}
+        header = {"signature": columns.signature, "byteorder": sys.byteorder, "names": names, "columns": layout}
+
+        # Column offsets count from the end of the header, which is padded
+        # with spaces so that the arrays start 8-byte aligned
+        encoded = json.dumps(header, separators=(",", ":")).encode()
+        encoded += b" " * (-(self.PREFIX.size + len(encoded)) % 8)
+
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.PREFIX.pack(self.MAGIC, len(encoded)))
+                f.write(encoded)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp_path, self.path(user_id))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def remove(self, user_id: str) -> None:
+        """Delete a user's column file if there is one"""
+        path = self.path(user_id)
+        if os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,88 @@
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Directory holding all data files
+DATA_DIR = os.environ.get("PFM_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+
+# Append transaction adds/edits/deletes to a journal instead of rewriting transactions.json
+JOURNAL_MODE = _env_bool("PFM_JOURNAL_MODE", True)
+
+# Number of journal records after which the journal is folded into the snapshot
+JOURNAL_COMPACT_THRESHOLD = _env_int("PFM_JOURNAL_COMPACT_THRESHOLD", 1000)
+
+# Incremental backups (content-addressed chunks plus one manifest per backup)
+BACKUP_DIR = os.environ.get("PFM_BACKUP_DIR", os.path.join(DATA_DIR, "backup"))
+
+# Number of most recent backups kept when a backup is taken (0 keeps all)
+BACKUP_KEEP = _env_int("PFM_BACKUP_KEEP", 10)
+
+# Storage backend: "json" (files in DATA_DIR) or "sqlite"
+STORAGE_BACKEND = os.environ.get("PFM_STORAGE_BACKEND", "json").strip().lower()
+
+# Database file used by the sqlite backend
+SQLITE_FILE = os.environ.get("PFM_SQLITE_FILE", os.path.join(DATA_DIR, "finance.db"))
+
+# JSON file layout: "single" (one file per collection) or "sharded" (one file per user)
+STORAGE_LAYOUT = os.environ.get("PFM_STORAGE_LAYOUT", "single").strip().lower()
+
+# In-memory cache of parsed data files:
+#   "version" - trust the cache until this process writes (no filesystem access on hits)
+#   "stat"    - also revalidate each hit against file mtime and size
+#   "off"     - always read from disk
+CACHE_MODE = os.environ.get("PFM_CACHE_MODE", "version").strip().lower()
+
+# Saves made within this many milliseconds are coalesced into one durable write.
+# 0 (the default) writes and fsyncs every save before it returns; with a window,
+# a save returns before it is on disk and a failed write is reported by the next
+# save or JsonHandler().flush()
+GROUP_COMMIT_WINDOW_MS = _env_int("PFM_GROUP_COMMIT_WINDOW_MS", 0)
+
+# Write-behind auto-save: saves only mark data dirty in memory and a background
+# thread writes it out every AUTO_SAVE_INTERVAL_MS (the most recent work a crash
+# can lose), or sooner once AUTO_SAVE_MAX_DIRTY saves are waiting
+WRITE_BEHIND = _env_bool("PFM_WRITE_BEHIND", False)
+AUTO_SAVE_INTERVAL_MS = _env_int("PFM_AUTO_SAVE_INTERVAL_MS", 2000)
+AUTO_SAVE_MAX_DIRTY = _env_int("PFM_AUTO_SAVE_MAX_DIRTY", 200)
+
+# Keep a memory-mapped columnar copy of each user's transactions (day ordinals,
+# integer cents, dictionary-encoded type/category/payment method) in
+# DATA_DIR/columnar for reports and search to scan without per-row parsing
+COLUMNAR_STORE = _env_bool("PFM_COLUMNAR_STORE", False)
+
+# Data file encoding: "pretty" (indented) or "compact" (no whitespace, smaller and faster)
+JSON_FORMAT = os.environ.get("PFM_JSON_FORMAT", "pretty").strip().lower()
+
+# JSON parser: "auto" (orjson when installed), "orjson" or "json"
+JSON_PARSER = os.environ.get("PFM_JSON_PARSER", "auto").strip().lower()
+
+# Compression of data files: "none", "gzip" or "zstd" (needs the zstandard package)
+JSON_COMPRESSION = os.environ.get("PFM_JSON_COMPRESSION", "none").strip().lower()
+
+# Worker processes used to validate large imports (0 = one per CPU, 1 = no pool)
+IMPORT_WORKERS = _env_int("PFM_IMPORT_WORKERS", 0)
+
+# Rows per chunk handed to an import worker
+IMPORT_CHUNK_ROWS = _env_int("PFM_IMPORT_CHUNK_ROWS", 5000)
+
+# What to do with a new transaction matching an existing one of the same user
+# (same date, amount, type, category, description and payment method):
+#   "skip"  - do not save it
+#   "flag"  - save it marked with "possible_duplicate": true
+#   "allow" - save it without checking (the default)
+DUPLICATE_POLICY = os.environ.get("PFM_DUPLICATE_POLICY", "allow").strip().lower()
@@ -1,24 +1,178 @@
 import json
 import csv
 import os
-from typing import Dict, List, Any
+import itertools
+import tempfile
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from jsonhandler import JsonHandler
+from utility import Utilities
+from transactions import TransactionManager
+from excel import ExcelHandler, convert_chunk, file_sha256, load_import_checkpoint, save_import_batches
+import config
 
 def load_data(file_path: str) -> Dict:
     """Load data from JSON file"""
-    pass
+    try:
+        if not os.path.exists(file_path):
+            return {}
+        with open(file_path, "rb") as f:
+            return JsonHandler().codec.decode(f.read(), {})
+    except Exception as e:
+        print(f"Error loading data: {e}")
+        return {}
 
 def save_data(file_path: str, data: Dict) -> bool:
-    """Save data to JSON file"""
-    pass
+    """Save data to JSON file, replacing it atomically"""
+    try:
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(JsonHandler().codec.encode(data))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return True
+    except Exception as e:
+        print(f"Error saving data: {e}")
+        return False
 
-def auto_save(data: Dict) -> None:
-    """Automatically save data periodically"""
-    pass
+def auto_save(enabled: bool = True, interval_ms: Optional[int] = None,
+              max_dirty: Optional[int] = None) -> None:
+    """Automatically save data periodically
+
+    Switches the storage layer to write-behind: saves only mark data dirty
+    and a background thread writes it out every interval_ms, or once
+    max_dirty saves are waiting (see JsonHandler.set_write_behind).
+    """
+    JsonHandler().set_write_behind(enabled, interval_ms, max_dirty)
 
 def backup_data(data: Dict, backup_path: str) -> bool:
     """Create a backup of the data"""
-    pass
+    return save_data(backup_path, data)
+
+def export_to_csv(user_id: str, file_path: str, start_date: Optional[str] = None,
+                  end_date: Optional[str] = None) -> bool:
+    """Export user transactions to CSV
+
+    Uses the same columns as the Excel export; rows are written as they are
+    generated rather than built up in memory first.
+    """
+    try:
+        transactions = JsonHandler().load_user_transactions(user_id)
+        rows = (
+            [t.get("transaction_id"), t.get("type"), Utilities.format_amount(t.get("amount_cents") or 0), t.get("category"),
+             t.get("date"), t.get("description"), t.get("payment_method")]
+            for t in transactions
+            if (not start_date or str(t.get("date", "")) >= start_date)
+            and (not end_date or str(t.get("date", "")) <= end_date)
+        )
+        with open(file_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(ExcelHandler.EXPORT_HEADERS)
+            writer.writerows(rows)
+        return True
+    except Exception as e:
+        print(f"Error exporting to CSV: {e}")
+        return False
+
+def iter_csv_rows(file_path: str, after_row: int = 1) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Stream (row_number, {header: value}) pairs from a CSV file
+
+    Row numbers count the header as row 1, like a spreadsheet. Rows up to
+    and including after_row are skipped.
+
+    Raises:
+        ValueError: If the file is empty or lacks required columns
+    """
+    with open(file_path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        headers = next(reader, None)
+        if headers is None:
+            raise ValueError("CSV file is empty")
+        headers = [header.strip() for header in headers]
+
+        missing_columns = [col for col in ExcelHandler.REQUIRED_COLUMNS if col not in headers]
+        if missing_columns:
+            raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+        for row_num, values in enumerate(reader, start=2):
+            if row_num <= after_row or not any(value.strip() for value in values):
+                continue
+            yield row_num, dict(zip(headers, values))
+
+def iter_csv_chunks(file_path: str, after_row: int = 1) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    """Group the streamed CSV rows into chunks of config.IMPORT_CHUNK_ROWS"""
+    rows = iter_csv_rows(file_path, after_row)
+    while True:
+        chunk = list(itertools.islice(rows, config.IMPORT_CHUNK_ROWS))
+        if not chunk:
+            return
+        yield chunk
+
+def import_from_csv(user_id: str, file_path: str, duplicates: Optional[str] = None) -> Tuple[bool, str, int]:
+    """Import transactions from a CSV file with the Excel import columns
+
+    The file is read twice as a stream: first every row is validated with
+    the Excel import rules, then the converted rows are saved chunk by
+    chunk. Memory use stays flat however long the file is. Imports are
+    checkpointed and checked for duplicates like Excel imports.
+
+    Args:
+        user_id: The user's ID
+        file_path: Path to the CSV file
+        duplicates: One of TransactionManager.DUPLICATE_POLICIES
+            (default config.DUPLICATE_POLICY)
+
+    Returns:
+        Tuple of (success, message, imported_count)
+    """
+    try:
+        if not os.path.exists(file_path):
+            return False, "File not found", 0
+        policy = duplicates or config.DUPLICATE_POLICY
+        if policy not in TransactionManager.DUPLICATE_POLICIES:
+            return False, f"Duplicate policy must be one of {', '.join(TransactionManager.DUPLICATE_POLICIES)}", 0
+
+        json_handler = JsonHandler()
+        file_hash = file_sha256(file_path)
+        imports, key, checkpoint = load_import_checkpoint(json_handler, user_id, file_path, file_hash)
+        if checkpoint.get("complete"):
+            return True, (f"{os.path.basename(file_path)} was already imported on "
+                          f"{checkpoint['updated']}; skipped"), 0
+        resume_after = checkpoint["last_row"]
+
+        # First pass: validate everything before saving anything
+        errors = []
+        has_data = False
+        for chunk in iter_csv_chunks(file_path, resume_after):
+            has_data = True
+            errors.extend(convert_chunk(user_id, chunk)[2])
+            if len(errors) >= 10:
+                break
+        if errors:
+            return False, "\n".join(errors[:10]), 0
+        if not has_data and resume_after <= 1:
+            return False, "CSV file must have at least one data row (in addition to header)", 0
+
+        # Second pass: save chunk by chunk, recording a checkpoint after each
+        batches = (convert_chunk(user_id, chunk, file_hash)[:2] for chunk in iter_csv_chunks(file_path, resume_after))
+        error, imported_count, duplicate_count = save_import_batches(
+            json_handler, imports, key, checkpoint, batches, policy)
+        if error:
+            return False, error, imported_count
+
+        message = f"Import completed: {imported_count} transactions imported"
+        if duplicate_count:
+            message += f", {duplicate_count} possible duplicates {'skipped' if policy == 'skip' else 'flagged'}"
+        if resume_after > 1:
+            message += f" (resumed after row {resume_after})"
+        return True, message, imported_count
 
-def export_to_csv(user_id: str, file_path: str) -> bool:
-    """Export user transactions to CSV"""
-    pass
\ No newline at end of file
+    except ValueError as e:
+        return False, str(e), 0
+    except Exception as e:
+        return False, f"Error importing transactions: {str(e)}", 0
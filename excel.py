@@ -1,10 +1,22 @@
 import os
+import time
+import pickle
+import tempfile
+import uuid
+import hashlib
+import itertools
+import functools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import openpyxl
 from openpyxl import load_workbook
-from typing import Dict, List, Optional, Any, Tuple
+from openpyxl.cell import WriteOnlyCell
+from datetime import date, datetime
+from typing import Dict, List, Optional, Any, Tuple, Iterable, Iterator
 from jsonhandler import JsonHandler
 from utility import Utilities
-from transactions import Transaction
+from transactions import TransactionManager
+import config
 
 
 class ExcelHandler:
@@ -18,10 +30,11 @@ class ExcelHandler:
     VALID_EXPENSE_CATEGORIES = ["Food", "Transport", "Bills", "Shopping", "Entertainment", "Other"]
     VALID_INCOME_CATEGORIES = ["Salary", "Freelance", "Investment", "Gift", "Other"]
     
-    def __init__(self, user_id: str):
+    def __init__(self, user_id: str, workers: Optional[int] = None):
         self.user_id = user_id
         self.json_handler = JsonHandler()
         self.utilities = Utilities()
+        self.workers = workers or config.IMPORT_WORKERS or os.cpu_count() or 1
     
     def validate_format(self, file_path: str) -> Tuple[bool, str]:
         """Validate the Excel file format
@@ -33,180 +46,255 @@ class ExcelHandler:
             Tuple of (is_valid, error_message)
         """
         try:
-            if not os.path.exists(file_path):
-                return False, "File not found"
-            
-            # Load workbook
-            workbook = load_workbook(file_path)
-            
-            if not workbook.active:
-                return False, "Excel file is empty"
+            errors = self._validation_errors(file_path)
+            if errors:
+                return False, "\n".join(errors[:10])  # Return first 10 errors
+            return True, ""
             
+        except Exception as e:
+            return False, f"Error validating file: {str(e)}"
+    
+    def _iter_rows(self, file_path: str, after_row: int = 1) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """Stream (row_number, {header: value}) pairs from the active sheet
+        
+        The workbook is opened read-only, so rows are parsed as they are
+        iterated and memory use does not grow with the size of the sheet.
+        Rows up to and including after_row (the header row by default) are
+        skipped.
+        
+        Raises:
+            ValueError: If the file is missing, empty or lacks required columns
+        """
+        if not os.path.exists(file_path):
+            raise ValueError("File not found")
+        
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
             sheet = workbook.active
+            if sheet is None:
+                raise ValueError("Excel file is empty")
             
-            # Check if we have data
-            if sheet.max_row < 2:
-                return False, "Excel file must have at least one data row (in addition to header)"
-            
-            # Get header row
-            headers = [cell.value for cell in sheet[1]]
+            headers = next(sheet.iter_rows(max_row=1, values_only=True), None)
+            if headers is None:
+                raise ValueError("Excel file is empty")
+            headers = list(headers)
             
             # Check if all required columns exist
-            missing_columns = []
-            for required_col in self.REQUIRED_COLUMNS:
-                if required_col not in headers:
-                    missing_columns.append(required_col)
-            
+            missing_columns = [col for col in self.REQUIRED_COLUMNS if col not in headers]
             if missing_columns:
-                return False, f"Missing required columns: {', '.join(missing_columns)}"
-            
-            # Validate data rows
-            errors = []
-            for row_num in range(2, sheet.max_row + 1):
-                row_data = {}
-                for col_idx, header in enumerate(headers, start=1):
-                    cell = sheet.cell(row=row_num, column=col_idx)
-                    row_data[header] = cell.value
-                
-                # Validate this row
-                row_error = self._validate_row(row_data, row_num)
-                if row_error:
-                    errors.append(row_error)
+                raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
             
-            if errors:
-                return False, "\n".join(errors[:10])  # Return first 10 errors
-            
-            return True, ""
+            has_data = False
+            rows = sheet.iter_rows(min_row=after_row + 1, values_only=True)
+            for row_num, values in enumerate(rows, start=after_row + 1):
+                # Formatting can leave blank rows at the end of a sheet
+                if all(value is None for value in values):
+                    continue
+                has_data = True
+                yield row_num, dict(zip(headers, values))
             
-        except Exception as e:
-            return False, f"Error validating file: {str(e)}"
+            if not has_data and after_row <= 1:
+                raise ValueError("Excel file must have at least one data row (in addition to header)")
+        finally:
+            workbook.close()
     
-    def _validate_row(self, row_data: Dict[str, Any], row_num: int) -> Optional[str]:
-        """Validate a single row of data"""
-        # Check required fields
-        if not row_data.get("Type"):
-            return f"Row {row_num}: Type is required"
-        if not row_data.get("Amount"):
-            return f"Row {row_num}: Amount is required"
-        if not row_data.get("Category"):
-            return f"Row {row_num}: Category is required"
-        if not row_data.get("Date"):
-            return f"Row {row_num}: Date is required"
+    def _validation_errors(self, file_path: str, after_row: int = 1, limit: int = 10) -> List[str]:
+        """Check the rows after after_row without keeping them, stopping once limit errors are found"""
+        errors = []
+        try:
+            for _, _, chunk_errors in self._convert_chunks(file_path, after_row=after_row):
+                errors.extend(chunk_errors)
+                if len(errors) >= limit:
+                    break
+        except ValueError as e:
+            errors.append(str(e))
+        return errors
+    
+    def _convert_chunks(self, file_path: str, file_hash: Optional[str] = None,
+                        after_row: int = 1) -> Iterator[Tuple[List[Dict[str, Any]], List[int], List[str]]]:
+        """Validate and convert the rows into new transactions, one chunk at a time
         
-        # Validate Type
-        type_value = str(row_data["Type"]).strip().lower()
-        if type_value not in self.VALID_TYPES:
-            return f"Row {row_num}: Type must be one of {', '.join(self.VALID_TYPES)}"
+        Rows are handed out in chunks of config.IMPORT_CHUNK_ROWS to a pool of
+        self.workers processes; a file that fits in one chunk is handled
+        inline. Chunks are yielded in row order as soon as they are ready,
+        so only a few are held in memory however long the file is.
         
-        # Validate Amount
-        try:
-            amount = float(row_data["Amount"])
-            if amount <= 0:
-                return f"Row {row_num}: Amount must be positive"
-        except (ValueError, TypeError):
-            return f"Row {row_num}: Amount must be a valid number"
+        Args:
+            file_path: Path to the Excel file
+            file_hash: Hash of the file; when given, transaction IDs are
+                derived from it and the row number instead of being random
+            after_row: Only read rows after this one
+        
+        Yields:
+            Tuples of (transactions ready to save, their row numbers, error messages)
         
-        # Validate Category
-        category = str(row_data["Category"]).strip()
-        if type_value == "expense":
-            if category not in self.VALID_EXPENSE_CATEGORIES:
-                return f"Row {row_num}: Category for expense must be one of {', '.join(self.VALID_EXPENSE_CATEGORIES)}"
-        else:
-            if category not in self.VALID_INCOME_CATEGORIES:
-                return f"Row {row_num}: Category for income must be one of {', '.join(self.VALID_INCOME_CATEGORIES)}"
+        Raises:
+            ValueError: If the file is missing, empty or lacks required columns
+        """
+        chunks = self._iter_chunks(file_path, after_row)
+        first = next(chunks, None)
+        second = next(chunks, None)
+        if first is None:
+            return
+        if second is None or self.workers <= 1:
+            for chunk in itertools.chain([first], [second] if second else [], chunks):
+                yield convert_chunk(self.user_id, chunk, file_hash)
+            return
         
-        # Validate Date
-        date_value = str(row_data["Date"])
-        if not self.utilities.validate_date(date_value):
-            return f"Row {row_num}: Date must be in YYYY-MM-DD format"
+        # Keep a bounded number of chunks in flight so memory stays flat
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for chunk in itertools.chain([first, second], chunks):
+                pending.append(executor.submit(convert_chunk, self.user_id, chunk, file_hash))
+                if len(pending) >= self.workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    
+    def _spool_chunks(self, file_path: str, file_hash: str, after_row: int, spool) -> Tuple[int, List[str]]:
+        """Convert the rows after after_row and pickle each chunk to spool
         
-        # Validate Payment Method (if provided)
-        payment_method = row_data.get("Payment Method", "")
-        if payment_method and payment_method not in self.VALID_PAYMENT_METHODS:
-            return f"Row {row_num}: Payment Method must be one of {', '.join(self.VALID_PAYMENT_METHODS)}"
+        Stops writing to the spool at the first error but keeps checking, up
+        to ten errors, so the caller can report them all at once.
         
-        return None
+        Returns:
+            Tuple of (number of rows spooled, error messages)
+        """
+        row_count = 0
+        errors = []
+        try:
+            for transactions, row_numbers, chunk_errors in self._convert_chunks(file_path, file_hash, after_row):
+                errors.extend(chunk_errors)
+                if len(errors) >= 10:
+                    break
+                if transactions and not errors:
+                    pickle.dump((transactions, row_numbers), spool, pickle.HIGHEST_PROTOCOL)
+                    row_count += len(transactions)
+        except ValueError as e:
+            errors.append(str(e))
+        return row_count, errors
+    
+    @staticmethod
+    def _read_spool(spool) -> Iterator[Tuple[List[Dict[str, Any]], List[int]]]:
+        """Yield the chunks written by _spool_chunks back in order"""
+        while True:
+            try:
+                yield pickle.load(spool)
+            except EOFError:
+                return
     
-    def import_excel_transactions(self, file_path: str) -> Tuple[bool, str, int]:
+    def _iter_chunks(self, file_path: str, after_row: int = 1) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        """Group the streamed rows into chunks of config.IMPORT_CHUNK_ROWS"""
+        rows = self._iter_rows(file_path, after_row)
+        while True:
+            chunk = list(itertools.islice(rows, config.IMPORT_CHUNK_ROWS))
+            if not chunk:
+                return
+            yield chunk
+    
+    def _validate_row(self, row_data: Dict[str, Any], row_num: int) -> Optional[str]:
+        """Validate a single row of data"""
+        return validate_row(row_data, row_num)
+    
+    def import_excel_transactions(self, file_path: str, duplicates: Optional[str] = None) -> Tuple[bool, str, int]:
         """Import transactions from Excel file
         
+        The file is read once: converted rows are spooled to a temporary file
+        in chunks of config.IMPORT_CHUNK_ROWS while they are checked, and only
+        when every row is valid are the chunks read back and saved one batch
+        at a time, so memory use does not grow with the file. After each
+        batch a checkpoint (file hash and last saved row) is recorded with
+        JsonHandler.save_imports(). Running the import again resumes after
+        the last saved row, and a file that was already fully imported for
+        this user is skipped.
+        
         Args:
             file_path: Path to the Excel file
+            duplicates: What to do with rows matching an existing transaction,
+                one of TransactionManager.DUPLICATE_POLICIES
+                (default config.DUPLICATE_POLICY)
             
         Returns:
             Tuple of (success, message, imported_count)
         """
         try:
-            # Validate file format first
-            is_valid, error_msg = self.validate_format(file_path)
-            if not is_valid:
-                return False, error_msg, 0
-            
-            # Load workbook
-            workbook = load_workbook(file_path)
-            sheet = workbook.active
-            
-            # Get headers
-            headers = [cell.value for cell in sheet[1]]
-            
-            # Get existing transactions
-            transactions_data = self.json_handler.load_transactions()
+            if not os.path.exists(file_path):
+                return False, "File not found", 0
+            policy = duplicates or config.DUPLICATE_POLICY
+            if policy not in TransactionManager.DUPLICATE_POLICIES:
+                return False, f"Duplicate policy must be one of {', '.join(TransactionManager.DUPLICATE_POLICIES)}", 0
             
-            imported_count = 0
-            failed_count = 0
+            file_hash = file_sha256(file_path)
+            imports, key, checkpoint = load_import_checkpoint(self.json_handler, self.user_id, file_path, file_hash)
+            if checkpoint.get("complete"):
+                return True, (f"{os.path.basename(file_path)} was already imported on "
+                              f"{checkpoint['updated']}; skipped"), 0
             
-            # Process each row
-            for row_num in range(2, sheet.max_row + 1):
-                row_data = {}
-                for col_idx, header in enumerate(headers, start=1):
-                    cell = sheet.cell(row=row_num, column=col_idx)
-                    row_data[header] = cell.value
+            started = time.perf_counter()
+            resume_after = checkpoint["last_row"]
+            with tempfile.TemporaryFile(dir=self.json_handler.data_dir) as spool:
+                # Convert and check the remaining rows before saving anything
+                row_count, errors = self._spool_chunks(file_path, file_hash, resume_after, spool)
+                if errors:
+                    return False, "\n".join(errors[:10]), 0
                 
-                try:
-                    # Create transaction using the TransactionManager
-                    transaction = Transaction(
-                        user_id=self.user_id,
-                        type=str(row_data["Type"]).strip().lower(),
-                        amount=float(row_data["Amount"]),
-                        category=str(row_data["Category"]).strip(),
-                        date=str(row_data["Date"]),
-                        description=str(row_data.get("Description", "") or ""),
-                        payment_method=str(row_data.get("Payment Method", "Cash") or "Cash")
-                    )
-                    
-                    # Add transaction
-                    result = transaction.add_transaction()
-                    if result:
-                        imported_count += 1
-                    else:
-                        failed_count += 1
-                        
-                except Exception as e:
-                    failed_count += 1
-                    continue
+                spool.seek(0)
+                error, imported_count, duplicate_count = save_import_batches(
+                    self.json_handler, imports, key, checkpoint, self._read_spool(spool), policy)
+                if error:
+                    return False, error, imported_count
             
-            message = f"Import completed: {imported_count} transactions imported"
-            if failed_count > 0:
-                message += f", {failed_count} failed"
-            
-            return True, message, imported_count
+            elapsed = time.perf_counter() - started
+            rate = row_count / elapsed if elapsed > 0 else 0
+            resumed = f", resumed after row {resume_after}" if resume_after > 1 else ""
+            skipped = ""
+            if duplicate_count:
+                skipped = (f", {duplicate_count} possible duplicates "
+                           f"{'skipped' if policy == 'skip' else 'flagged'}")
+            return True, (f"Import completed: {imported_count} transactions imported{skipped} "
+                          f"({rate:,.0f} rows/s with {self.workers} worker(s){resumed})"), imported_count
             
         except Exception as e:
             return False, f"Error importing transactions: {str(e)}", 0
     
-    def export_excel_transactions(self, file_path: Optional[str] = None) -> Tuple[bool, str]:
+    EXPORT_HEADERS = ["Transaction ID", "Type", "Amount", "Category", "Date",
+                      "Description", "Payment Method"]
+    SUMMARY_HEADERS = ["Month", "Transactions", "Income", "Expenses", "Net"]
+    
+    def export_excel_transactions(self, file_path: Optional[str] = None, by_month: bool = False,
+                                  start_date: Optional[str] = None, end_date: Optional[str] = None,
+                                  months_per_file: Optional[int] = None) -> Tuple[bool, str]:
         """Export transactions to Excel file
         
+        Rows are streamed into a write-only workbook, so memory use does not
+        grow with the number of rows written.
+        
         Args:
             file_path: Optional custom path for the Excel file
+            by_month: Write one sheet per month plus a "Summary" sheet
+            start_date: Only export transactions on or after this date (YYYY-MM-DD)
+            end_date: Only export transactions on or before this date (YYYY-MM-DD)
+            months_per_file: Split the export into files covering this many
+                months each (named <file>_<first month>.xlsx)
             
         Returns:
             Tuple of (success, message)
         """
         try:
+            for value in (start_date, end_date):
+                if value and not self.utilities.validate_date(value):
+                    return False, "Dates must be in YYYY-MM-DD format"
+            if months_per_file is not None and months_per_file < 1:
+                return False, "Months per file must be at least 1"
+            
             # Load transactions
-            transactions_data = self.json_handler.load_transactions()
-            user_transactions = transactions_data.get(self.user_id, [])
+            user_transactions = self.json_handler.load_user_transactions(self.user_id)
+            if start_date or end_date:
+                user_transactions = [
+                    t for t in user_transactions
+                    if (not start_date or str(t.get("date", "")) >= start_date)
+                    and (not end_date or str(t.get("date", "")) <= end_date)
+                ]
             
             if not user_transactions:
                 return False, "No transactions found to export"
@@ -215,42 +303,259 @@ class ExcelHandler:
             if not file_path:
                 file_path = f"transactions_export_{self.user_id[:8]}.xlsx"
             
-            # Create workbook
-            workbook = openpyxl.Workbook()
-            sheet = workbook.active
-            sheet.title = "Transactions"
-            
-            # Write headers
-            headers = ["Transaction ID", "Type", "Amount", "Category", "Date", 
-                      "Description", "Payment Method"]
-            for col_idx, header in enumerate(headers, start=1):
-                cell = sheet.cell(row=1, column=col_idx)
-                cell.value = header
-                cell.font = openpyxl.styles.Font(bold=True)
-                cell.fill = openpyxl.styles.PatternFill(start_color="CCCCCC", 
-                                                         end_color="CCCCCC", 
-                                                         fill_type="solid")
-            
-            # Write data
-            for row_idx, transaction in enumerate(user_transactions, start=2):
-                sheet.cell(row=row_idx, column=1, value=transaction.get("transaction_id"))
-                sheet.cell(row=row_idx, column=2, value=transaction.get("type"))
-                sheet.cell(row=row_idx, column=3, value=transaction.get("amount"))
-                sheet.cell(row=row_idx, column=4, value=transaction.get("category"))
-                sheet.cell(row=row_idx, column=5, value=transaction.get("date"))
-                sheet.cell(row=row_idx, column=6, value=transaction.get("description"))
-                sheet.cell(row=row_idx, column=7, value=transaction.get("payment_method"))
+            if not by_month and not months_per_file:
+                self._write_workbook(file_path, {"Transactions": user_transactions}, summary=False)
+                return True, f"Transactions exported successfully to {file_path}"
             
-            # Auto-adjust column widths
-            for col_idx, header in enumerate(headers, start=1):
-                col_letter = openpyxl.utils.get_column_letter(col_idx)
-                sheet.column_dimensions[col_letter].width = 15
+            # Group by month (references only, nothing is copied)
+            months = {}
+            for transaction in user_transactions:
+                months.setdefault(str(transaction.get("date", ""))[:7], []).append(transaction)
+            month_keys = sorted(months)
             
-            # Save workbook
-            workbook.save(file_path)
+            chunk_size = months_per_file or len(month_keys)
+            base, ext = os.path.splitext(file_path)
+            written = []
+            for i in range(0, len(month_keys), chunk_size):
+                chunk = month_keys[i:i + chunk_size]
+                path = file_path if chunk_size >= len(month_keys) else f"{base}_{chunk[0]}{ext or '.xlsx'}"
+                if by_month:
+                    sheets = {month or "Undated": months[month] for month in chunk}
+                else:
+                    sheets = {"Transactions": [t for month in chunk for t in months[month]]}
+                self._write_workbook(path, sheets, summary=by_month)
+                written.append(path)
             
-            return True, f"Transactions exported successfully to {file_path}"
+            if len(written) == 1:
+                return True, f"Transactions exported successfully to {written[0]}"
+            return True, f"Transactions exported successfully to {len(written)} files: {', '.join(written)}"
             
         except Exception as e:
             return False, f"Error exporting transactions: {str(e)}"
+    
+    def _write_workbook(self, file_path: str, sheets: Dict[str, List[Dict[str, Any]]], summary: bool) -> None:
+        """Stream transactions into a write-only workbook, one sheet per entry of sheets"""
+        workbook = openpyxl.Workbook(write_only=True)
+        
+        if summary:
+            sheet = workbook.create_sheet("Summary")
+            self._append_header(sheet, self.SUMMARY_HEADERS)
+            for title, transactions in sheets.items():
+                # Summed in integer cents; cells hold currency units
+                income = sum(t.get("amount_cents", 0) for t in transactions if t.get("type") == "income")
+                expenses = sum(t.get("amount_cents", 0) for t in transactions if t.get("type") == "expense")
+                sheet.append([title, len(transactions), income / 100, expenses / 100, (income - expenses) / 100])
+        
+        for title, transactions in sheets.items():
+            sheet = workbook.create_sheet(title)
+            self._append_header(sheet, self.EXPORT_HEADERS)
+            for transaction in transactions:
+                sheet.append([
+                    transaction.get("transaction_id"),
+                    transaction.get("type"),
+                    transaction.get("amount_cents", 0) / 100,
+                    transaction.get("category"),
+                    transaction.get("date"),
+                    transaction.get("description"),
+                    transaction.get("payment_method")
+                ])
+        
+        workbook.save(file_path)
+    
+    def _append_header(self, sheet: Any, headers: List[str]) -> None:
+        """Write a bold, shaded header row and set the column widths"""
+        # Column widths must be set before any row is written in write-only mode
+        for col_idx in range(1, len(headers) + 1):
+            sheet.column_dimensions[openpyxl.utils.get_column_letter(col_idx)].width = 15
+        
+        cells = []
+        for header in headers:
+            cell = WriteOnlyCell(sheet, value=header)
+            cell.font = openpyxl.styles.Font(bold=True)
+            cell.fill = openpyxl.styles.PatternFill(start_color="CCCCCC",
+                                                    end_color="CCCCCC",
+                                                    fill_type="solid")
+            cells.append(cell)
+        sheet.append(cells)
 
+
+# Imported files repeat the same dates many times, and strptime is slow
+_valid_date = functools.lru_cache(maxsize=4096)(Utilities.validate_date)
+
+
+def validate_row(row_data: Dict[str, Any], row_num: int) -> Optional[str]:
+    """Validate a single row of data"""
+    # Check required fields
+    if not row_data.get("Type"):
+        return f"Row {row_num}: Type is required"
+    if not row_data.get("Amount"):
+        return f"Row {row_num}: Amount is required"
+    if not row_data.get("Category"):
+        return f"Row {row_num}: Category is required"
+    if not row_data.get("Date"):
+        return f"Row {row_num}: Date is required"
+    
+    # Validate Type
+    type_value = str(row_data["Type"]).strip().lower()
+    if type_value not in ExcelHandler.VALID_TYPES:
+        return f"Row {row_num}: Type must be one of {', '.join(ExcelHandler.VALID_TYPES)}"
+    
+    # Validate Amount
+    try:
+        amount = float(row_data["Amount"])
+        if amount <= 0:
+            return f"Row {row_num}: Amount must be positive"
+    except (ValueError, TypeError):
+        return f"Row {row_num}: Amount must be a valid number"
+    
+    # Validate Category
+    category = str(row_data["Category"]).strip()
+    if type_value == "expense":
+        if category not in ExcelHandler.VALID_EXPENSE_CATEGORIES:
+            return f"Row {row_num}: Category for expense must be one of {', '.join(ExcelHandler.VALID_EXPENSE_CATEGORIES)}"
+    else:
+        if category not in ExcelHandler.VALID_INCOME_CATEGORIES:
+            return f"Row {row_num}: Category for income must be one of {', '.join(ExcelHandler.VALID_INCOME_CATEGORIES)}"
+    
+    # Validate Date
+    date_value = str(row_data["Date"])
+    if not _valid_date(date_value):
+        return f"Row {row_num}: Date must be in YYYY-MM-DD format"
+    
+    # Validate Payment Method (if provided)
+    payment_method = row_data.get("Payment Method", "")
+    if payment_method and payment_method not in ExcelHandler.VALID_PAYMENT_METHODS:
+        return f"Row {row_num}: Payment Method must be one of {', '.join(ExcelHandler.VALID_PAYMENT_METHODS)}"
+    
+    return None
+
+
+def convert_chunk(user_id: str, chunk: List[Tuple[int, Dict[str, Any]]],
+                  file_hash: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[int], List[str]]:
+    """Validate and convert (row_number, row_data) pairs into new transactions
+    
+    Module level so it can run in worker processes. With file_hash, each
+    transaction ID is derived from the user, file hash and row number, so
+    importing the same row again produces the same ID.
+    
+    Returns:
+        Tuple of (transactions for the valid rows, their row numbers,
+        error messages in row order)
+    """
+    rows = []
+    row_numbers = []
+    errors = []
+    for row_num, row_data in chunk:
+        # Date cells are read as datetime objects
+        if isinstance(row_data.get("Date"), (datetime, date)):
+            row_data["Date"] = row_data["Date"].strftime('%Y-%m-%d')
+        
+        row_error = validate_row(row_data, row_num)
+        if row_error:
+            errors.append((row_num, row_error))
+            continue
+        
+        rows.append({
+            "transaction_id": import_transaction_id(user_id, file_hash, row_num) if file_hash else None,
+            "type": str(row_data["Type"]).strip().lower(),
+            "amount": float(row_data["Amount"]),
+            "category": str(row_data["Category"]).strip(),
+            "date": str(row_data["Date"]),
+            "description": str(row_data.get("Description", "") or ""),
+            "payment_method": str(row_data.get("Payment Method", "Cash") or "Cash")
+        })
+        row_numbers.append(row_num)
+    
+    transactions, bulk_errors = TransactionManager.prepare_transactions(user_id, rows)
+    failed = set()
+    for error in bulk_errors:
+        row_num = row_numbers[error["row"]]
+        failed.add(error["row"])
+        errors.append((row_num, f"Row {row_num}: {error['message']}"))
+    errors.sort(key=lambda error: error[0])
+    if failed:
+        row_numbers = [row_num for index, row_num in enumerate(row_numbers) if index not in failed]
+    return transactions, row_numbers, [message for _, message in errors]
+
+
+def file_sha256(file_path: str) -> str:
+    """SHA-256 of the file contents, read in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def import_transaction_id(user_id: str, file_hash: str, row_num: int) -> str:
+    """Stable transaction ID for a row of an imported file"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"pfm-import:{user_id}:{file_hash}:{row_num}"))
+
+
+def load_import_checkpoint(json_handler: JsonHandler, user_id: str, file_path: str,
+                           file_hash: str) -> Tuple[Dict[str, Any], str, Dict[str, Any]]:
+    """Find the checkpoint of a user's import of a file, or start a new one
+    
+    Returns:
+        Tuple of (all import checkpoints, key of this import, its checkpoint)
+    """
+    key = f"{user_id}:{file_hash}"
+    imports = json_handler.load_imports()
+    checkpoint = imports.get(key)
+    if checkpoint is None:
+        checkpoint = {
+            "user_id": user_id,
+            "file": os.path.basename(file_path),
+            "hash": file_hash,
+            "last_row": 1,
+            "imported": 0,
+            "complete": False
+        }
+    return imports, key, checkpoint
+
+
+def save_import_batches(json_handler: JsonHandler, imports: Dict[str, Any], key: str, checkpoint: Dict[str, Any],
+                        batches: Iterable[Tuple[List[Dict[str, Any]], List[int]]],
+                        policy: str) -> Tuple[Optional[str], int, int]:
+    """Save converted batches of an import, recording a checkpoint after each
+    
+    Shared by the Excel and CSV imports. Rows whose transaction already
+    exists are left out: IDs are derived from the file and row, so rows
+    saved just before a crash lost their checkpoint are recognised. The
+    rest are checked for duplicates with the given policy. When every
+    batch is saved the checkpoint is marked complete.
+    
+    Args:
+        batches: (transactions, their row numbers) pairs in row order
+        policy: One of TransactionManager.DUPLICATE_POLICIES
+    
+    Returns:
+        Tuple of (error message or None, imported count, duplicate count)
+    """
+    imported_count = 0
+    duplicate_count = 0
+    resume = "run the import again to resume"
+    for batch, row_numbers in batches:
+        batch = [transaction for transaction in batch
+                 if json_handler.find_transaction(transaction["transaction_id"]) is None]
+        kept, found = TransactionManager.check_duplicates(batch, policy)
+        if kept and not json_handler.append_transactions(kept):
+            return (f"Failed to save transactions after {imported_count} were imported; {resume}",
+                    imported_count, duplicate_count)
+        imported_count += len(kept)
+        duplicate_count += len(found)
+        checkpoint["imported"] += len(kept)
+        checkpoint["last_row"] = row_numbers[-1]
+        checkpoint["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        imports[key] = checkpoint
+        if not json_handler.save_imports(imports):
+            return (f"Failed to record the import checkpoint after {imported_count} transactions "
+                    f"were imported; {resume}", imported_count, duplicate_count)
+    
+    checkpoint["complete"] = True
+    checkpoint["updated"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    imports[key] = checkpoint
+    if not json_handler.save_imports(imports):
+        return (f"Imported {imported_count} transactions but could not mark the import complete; {resume}",
+                imported_count, duplicate_count)
+    return None, imported_count, duplicate_count
@@ -1,14 +1,134 @@
 import os
+import re
+import gzip
 import json
-from typing import Dict, Any, Optional
+import mmap
+import atexit
+import shutil
+import tempfile
+import threading
+import time
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from urllib.parse import quote, unquote
+from typing import Dict, List, Any, Optional
+
+import config
+from utility import Utilities
+from records import TransactionRecord, clear_interned
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class JsonCodec:
+    """Encodes and decodes data files
+    
+    format is "pretty" (indented, as before) or "compact"; parser is "auto"
+    (orjson when installed), "orjson" or "json"; compression is "none",
+    "gzip" or "zstd". Compressed files are recognised by their magic bytes,
+    so files written with any setting can always be read back.
+    """
+    
+    GZIP_MAGIC = b"\x1f\x8b"
+    ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+    
+    def __init__(self, format: str = "pretty", parser: str = "auto", compression: str = "none"):
+        self.format = format
+        self.use_orjson = orjson is not None and parser in ("auto", "orjson")
+        if parser == "orjson" and orjson is None:
+            print("orjson is not installed; using the standard json module")
+        self.compression = compression
+        if compression == "zstd" and zstandard is None:
+            print("zstandard is not installed; writing uncompressed data files")
+            self.compression = "none"
+    
+    def dumps(self, data: Any) -> bytes:
+        """Serialize data to JSON bytes in the configured format"""
+        if self.format == "compact":
+            return self.dumps_line(data)
+        return json.dumps(data, indent=4, default=self._default).encode("utf-8")
+    
+    def dumps_line(self, data: Any) -> bytes:
+        """Serialize data to a single line of compact JSON"""
+        if self.use_orjson:
+            try:
+                return orjson.dumps(data, default=self._default)
+            except TypeError:
+                # e.g. non-string dict keys; the json module is more lenient
+                pass
+        return json.dumps(data, separators=(",", ":"), default=self._default).encode("utf-8")
+    
+    @staticmethod
+    def _default(value: Any) -> Any:
+        """Serialize in-memory transaction records as the dicts they stand for"""
+        if isinstance(value, TransactionRecord):
+            return value.to_dict()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    def loads(self, raw: Any) -> Any:
+        """Parse JSON from bytes or str"""
+        if self.use_orjson:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    
+    def encode(self, data: Any) -> bytes:
+        """Serialize data to the bytes stored on disk"""
+        payload = self.dumps(data)
+        if self.compression == "gzip":
+            return gzip.compress(payload, compresslevel=6)
+        if self.compression == "zstd":
+            return zstandard.ZstdCompressor().compress(payload)
+        return payload
+    
+    def decode(self, raw: bytes, default: Any) -> Any:
+        """Parse bytes read from disk, returning default when empty"""
+        if raw.startswith(self.GZIP_MAGIC):
+            raw = gzip.decompress(raw)
+        elif raw.startswith(self.ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("data file is zstd-compressed but zstandard is not installed")
+            raw = zstandard.ZstdDecompressor().decompress(raw, max_output_size=2 ** 31)
+        raw = raw.strip()
+        return self.loads(raw) if raw else default
 
 
 class JsonHandler:
-    """Handles JSON file operations"""
+    """Handles JSON file operations
+    
+    When config.STORAGE_BACKEND is "sqlite" every load/save call is routed
+    to a SqliteStore instead, so callers work unchanged on either backend.
+    
+    With config.STORAGE_LAYOUT set to "sharded", transactions, bills and
+    budgets are kept in one file per user (data/<collection>/<user_id>.json)
+    so per-user reads and writes only touch that user's shard.
+    
+    Parsed JSON files are cached in memory (see config.CACHE_MODE). Loaded
+    data is shared with the cache, so callers that modify it must save it.
+    
+    A single user's data is read from the multi-user files by scanning for
+    that user's member and parsing only its bytes (see _read_json_member).
+    
+    Files are replaced atomically (temp file, fsync, rename). Saves made
+    inside group_commit(), or within config.GROUP_COMMIT_WINDOW_MS of each
+    other (off by default), are coalesced into a single durable write per
+    file. If such a deferred write fails, the next save or flush() reports it.
+    """
     
     _instance = None
     _initialized = False
     
+    SHARDED_COLLECTIONS = ("transactions", "bills", "budgets")
+    
+    _MISS = object()
+    
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(JsonHandler, cls).__new__(cls)
@@ -16,13 +136,68 @@ class JsonHandler:
     
     def __init__(self):
         if not self._initialized:
-            self.users_file = os.path.join(os.path.dirname(__file__), "data", "users.json")
-            self.transactions_file = os.path.join(os.path.dirname(__file__), "data", "transactions.json")
-            self.bills_file = os.path.join(os.path.dirname(__file__), "data", "bills.json")
-            self.budgets_file = os.path.join(os.path.dirname(__file__), "data", "budgets.json")
+            self.data_dir = config.DATA_DIR
+            self.users_file = os.path.join(self.data_dir, "users.json")
+            self.transactions_file = os.path.join(self.data_dir, "transactions.json")
+            self.transactions_journal_file = os.path.join(self.data_dir, "transactions.journal")
+            self.bills_file = os.path.join(self.data_dir, "bills.json")
+            self.budgets_file = os.path.join(self.data_dir, "budgets.json")
+            self.imports_file = os.path.join(self.data_dir, "imports.json")
+            self.journal_mode = config.JOURNAL_MODE
+            self.codec = JsonCodec(config.JSON_FORMAT, config.JSON_PARSER, config.JSON_COMPRESSION)
+            self.sharded = config.STORAGE_LAYOUT == "sharded"
+            self._journal_counts = {}
+            self._damaged_journals = set()
+            self._migrated = set()
+            self.cache_mode = config.CACHE_MODE
+            self._cache = {}
+            self._member_offsets = {}
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self.group_commit_window = config.GROUP_COMMIT_WINDOW_MS / 1000.0
+            self._lock = threading.RLock()
+            self._group_depth = 0
+            self._pending_writes = {}
+            self._pending_removals = set()
+            self._pending_fsyncs = set()
+            self._flush_timer = None
+            self._flush_error = None
+            self._flushing = False
+            self._flush_done = threading.Condition(self._lock)
+            self._write_versions = {}
+            self.write_behind = config.WRITE_BEHIND
+            self.auto_save_interval = config.AUTO_SAVE_INTERVAL_MS / 1000.0
+            self.auto_save_max_dirty = config.AUTO_SAVE_MAX_DIRTY
+            self._dirty_count = 0
+            self._auto_save_wake = threading.Event()
+            self._auto_save_thread = None
+            self.transaction_index_file = os.path.join(self.data_dir, "transactions.idx")
+            self._id_index = None
+            self._id_next = {}
+            self._id_deleted = {}
+            self._id_index_dirty = False
+            self._id_checkpoint_due = False
+            self._fingerprints = {}
+            self.columnar = config.COLUMNAR_STORE
+            self.columnar_dir = os.path.join(self.data_dir, "columnar")
+            self._columns = {}
+            self._columns_dirty = set()
+            self._transactions_version = 0
+            self._transaction_versions = {}
+            self._description_indexes = {}
+            self._trigram_indexes = {}
+            atexit.register(self._shutdown)
+            self._backend = None
             self._ensure_data_directory()
+            if config.STORAGE_BACKEND == "sqlite":
+                from sqlite_store import SqliteStore
+                self.set_backend(SqliteStore(config.SQLITE_FILE))
             self._initialized = True
     
+    def set_backend(self, backend: Optional[Any]) -> None:
+        """Route storage calls to backend, or back to the JSON files when None"""
+        self._backend = backend
+    
     def _ensure_data_directory(self) -> None:
         """Ensure the data directory exists"""
         data_dir = os.path.dirname(self.users_file)
@@ -32,12 +207,13 @@ class JsonHandler:
     def load_users(self) -> Dict[str, Any]:
         """Load users from JSON file"""
         try:
-            if not os.path.exists(self.users_file):
+            if self._backend is not None:
+                return self._backend.load_users()
+            if not self._has_data(self.users_file):
                 # Create empty users file if it doesn't exist
                 self.save_users({})
                 return {}
-            with open(self.users_file, "r") as f:
-                return json.load(f)
+            return self._read_json_file(self.users_file, {})
         except Exception as e:
             print(f"Error loading users: {e}")
             return {}
@@ -45,109 +221,713 @@ class JsonHandler:
     def save_users(self, users: Dict[str, Any]) -> bool:
         """Save users to JSON file"""
         try:
-            with open(self.users_file, "w") as f:
-                json.dump(users, f, indent=4)
+            if self._backend is not None:
+                return self._backend.save_users(users)
+            self._write_json_file(self.users_file, users)
+            self._check_flush_error()
             return True
         except Exception as e:
             print(f"Error saving users: {e}")
             return False
     
     def load_transactions(self) -> Dict[str, Any]:
-        """Load transactions from JSON file"""
+        """Load transactions from JSON file, replaying the journal on top"""
         try:
-            if not os.path.exists(self.transactions_file):
+            if self._backend is not None:
+                return self._backend.load_transactions()
+            if self.sharded:
+                self._ensure_sharded("transactions")
+                return {user_id: self._load_with_journal(user_id)
+                        for user_id in self._list_shards("transactions")}
+            if not self._has_data(self.transactions_file) and not os.path.exists(self.transactions_journal_file):
                 # Initialize with empty dict for first use
                 self.save_transactions({})
                 return {}
-            
-            with open(self.transactions_file, 'r') as f:
-                content = f.read().strip()
-                return json.loads(content) if content else {}
+            return self._load_with_journal()
         except Exception as e:
             print(f"Error loading transactions: {e}")
             return {}
-
+    
+    def load_user_transactions(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load the transactions of a single user"""
+        try:
+            if self._backend is not None:
+                return self._backend.load_user_transactions(user_id)
+            if self.sharded:
+                self._ensure_sharded("transactions")
+                return self._load_with_journal(user_id)
+            if self._whole_file_ready(self.transactions_file, self.transactions_journal_file):
+                return self.load_transactions().get(user_id, [])
+            return self._load_member(self.transactions_file, user_id, [], self.transactions_journal_file)
+        except Exception as e:
+            print(f"Error loading transactions: {e}")
+            return []
+    
     def save_transactions(self, transactions: Dict[str, Any]) -> bool:
-        """Save transactions to JSON file"""
+        """Save transactions to JSON file
+        
+        The full snapshot supersedes the journal, so the journal is cleared.
+        """
         try:
-            with open(self.transactions_file, 'w') as f:
-                json.dump(transactions, f, indent=4)
+            if self._backend is not None:
+                saved = self._backend.save_transactions(transactions)
+                self._transactions_changed()
+                return saved
+            if self.sharded:
+                self._ensure_sharded("transactions")
+                for user_id in set(self._list_shards("transactions")) - set(transactions):
+                    self._remove_shard("transactions", user_id)
+                for user_id, user_transactions in transactions.items():
+                    self._save_with_journal(user_transactions, user_id)
+                self._build_transaction_index(transactions)
+                self._checkpoint_transaction_index()
+                self._fingerprints.clear()
+                self._transactions_changed()
+                self._check_flush_error()
+                return True
+            self._save_with_journal(transactions)
+            self._build_transaction_index(transactions)
+            self._checkpoint_transaction_index()
+            self._fingerprints.clear()
+            self._transactions_changed()
+            self._check_flush_error()
             return True
         except Exception as e:
             print(f"Error saving transactions: {e}")
             return False
     
-    def backup_data(self, backup_dir: str = None) -> bool:
-        """Create backup of all data files"""
+    def save_user_transactions(self, user_id: str, user_transactions: List[Dict[str, Any]]) -> bool:
+        """Replace the transactions of a single user"""
         try:
-            if backup_dir is None:
-                backup_dir = os.path.join(os.path.dirname(__file__), "data", "backup")
-            
-            if not os.path.exists(backup_dir):
-                os.makedirs(backup_dir)
-            
-            import shutil
-            from datetime import datetime
+            if self._backend is not None:
+                saved = self._backend.save_user_transactions(user_id, user_transactions)
+                self._transactions_changed(user_id)
+                return saved
+            if self.sharded:
+                self._ensure_sharded("transactions")
+                self._save_with_journal(user_transactions, user_id)
+                if self._id_index is not None:
+                    self._index_user(user_id, user_transactions)
+                self._checkpoint_transaction_index()
+                self._fingerprints.pop(user_id, None)
+                self._transactions_changed(user_id)
+                self._check_flush_error()
+                return True
+            transactions = self.load_transactions()
+            transactions[user_id] = user_transactions
+            return self.save_transactions(transactions)
+        except Exception as e:
+            print(f"Error saving transactions: {e}")
+            return False
+    
+    def append_transaction(self, transaction: Dict[str, Any]) -> bool:
+        """Persist a single new transaction
+        
+        In journal mode only a small record is appended; otherwise the
+        transactions file (or the user's shard) is rewritten.
+        """
+        record = {"op": "add", "user_id": transaction["user_id"], "transaction": transaction}
+        if self._backend is not None:
+            try:
+                saved = self._backend.append_transaction(transaction)
+            except Exception as e:
+                print(f"Error saving transaction: {e}")
+                return False
+            self._transactions_changed(transaction["user_id"], record)
+            return saved
+        return self._write_transaction_record(record)
+    
+    def append_transactions(self, transactions: List[Dict[str, Any]]) -> bool:
+        """Persist many new transactions in a single write"""
+        records = [{"op": "add", "user_id": transaction["user_id"], "transaction": transaction}
+                   for transaction in transactions]
+        if self._backend is not None:
+            try:
+                saved = self._backend.append_transactions(transactions)
+            except Exception as e:
+                print(f"Error saving transactions: {e}")
+                return False
+            for record in records:
+                self._transactions_changed(record["user_id"], record)
+            return saved
+        if not transactions:
+            return True
+        return self._write_transaction_records(records)
+    
+    def update_transaction(self, user_id: str, transaction_id: str, fields: Dict[str, Any]) -> bool:
+        """Persist changed fields of an existing transaction"""
+        record = {"op": "edit", "user_id": user_id, "transaction_id": transaction_id, "fields": fields}
+        if self._backend is not None:
+            saved = self._backend.update_transaction(user_id, transaction_id, fields)
+            self._transactions_changed(user_id, record if saved else None)
+            return saved
+        return self._write_transaction_record(record)
+    
+    def remove_transaction(self, user_id: str, transaction_id: str) -> bool:
+        """Persist the deletion of a transaction"""
+        record = {"op": "delete", "user_id": user_id, "transaction_id": transaction_id}
+        if self._backend is not None:
+            saved = self._backend.remove_transaction(user_id, transaction_id)
+            self._transactions_changed(user_id, record)
+            return saved
+        return self._write_transaction_record(record)
+    
+    def compact_transactions(self) -> bool:
+        """Fold the journal(s) into the transactions snapshot"""
+        try:
+            if self._backend is not None:
+                return self._backend.compact_transactions()
+            if self.sharded:
+                self._ensure_sharded("transactions")
+                for user_id in self._list_shards("transactions"):
+                    if os.path.exists(self._journal_path(user_id)):
+                        self._save_with_journal(self._load_with_journal(user_id), user_id)
+                self._checkpoint_transaction_index()
+                self._check_flush_error()
+                return True
+            return self.save_transactions(self.load_transactions())
+        except Exception as e:
+            print(f"Error compacting transactions: {e}")
+            return False
+    
+    def _write_transaction_record(self, record: Dict[str, Any]) -> bool:
+        """Persist one add/edit/delete record for a user's transactions"""
+        return self._write_transaction_records([record])
+    
+    def _write_transaction_records(self, records: List[Dict[str, Any]]) -> bool:
+        """Persist add/edit/delete records, with one write per file touched"""
+        try:
+            with self._lock:
+                groups = {}
+                for record in records:
+                    groups.setdefault(record["user_id"] if self.sharded else None, []).append(record)
+                for user_id, group in groups.items():
+                    positions = [self._indexed_position(record) for record in group]
+                    changes = [self._fingerprint_changes(record) for record in group]
+                    # Rows shift as a group is applied, so only a lone edit/delete is located
+                    rows = [self._column_row(record, position) if len(group) == 1 else None
+                            for record, position in zip(group, positions)]
+                    self._write_records_to(group, user_id, positions)
+                    for record, change, row in zip(group, changes, rows):
+                        self._index_record(record)
+                        self._apply_fingerprint_changes(record["user_id"], change)
+                        self._transactions_changed(record["user_id"], record, row)
+                self._checkpoint_transaction_index()
+                self._check_flush_error()
+                return True
+        except Exception as e:
+            print(f"Error writing transaction journal: {e}")
+            return False
+    
+    def _write_records_to(self, records: List[Dict[str, Any]], user_id: Optional[str],
+                          positions: List[Optional[int]]) -> None:
+        """Write records to the snapshot or journal of user_id; the caller holds the lock"""
+        if self.sharded:
+            self._ensure_sharded("transactions")
+        if not self.journal_mode:
+            if self.sharded:
+                transactions = {user_id: self._load_with_journal(user_id)}
+            else:
+                transactions = self.load_transactions()
+            self._replay_journal(transactions, records)
+            self._save_with_journal(transactions[user_id] if self.sharded else transactions, user_id)
+            return
+        
+        journal_file = self._journal_path(user_id)
+        if journal_file not in self._journal_counts:
+            self._journal_counts[journal_file] = len(self._read_journal(journal_file))
+        
+        # Inside a group commit, while a snapshot write is pending, or when the
+        # journal would need compacting anyway, the records are folded into
+        # the snapshot, which is then written once
+        if (self._group_depth > 0 or journal_file in self._pending_removals
+                or self._journal_counts[journal_file] + len(records) >= config.JOURNAL_COMPACT_THRESHOLD):
+            transactions = self._load_with_journal(user_id)
+            wrapped = transactions if user_id is None else {user_id: transactions}
+            for record, position in zip(records, positions):
+                self._apply_journal_record(wrapped, record, position=position)
+            self._save_with_journal(transactions, user_id)
+            return
+        
+        snapshot_file = self._snapshot_path(user_id)
+        cache_paths = (snapshot_file, journal_file)
+        cached = self._cache_get(snapshot_file, cache_paths, count=False)
+        cached_members = {}
+        if user_id is None:
+            for record in records:
+                member_key = (snapshot_file, record["user_id"])
+                if member_key not in cached_members:
+                    cached_members[member_key] = self._cache_get(member_key, cache_paths, count=False)
+        
+        with open(journal_file, 'ab+') as f:
+            self._repair_journal_tail(f, journal_file)
+            f.write(b"".join(self.codec.dumps_line(record) + b"\n" for record in records))
+            f.flush()
+            if self._deferring():
+                self._pending_fsyncs.add(journal_file)
+                self._schedule_flush()
+            else:
+                os.fsync(f.fileno())
+        self._journal_counts[journal_file] += len(records)
+        
+        # Keep valid cached copies in step instead of re-reading them later
+        if cached is not self._MISS:
+            transactions = cached if user_id is None else {user_id: cached}
+            for record, position in zip(records, positions):
+                self._apply_journal_record(transactions, record, position=position)
+            self._cache_put(snapshot_file, cache_paths, cached)
+        for member_key, cached_member in cached_members.items():
+            if cached_member is self._MISS:
+                continue
+            for record, position in zip(records, positions):
+                if record["user_id"] == member_key[1]:
+                    self._apply_journal_record({member_key[1]: cached_member}, record, position=position)
+            self._cache_put(member_key, cache_paths, cached_member)
+    
+    def _load_with_journal(self, user_id: Optional[str] = None) -> Any:
+        """Load a transactions snapshot and replay its journal on top
+        
+        With user_id the user's shard (a list) is loaded, otherwise the
+        multi-user transactions file (a dict keyed by user ID).
+        """
+        with self._lock:
+            snapshot_file = self._snapshot_path(user_id)
+            journal_file = self._journal_path(user_id)
+            cache_paths = (snapshot_file, journal_file)
+            signature = self._cache_signature(cache_paths)
+            cached = self._cache_get(snapshot_file, cache_paths, signature)
+            if cached is not self._MISS:
+                return cached
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            if user_id is None:
+                transactions = self._read_json_file(snapshot_file, {}, use_cache=False)
+            else:
+                transactions = {user_id: self._read_json_file(snapshot_file, [], use_cache=False)}
+            for user_transactions in transactions.values():
+                TransactionRecord.from_dicts(user_transactions)
             
-            # Backup users
-            if os.path.exists(self.users_file):
-                shutil.copy2(self.users_file, os.path.join(backup_dir, f"users_{timestamp}.json"))
+            # A journal awaiting removal is already folded into the pending snapshot
+            records = [] if journal_file in self._pending_removals else self._read_journal(journal_file)
+            if records:
+                self._replay_journal(transactions, records)
+            self._journal_counts[journal_file] = len(records)
             
-            # Backup transactions
-            if os.path.exists(self.transactions_file):
-                shutil.copy2(self.transactions_file, os.path.join(backup_dir, f"transactions_{timestamp}.json"))
+            result = transactions if user_id is None else transactions.get(user_id, [])
+            self._cache_put(snapshot_file, cache_paths, result, signature)
+            return result
+    
+    def _save_with_journal(self, transactions: Any, user_id: Optional[str] = None) -> None:
+        """Write a full transactions snapshot and drop the journal it supersedes"""
+        with self._lock:
+            snapshot_file = self._snapshot_path(user_id)
+            journal_file = self._journal_path(user_id)
+            # Written and cached as compact records, whatever the caller passed
+            # in, so a float "amount" from older data is saved as integer cents
+            for user_transactions in (transactions.values() if user_id is None else [transactions]):
+                TransactionRecord.from_dicts(user_transactions)
+            self._write_json_file(snapshot_file, transactions, use_cache=False)
+            if self._deferring():
+                # Removed by flush() once the snapshot is safely on disk
+                self._pending_removals.add(journal_file)
+                self._pending_fsyncs.discard(journal_file)
+            else:
+                self._drop_journal(journal_file)
+            self._journal_counts[journal_file] = 0
+            self._cache_put(snapshot_file, (snapshot_file, journal_file), transactions)
+            # The ID index is written next to the snapshot once the caller has
+            # brought it up to date (see _checkpoint_transaction_index)
+            self._id_checkpoint_due = True
+    
+    def _snapshot_path(self, user_id: Optional[str] = None) -> str:
+        """Path of the transactions snapshot (the user's shard when user_id is given)"""
+        if user_id is None:
+            return self.transactions_file
+        return self._shard_path("transactions", user_id)
+    
+    def _journal_path(self, user_id: Optional[str] = None) -> str:
+        """Path of the transactions journal (the user's shard journal when user_id is given)"""
+        if user_id is None:
+            return self.transactions_journal_file
+        return self._shard_path("transactions", user_id, ".journal")
+    
+    def _read_journal(self, journal_file: str) -> List[Dict[str, Any]]:
+        """Read all readable records from a transactions journal
+        
+        A final line without its newline is a write that was interrupted
+        before it returned, and is ignored if it does not parse. Any other
+        unreadable line is reported and skipped, the records after it are
+        still read, and the journal is marked damaged so that it is kept
+        rather than deleted once a snapshot supersedes it (see _drop_journal).
+        """
+        records = []
+        if not os.path.exists(journal_file):
+            return records
+        with open(journal_file, 'rb') as f:
+            for number, line in enumerate(f, 1):
+                complete = line.endswith(b"\n")
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(self.codec.loads(line))
+                except ValueError:
+                    if not complete:
+                        break
+                    if journal_file not in self._damaged_journals:
+                        print(f"Warning: skipped unreadable line {number} of {journal_file}")
+                    self._damaged_journals.add(journal_file)
+        return records
+    
+    def _repair_journal_tail(self, f: Any, journal_file: str) -> None:
+        """Make sure the next record appended to an open journal starts on a new line
+        
+        A final line without its newline was cut short by an interrupted
+        write. It is finished with a newline if it still parses and cut off
+        otherwise, so a new record is never glued onto it.
+        """
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(size - 1)
+        if f.read(1) == b"\n":
+            return
+        start = size
+        while start > 0:
+            step = min(start, 65536)
+            f.seek(start - step)
+            newline = f.read(step).rfind(b"\n")
+            start -= step
+            if newline >= 0:
+                start += newline + 1
+                break
+        f.seek(start)
+        try:
+            self.codec.loads(f.read())
+            f.write(b"\n")
+        except ValueError:
+            f.truncate(start)
+            print(f"Warning: discarded an incomplete record at the end of {journal_file}")
+    
+    def _drop_journal(self, journal_file: str) -> None:
+        """Delete a journal superseded by a snapshot
+        
+        A journal with unreadable lines is renamed to <name>.damaged-<time>
+        instead, so the records that could not be replayed can still be
+        recovered by hand.
+        """
+        if journal_file in self._damaged_journals:
+            self._damaged_journals.discard(journal_file)
+            if os.path.exists(journal_file):
+                kept = f"{journal_file}.damaged-{time.strftime('%Y%m%d-%H%M%S')}"
+                os.replace(journal_file, kept)
+                print(f"Warning: the journal had unreadable lines and was kept as {kept}")
+                return
+        if os.path.exists(journal_file):
+            os.remove(journal_file)
+    
+    @staticmethod
+    def _replay_journal(transactions: Dict[str, Any], records: List[Dict[str, Any]]) -> None:
+        """Apply journal records to a transactions snapshot in place
+        
+        Replay is idempotent, so a journal left behind by an interrupted
+        compaction can safely be applied to the new snapshot again.
+        """
+        known_ids = {t["transaction_id"] for user_transactions in transactions.values()
+                     for t in user_transactions}
+        for record in records:
+            JsonHandler._apply_journal_record(transactions, record, known_ids)
+    
+    @staticmethod
+    def _apply_journal_record(transactions: Dict[str, Any], record: Dict[str, Any],
+                              known_ids: Optional[set] = None, position: Optional[int] = None) -> None:
+        """Apply a single journal record; known_ids makes repeated adds no-ops
+        
+        position is where the transaction is expected in the user's list (from
+        the transaction ID index); it is checked and the list scanned if wrong.
+        """
+        op = record.get("op")
+        if op == "add":
+            transaction = record["transaction"]
+            if known_ids is None or transaction["transaction_id"] not in known_ids:
+                transactions.setdefault(record["user_id"], []).append(TransactionRecord.from_dict(transaction))
+                if known_ids is not None:
+                    known_ids.add(transaction["transaction_id"])
+            return
+        
+        user_transactions = transactions.get(record["user_id"], [])
+        if (position is not None and position < len(user_transactions)
+                and user_transactions[position]["transaction_id"] == record["transaction_id"]):
+            if op == "edit":
+                user_transactions[position].update(record["fields"])
+            elif op == "delete":
+                del user_transactions[position]
+                if known_ids is not None:
+                    known_ids.discard(record["transaction_id"])
+            return
+        
+        if op == "edit":
+            for transaction in user_transactions:
+                if transaction["transaction_id"] == record["transaction_id"]:
+                    transaction.update(record["fields"])
+                    break
+        elif op == "delete":
+            for i, transaction in enumerate(user_transactions):
+                if transaction["transaction_id"] == record["transaction_id"]:
+                    del user_transactions[i]
+                    if known_ids is not None:
+                        known_ids.discard(record["transaction_id"])
+                    break
+    
+    def backup_data(self, backup_dir: str = None) -> bool:
+        """Create an incremental backup of all data files
+        
+        Only chunks not already in the backup store are written, plus a
+        small manifest; older backups beyond config.BACKUP_KEEP are pruned.
+        """
+        try:
+            manifest = self.create_backup(backup_dir)
+            return manifest is not None
+        except Exception as e:
+            print(f"Error creating backup: {e}")
+            return False
+    
+    def create_backup(self, backup_dir: str = None) -> Optional[Dict[str, Any]]:
+        """Create an incremental backup and return its manifest (None on error)"""
+        try:
+            from backup_store import BackupStore
+            store = BackupStore(backup_dir or config.BACKUP_DIR)
             
-            # Backup bills
-            if os.path.exists(self.bills_file):
-                shutil.copy2(self.bills_file, os.path.join(backup_dir, f"bills_{timestamp}.json"))
+            if not self.flush():
+                raise IOError("unsaved changes could not be written before the backup")
+            with self._lock:
+                self._wait_for_flush()
+                files = self._backup_files(store.backup_dir)
+                snapshot_dir = None
+                if self._backend is not None and hasattr(self._backend, "backup"):
+                    # A consistent copy of the live database, chunked like any other file
+                    snapshot_dir = tempfile.mkdtemp(prefix=".db_backup_", dir=self.data_dir)
+                    db_copy = os.path.join(snapshot_dir, os.path.basename(self._backend.db_file))
+                    self._backend.backup(db_copy)
+                    files[os.path.basename(self._backend.db_file)] = db_copy
+                try:
+                    manifest = store.create(files)
+                finally:
+                    if snapshot_dir is not None:
+                        shutil.rmtree(snapshot_dir, ignore_errors=True)
             
-            # Backup budgets
-            if os.path.exists(self.budgets_file):
-                shutil.copy2(self.budgets_file, os.path.join(backup_dir, f"budgets_{timestamp}.json"))
+            if config.BACKUP_KEEP > 0:
+                store.prune(config.BACKUP_KEEP)
+            return manifest
+        except Exception as e:
+            print(f"Error creating backup: {e}")
+            return None
+    
+    def list_backups(self, backup_dir: str = None) -> List[Dict[str, Any]]:
+        """Summaries of the available backups, oldest first"""
+        try:
+            from backup_store import BackupStore
+            return BackupStore(backup_dir or config.BACKUP_DIR).list()
+        except Exception as e:
+            print(f"Error listing backups: {e}")
+            return []
+    
+    def prune_backups(self, keep: int, backup_dir: str = None) -> Dict[str, int]:
+        """Keep the newest keep backups and drop chunks no remaining backup uses"""
+        try:
+            from backup_store import BackupStore
+            return BackupStore(backup_dir or config.BACKUP_DIR).prune(keep)
+        except Exception as e:
+            print(f"Error pruning backups: {e}")
+            return {"backups": 0, "chunks": 0}
+    
+    def restore_backup(self, backup_id: str, backup_dir: str = None) -> bool:
+        """Replace the current data with the contents of a backup
+        
+        Every file is first rebuilt from its checked chunks in a staging
+        directory, so a damaged or incomplete backup leaves the current data
+        untouched. Only then are the files moved into place and data files
+        that did not exist when the backup was taken (such as a newer
+        journal) removed. All in-memory state is dropped.
+        """
+        try:
+            from backup_store import BackupStore
+            store = BackupStore(backup_dir or config.BACKUP_DIR)
+            manifest = store.load_manifest(backup_id)
             
+            if not self.flush():
+                raise IOError("unsaved changes could not be written before the restore")
+            with self._lock:
+                self._wait_for_flush()
+                db_name = os.path.basename(self._backend.db_file) if self._backend is not None else None
+                staging_dir = tempfile.mkdtemp(prefix=".restore_", dir=self.data_dir)
+                try:
+                    staged = {}
+                    for name, entry in manifest["files"].items():
+                        staged[name] = os.path.join(staging_dir, *name.split("/"))
+                        store.restore_file(entry, staged[name])
+                    
+                    # The database is the one step that can still fail, so it goes first
+                    db_copy = staged.pop(db_name, None)
+                    if db_copy is not None and hasattr(self._backend, "restore"):
+                        self._backend.restore(db_copy)
+                    
+                    for name, path in self._backup_files(store.backup_dir).items():
+                        if name not in staged:
+                            os.remove(path)
+                    for name, path in staged.items():
+                        target = os.path.join(self.data_dir, *name.split("/"))
+                        os.makedirs(os.path.dirname(target), exist_ok=True)
+                        os.replace(path, target)
+                finally:
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                if os.path.exists(self.transaction_index_file):
+                    os.remove(self.transaction_index_file)
+                self._reset_state()
             return True
         except Exception as e:
-            print(f"Error creating backup: {e}")
+            print(f"Error restoring backup: {e}")
             return False
     
+    def _backup_files(self, backup_dir: str) -> Dict[str, str]:
+        """{path relative to the data directory: path} of every file a backup covers
+        
+        Skips the backup store itself, temporary files, the transaction ID
+        index and columnar store (both rebuilt on demand), the live database
+        when it is in use, and the damaged journals and migrated single files
+        kept aside for inspection, which a restore must not delete either.
+        """
+        skip = {os.path.abspath(self.transaction_index_file)}
+        if self._backend is not None:
+            db_file = os.path.abspath(self._backend.db_file)
+            skip.update({db_file, db_file + "-wal", db_file + "-shm"})
+        skip_dirs = {os.path.abspath(backup_dir), os.path.abspath(self.columnar_dir)}
+        files = {}
+        for root, dirs, names in os.walk(self.data_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".")
+                       and os.path.abspath(os.path.join(root, d)) not in skip_dirs]
+            for name in names:
+                path = os.path.join(root, name)
+                if (name.startswith(".") or ".damaged-" in name or name.endswith(".migrated")
+                        or os.path.abspath(path) in skip):
+                    continue
+                files[os.path.relpath(path, self.data_dir).replace(os.sep, "/")] = path
+        return files
+    
+    def _reset_state(self) -> None:
+        """Forget everything cached about the data files after they changed underneath"""
+        self._cache.clear()
+        self._member_offsets.clear()
+        self._journal_counts.clear()
+        self._damaged_journals.clear()
+        self._migrated.clear()
+        self._fingerprints.clear()
+        self._columns.clear()
+        self._columns_dirty.clear()
+        self._description_indexes.clear()
+        self._trigram_indexes.clear()
+        clear_interned()
+        self._id_index = None
+        self._id_next = {}
+        self._id_deleted = {}
+        self._id_index_dirty = False
+        self._id_checkpoint_due = False
+    
     def load_bills(self) -> Dict[str, Any]:
         """Load bills from JSON file"""
         try:
-            if not os.path.exists(self.bills_file):
+            if self._backend is not None:
+                return self._backend.load_bills()
+            if self.sharded:
+                self._ensure_sharded("bills")
+                return {user_id: self._read_json_file(self._shard_path("bills", user_id), [])
+                        for user_id in self._list_shards("bills")}
+            if not self._has_data(self.bills_file):
                 # Create empty bills file if it doesn't exist
                 self.save_bills({})
                 return {}
-            
-            with open(self.bills_file, 'r') as f:
-                content = f.read().strip()
-                return json.loads(content) if content else {}
+            return self._read_json_file(self.bills_file, {})
         except Exception as e:
             print(f"Error loading bills: {e}")
             return {}
     
+    def load_user_bills(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load the bills of a single user"""
+        try:
+            if self._backend is not None:
+                return self._backend.load_user_bills(user_id)
+            if self.sharded:
+                self._ensure_sharded("bills")
+                return self._read_json_file(self._shard_path("bills", user_id), [])
+            if self._whole_file_ready(self.bills_file):
+                return self.load_bills().get(user_id, [])
+            return self._load_member(self.bills_file, user_id, [])
+        except Exception as e:
+            print(f"Error loading bills: {e}")
+            return []
+    
     def save_bills(self, bills: Dict[str, Any]) -> bool:
         """Save bills to JSON file"""
         try:
-            with open(self.bills_file, 'w') as f:
-                json.dump(bills, f, indent=4)
+            if self._backend is not None:
+                return self._backend.save_bills(bills)
+            if self.sharded:
+                self._ensure_sharded("bills")
+                self._save_all_shards("bills", bills)
+                self._check_flush_error()
+                return True
+            self._write_json_file(self.bills_file, bills)
+            self._check_flush_error()
             return True
         except Exception as e:
             print(f"Error saving bills: {e}")
             return False
     
+    def save_user_bills(self, user_id: str, user_bills: List[Dict[str, Any]]) -> bool:
+        """Replace the bills of a single user"""
+        try:
+            if self._backend is not None:
+                return self._backend.save_user_bills(user_id, user_bills)
+            if self.sharded:
+                self._ensure_sharded("bills")
+                self._write_json_file(self._shard_path("bills", user_id), user_bills)
+                self._check_flush_error()
+                return True
+            bills = self.load_bills()
+            bills[user_id] = user_bills
+            return self.save_bills(bills)
+        except Exception as e:
+            print(f"Error saving bills: {e}")
+            return False
+    
     def load_budgets(self) -> Dict[str, Any]:
         """Load budgets from JSON file"""
         try:
-            if not os.path.exists(self.budgets_file):
+            if self._backend is not None:
+                return self._backend.load_budgets()
+            if self.sharded:
+                self._ensure_sharded("budgets")
+                return {user_id: self._read_json_file(self._shard_path("budgets", user_id), {})
+                        for user_id in self._list_shards("budgets")}
+            if not self._has_data(self.budgets_file):
                 # Create empty budgets file if it doesn't exist
                 self.save_budgets({})
                 return {}
-            
-            with open(self.budgets_file, 'r') as f:
-                content = f.read().strip()
-                return json.loads(content) if content else {}
+            return self._read_json_file(self.budgets_file, {})
+        except Exception as e:
+            print(f"Error loading budgets: {e}")
+            return {}
+    
+    def load_user_budgets(self, user_id: str) -> Dict[str, Any]:
+        """Load the budgets of a single user as {month: {category: amount}}"""
+        try:
+            if self._backend is not None:
+                return self._backend.load_user_budgets(user_id)
+            if self.sharded:
+                self._ensure_sharded("budgets")
+                return self._read_json_file(self._shard_path("budgets", user_id), {})
+            if self._whole_file_ready(self.budgets_file):
+                return self.load_budgets().get(user_id, {})
+            return self._load_member(self.budgets_file, user_id, {})
         except Exception as e:
             print(f"Error loading budgets: {e}")
             return {}
@@ -155,9 +935,1029 @@ class JsonHandler:
     def save_budgets(self, budgets: Dict[str, Any]) -> bool:
         """Save budgets to JSON file"""
         try:
-            with open(self.budgets_file, 'w') as f:
-                json.dump(budgets, f, indent=4)
+            if self._backend is not None:
+                return self._backend.save_budgets(budgets)
+            if self.sharded:
+                self._ensure_sharded("budgets")
+                self._save_all_shards("budgets", budgets)
+                self._check_flush_error()
+                return True
+            self._write_json_file(self.budgets_file, budgets)
+            self._check_flush_error()
             return True
         except Exception as e:
             print(f"Error saving budgets: {e}")
             return False
+    
+    def save_user_budgets(self, user_id: str, user_budgets: Dict[str, Any]) -> bool:
+        """Replace the budgets of a single user"""
+        try:
+            if self._backend is not None:
+                return self._backend.save_user_budgets(user_id, user_budgets)
+            if self.sharded:
+                self._ensure_sharded("budgets")
+                self._write_json_file(self._shard_path("budgets", user_id), user_budgets)
+                self._check_flush_error()
+                return True
+            budgets = self.load_budgets()
+            budgets[user_id] = user_budgets
+            return self.save_budgets(budgets)
+        except Exception as e:
+            print(f"Error saving budgets: {e}")
+            return False
+    
+    def load_imports(self) -> Dict[str, Any]:
+        """Load import checkpoints keyed by user ID and source file hash"""
+        try:
+            if self._backend is not None:
+                return self._backend.load_imports()
+            return self._read_json_file(self.imports_file, {})
+        except Exception as e:
+            print(f"Error loading import checkpoints: {e}")
+            return {}
+    
+    def save_imports(self, imports: Dict[str, Any]) -> bool:
+        """Save import checkpoints"""
+        try:
+            if self._backend is not None:
+                return self._backend.save_imports(imports)
+            self._write_json_file(self.imports_file, imports)
+            self._check_flush_error()
+            return True
+        except Exception as e:
+            print(f"Error saving import checkpoints: {e}")
+            return False
+    
+    # ------------------------------
+    # File helpers
+    # ------------------------------
+    
+    def _read_json_file(self, path: str, default: Any, use_cache: bool = True) -> Any:
+        """Parse a JSON file, returning default when it is missing or empty"""
+        pending = self._pending_writes.get(path, self._MISS)
+        if pending is not self._MISS:
+            return pending
+        
+        if use_cache:
+            signature = self._cache_signature((path,))
+            cached = self._cache_get(path, (path,), signature)
+            if cached is not self._MISS:
+                return cached
+        
+        data = default
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                data = self.codec.decode(f.read(), default)
+        
+        if use_cache:
+            self._cache_put(path, (path,), data, signature)
+        return data
+    
+    def _write_json_file(self, path: str, data: Any, use_cache: bool = True) -> None:
+        """Serialize data to a JSON file, deferring the write while commits are grouped"""
+        with self._lock:
+            self._cache_invalidate_members(path)
+            if self._deferring():
+                self._pending_writes[path] = data
+                self._write_versions[path] = self._write_versions.get(path, 0) + 1
+                self._schedule_flush()
+            else:
+                self._atomic_write(path, self.codec.encode(data))
+            if use_cache:
+                self._cache_put(path, (path,), data)
+    
+    def _has_data(self, path: str) -> bool:
+        """Whether path exists on disk, in the cache or as a pending write"""
+        return path in self._cache or path in self._pending_writes or os.path.exists(path)
+    
+    def _atomic_write(self, path: str, payload: bytes) -> None:
+        """Replace path with payload so readers see either the old or the new file, never a torn one"""
+        directory = os.path.dirname(path) or "."
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix="." + os.path.basename(path) + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(path):
+                os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._fsync_directory(directory)
+    
+    @staticmethod
+    def _fsync_directory(directory: str) -> None:
+        """Make a rename or unlink in directory durable (no-op where unsupported)"""
+        if os.name != "posix":
+            return
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    # ------------------------------
+    # Group commit
+    # ------------------------------
+    
+    @contextmanager
+    def group_commit(self):
+        """Coalesce every save made inside the block into one durable write per file
+        
+        Usage:
+            with json_handler.group_commit():
+                ...  # many saves / appends
+        """
+        with self._lock:
+            self._group_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._group_depth -= 1
+                flushed = self._group_depth > 0 or self.flush()
+        if not flushed:
+            raise IOError("The saves made in group_commit() could not be written")
+    
+    def flush(self) -> bool:
+        """Write out every pending save now
+        
+        Returns False if this write failed, or if a write made in the
+        background (by the group commit timer or auto-save) failed since the
+        last save or flush reported one. Data that could not be written stays
+        pending, so a later flush tries again.
+        """
+        written = self._write_pending()
+        with self._lock:
+            error, self._flush_error = self._flush_error, None
+        return written and error is None
+    
+    def _write_pending(self) -> bool:
+        """Write out every pending save, remembering the error if it fails
+        
+        Pending data is encoded under the lock, but the files are written and
+        fsynced outside it, so other threads keep reading (from the pending
+        copies) and saving while a flush is on disk. Flushes run one at a time.
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            while self._flushing:
+                self._flush_done.wait()
+            if not (self._pending_writes or self._pending_removals or self._pending_fsyncs):
+                return True
+            self._flushing = True
+            self._dirty_count = 0
+            versions = {path: self._write_versions.get(path) for path in self._pending_writes}
+            removals = list(self._pending_removals)
+            fsyncs = list(self._pending_fsyncs)
+            written = set()
+            removed = set()
+            synced = set()
+            try:
+                payloads = [(path, self.codec.encode(data)) for path, data in self._pending_writes.items()]
+            except Exception as e:
+                self._flushing = False
+                self._flush_done.notify_all()
+                self._flush_error = e
+                print(f"Error flushing data files: {e}")
+                return False
+        
+        try:
+            for path, payload in payloads:
+                self._atomic_write(path, payload)
+                written.add(path)
+            
+            # Journals go only after the snapshots replacing them are durable
+            for journal_file in removals:
+                if os.path.exists(journal_file):
+                    self._drop_journal(journal_file)
+                    self._fsync_directory(os.path.dirname(journal_file) or ".")
+                removed.add(journal_file)
+            
+            for journal_file in fsyncs:
+                if os.path.exists(journal_file):
+                    with open(journal_file, 'a') as f:
+                        os.fsync(f.fileno())
+                synced.add(journal_file)
+            return True
+        except Exception as e:
+            with self._lock:
+                self._flush_error = e
+            print(f"Error flushing data files: {e}")
+            return False
+        finally:
+            with self._lock:
+                # Saves made while the files were written stay pending
+                for path in written:
+                    if self._write_versions.get(path) == versions[path]:
+                        self._pending_writes.pop(path, None)
+                self._pending_removals.difference_update(removed)
+                self._pending_fsyncs.difference_update(synced)
+                self._cache_restamp(written | removed | synced)
+                self._flushing = False
+                self._flush_done.notify_all()
+                if not (self._pending_writes or self._pending_removals):
+                    self._checkpoint_transaction_index()
+    
+    def _check_flush_error(self) -> None:
+        """Raise the error of a failed deferred write (once), so the save being made reports it
+        
+        Called at the end of each save, once its own data is written or
+        pending, so that data is kept (and written by the next flush) while
+        the caller still learns that an earlier save has not reached disk.
+        """
+        with self._lock:
+            error, self._flush_error = self._flush_error, None
+        if error is not None:
+            raise IOError(f"an earlier save could not be written: {error}")
+    
+    def _wait_for_flush(self) -> None:
+        """Block until a flush running in another thread is done; the caller holds the lock"""
+        while self._flushing:
+            self._flush_done.wait()
+    
+    def _deferring(self) -> bool:
+        """Whether writes are currently collected for a later flush()"""
+        return self._group_depth > 0 or self.group_commit_window > 0 or self.write_behind
+    
+    def _schedule_flush(self) -> None:
+        """Arm the group commit timer, or wake the auto-save thread, unless a flush is already due"""
+        if self._group_depth > 0:
+            return
+        if self.write_behind:
+            self._dirty_count += 1
+            if self._auto_save_thread is None:
+                self._auto_save_thread = threading.Thread(target=self._auto_save_loop,
+                                                          name="pfm-auto-save", daemon=True)
+                self._auto_save_thread.start()
+            if self._dirty_count >= self.auto_save_max_dirty:
+                self._auto_save_wake.set()
+            return
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(self.group_commit_window, self._write_pending)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+    
+    # ------------------------------
+    # Write-behind auto-save
+    # ------------------------------
+    
+    def set_write_behind(self, enabled: bool, interval_ms: Optional[int] = None,
+                         max_dirty: Optional[int] = None) -> None:
+        """Turn write-behind auto-save on or off
+        
+        While on, saves return once the data is marked dirty in memory; a
+        background thread writes it out every interval_ms, or as soon as
+        max_dirty saves are waiting. Turning it off flushes everything.
+        """
+        with self._lock:
+            if interval_ms is not None:
+                self.auto_save_interval = interval_ms / 1000.0
+            if max_dirty is not None:
+                self.auto_save_max_dirty = max_dirty
+            self.write_behind = enabled
+        if not enabled:
+            self._write_pending()
+        self._auto_save_wake.set()
+    
+    def dirty_count(self) -> int:
+        """Number of saves made since the last flush that are not on disk yet"""
+        return self._dirty_count
+    
+    def _auto_save_loop(self) -> None:
+        """Background thread: flush on every interval or when woken early"""
+        while True:
+            self._auto_save_wake.wait(self.auto_save_interval)
+            self._auto_save_wake.clear()
+            self._write_pending()
+            with self._lock:
+                if not self.write_behind:
+                    self._auto_save_thread = None
+                    return
+    
+    # ------------------------------
+    # Transaction ID index
+    # ------------------------------
+    
+    def find_transaction(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a transaction of any user by its ID
+        
+        Uses the index from transaction_id to (user_id, position), so only the
+        owning user's transactions are loaded.
+        """
+        try:
+            if self._backend is not None:
+                return self._backend.find_transaction(transaction_id)
+            with self._lock:
+                index = self._transaction_index()
+                entry = index.get(transaction_id)
+                if entry is None:
+                    return None
+                user_id = entry[0]
+                position = self._indexed_position({"user_id": user_id, "transaction_id": transaction_id})
+                user_transactions = self.load_user_transactions(user_id)
+                if position >= len(user_transactions) or \
+                        user_transactions[position]["transaction_id"] != transaction_id:
+                    # The list changed in a way the index did not follow
+                    self._index_user(user_id, user_transactions)
+                    entry = index.get(transaction_id)
+                    position = entry[1] if entry is not None else len(user_transactions)
+                    if position >= len(user_transactions) or \
+                            user_transactions[position]["transaction_id"] != transaction_id:
+                        index.pop(transaction_id, None)
+                        return None
+                return user_transactions[position]
+        except Exception as e:
+            print(f"Error finding transaction: {e}")
+            return None
+    
+    def _transaction_index(self) -> Dict[str, tuple]:
+        """The transaction ID index, loaded from disk or rebuilt when missing or stale"""
+        if self._id_index is not None:
+            return self._id_index
+        
+        self._write_pending()
+        signature = self._transaction_files_signature()
+        try:
+            stored = self._read_json_file(self.transaction_index_file, None, use_cache=False)
+        except ValueError:
+            stored = None
+        if stored is not None and stored.get("signature") == signature:
+            self._build_transaction_index(stored["users"])
+            self._id_index_dirty = False
+            return self._id_index
+        
+        self._build_transaction_index(self.load_transactions())
+        self._save_transaction_index()
+        return self._id_index
+    
+    def _build_transaction_index(self, transactions: Dict[str, Any]) -> None:
+        """Index every user's transactions (or lists of transaction IDs)"""
+        self._id_index = {}
+        self._id_next = {}
+        self._id_deleted = {}
+        for user_id, user_transactions in transactions.items():
+            self._index_user(user_id, user_transactions)
+        self._id_index_dirty = True
+    
+    def _index_user(self, user_id: str, user_transactions: List[Any]) -> None:
+        """(Re)index the positions of one user's transactions"""
+        index = self._id_index
+        for position, transaction in enumerate(user_transactions):
+            transaction_id = transaction if isinstance(transaction, str) else transaction["transaction_id"]
+            index[transaction_id] = (user_id, position)
+        self._id_next[user_id] = len(user_transactions)
+        self._id_deleted[user_id] = []
+        self._id_index_dirty = True
+    
+    def _indexed_position(self, record: Dict[str, Any]) -> Optional[int]:
+        """Expected list position of the transaction an edit/delete record refers to
+        
+        The index stores a sequence number per transaction and, per user, the
+        sorted sequence numbers of deleted transactions, so a delete costs a
+        tombstone instead of renumbering every later transaction. The position
+        is the sequence number less the tombstones before it.
+        """
+        if self._id_index is None or record.get("op") == "add":
+            return None
+        entry = self._id_index.get(record["transaction_id"])
+        if entry is None or entry[0] != record["user_id"]:
+            return None
+        user_id, sequence = entry
+        return sequence - bisect_left(self._id_deleted.get(user_id, ()), sequence)
+    
+    def _index_record(self, record: Dict[str, Any]) -> None:
+        """Keep the index in step with an add/delete record (edits keep positions)"""
+        if self._id_index is None:
+            return
+        user_id = record["user_id"]
+        if record["op"] == "add":
+            transaction_id = record["transaction"]["transaction_id"]
+            if transaction_id not in self._id_index:
+                self._id_index[transaction_id] = (user_id, self._id_next.get(user_id, 0))
+                self._id_next[user_id] = self._id_next.get(user_id, 0) + 1
+        elif record["op"] == "delete":
+            entry = self._id_index.pop(record["transaction_id"], None)
+            if entry is not None:
+                insort(self._id_deleted.setdefault(entry[0], []), entry[1])
+        else:
+            return
+        self._id_index_dirty = True
+    
+    def _checkpoint_transaction_index(self) -> None:
+        """Write the ID index if a snapshot was written since it was last saved
+        
+        Saved with the snapshot, the index is current after a restart even if
+        the process does not exit cleanly. While writes are deferred it waits
+        for the flush that puts the snapshot on disk, since the index records
+        the signature of the files as they are on disk.
+        """
+        with self._lock:
+            if not self._id_checkpoint_due or self._id_index is None:
+                return
+            if self._pending_writes or self._pending_removals:
+                return
+            self._id_checkpoint_due = False
+            self._id_index_dirty = True
+            try:
+                self._save_transaction_index()
+            except Exception as e:
+                # Only a cache: it is written again at exit, or rebuilt
+                print(f"Error saving transaction index: {e}")
+    
+    def _save_transaction_index(self) -> None:
+        """Persist the index together with the signature of the files it describes
+        
+        Positions are stored as each user's list of IDs, and the index is
+        renumbered from those lists, which also clears the tombstones of deletes.
+        """
+        if self._id_index is None or not self._id_index_dirty:
+            return
+        users = {}
+        for transaction_id, (user_id, sequence) in sorted(self._id_index.items(), key=lambda item: item[1]):
+            users.setdefault(user_id, []).append(transaction_id)
+        stored = {"signature": self._transaction_files_signature(), "users": users}
+        self._atomic_write(self.transaction_index_file, self.codec.encode(stored))
+        self._id_next = {}
+        self._id_deleted = {}
+        for user_id, transaction_ids in users.items():
+            self._index_user(user_id, transaction_ids)
+        self._id_index_dirty = False
+    
+    def _transaction_files_signature(self) -> List[Any]:
+        """[name, mtime, size] of every transactions snapshot and journal"""
+        if self.sharded:
+            shard_dir = self._shard_dir("transactions")
+            paths = [os.path.join(shard_dir, name) for name in sorted(os.listdir(shard_dir))
+                     if name.endswith((".json", ".journal")) and not name.startswith(".")] \
+                if os.path.isdir(shard_dir) else []
+        else:
+            paths = [self.transactions_file, self.transactions_journal_file]
+        return self._files_signature(paths)
+    
+    @staticmethod
+    def _files_signature(paths: List[str]) -> List[Any]:
+        """[name, mtime, size] of each path ([name, None, None] when missing)"""
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append([os.path.basename(path), stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                signature.append([os.path.basename(path), None, None])
+        return signature
+    
+    def _shutdown(self) -> None:
+        """Write pending saves, the transaction index and columns updated in place at exit"""
+        self.flush()
+        with self._lock:
+            try:
+                self._save_transaction_index()
+            except Exception as e:
+                print(f"Error saving transaction index: {e}")
+            try:
+                self._save_dirty_columns()
+            except Exception as e:
+                print(f"Error saving transaction columns: {e}")
+    
+    # ------------------------------
+    # Duplicate fingerprints
+    # ------------------------------
+    
+    def count_duplicates(self, transaction: Dict[str, Any]) -> int:
+        """Number of stored transactions of the same user with the same fingerprint
+        
+        Each user's fingerprint counts are built on first use and then kept in
+        step with every add, edit and delete, so lookups are constant time.
+        """
+        try:
+            if self._backend is not None:
+                return self._backend.count_duplicates(transaction)
+            with self._lock:
+                fingerprints = self._user_fingerprints(transaction["user_id"])
+                return fingerprints.get(Utilities.transaction_fingerprint(transaction), 0)
+        except Exception as e:
+            print(f"Error checking for duplicates: {e}")
+            return 0
+    
+    def _user_fingerprints(self, user_id: str) -> Dict[bytes, int]:
+        """Fingerprint counts of one user's transactions, built on first use"""
+        fingerprints = self._fingerprints.get(user_id)
+        if fingerprints is None:
+            fingerprints = {}
+            for transaction in self.load_user_transactions(user_id):
+                fingerprint = Utilities.transaction_fingerprint(transaction)
+                fingerprints[fingerprint] = fingerprints.get(fingerprint, 0) + 1
+            self._fingerprints[user_id] = fingerprints
+        return fingerprints
+    
+    def _fingerprint_changes(self, record: Dict[str, Any]) -> Optional[List[tuple]]:
+        """(fingerprint, delta) pairs an add/edit/delete record will cause
+        
+        Must run before the record is written, while the old version of an
+        edited or deleted transaction can still be looked up. Returns None
+        when the user's counts cannot be kept in step and must be rebuilt.
+        """
+        if record["user_id"] not in self._fingerprints:
+            return []
+        if record["op"] == "add":
+            return [(Utilities.transaction_fingerprint(record["transaction"]), 1)]
+        old = self.find_transaction(record["transaction_id"])
+        if old is None or old.get("user_id") != record["user_id"]:
+            return None
+        changes = [(Utilities.transaction_fingerprint(old), -1)]
+        if record["op"] == "edit":
+            changes.append((Utilities.transaction_fingerprint({**old, **record["fields"]}), 1))
+        return changes
+    
+    def _apply_fingerprint_changes(self, user_id: str, changes: Optional[List[tuple]]) -> None:
+        """Apply the result of _fingerprint_changes once the record is written"""
+        if changes is None:
+            self._fingerprints.pop(user_id, None)
+            return
+        fingerprints = self._fingerprints.get(user_id)
+        if fingerprints is None:
+            return
+        for fingerprint, delta in changes:
+            count = fingerprints.get(fingerprint, 0) + delta
+            if count > 0:
+                fingerprints[fingerprint] = count
+            else:
+                fingerprints.pop(fingerprint, None)
+    
+    # ------------------------------
+    # Columnar analytics store
+    # ------------------------------
+    
+    def load_user_columns(self, user_id: str) -> Optional[Any]:
+        """A user's transactions as columnar.TransactionColumns (None when
+        config.COLUMNAR_STORE is off)
+        
+        Columns are memory-mapped from data/columnar/ and stamped with the
+        signature of the transaction files (or database) they were built
+        from. Adds, edits and deletes made by this process are applied to
+        the cached columns in place (see _transactions_changed); other
+        changes, such as a full save or a write by another process, make
+        them be rebuilt on next use.
+        """
+        if not self.columnar:
+            return None
+        try:
+            from columnar import ColumnarStore, TransactionColumns
+            with self._lock:
+                self._write_pending()
+                signature = self._columns_signature(user_id)
+                store = ColumnarStore(self.columnar_dir)
+                columns = self._columns.get(user_id, self._MISS)
+                if columns is not None and columns is not self._MISS:
+                    if columns.signature is None:
+                        # Kept up to date in place since this process last wrote
+                        columns.signature = signature
+                    if columns.signature == signature:
+                        return columns
+                # None marks columns this process knows to be stale, whatever their file says
+                columns = store.load(user_id, signature) if columns is not None else None
+                if columns is None:
+                    columns = TransactionColumns.from_transactions(self.load_user_transactions(user_id), signature)
+                    try:
+                        store.save(user_id, columns)
+                    except OSError as e:
+                        print(f"Error saving transaction columns: {e}")
+                self._columns[user_id] = columns
+                self._columns_dirty.discard(user_id)
+                return columns
+        except Exception as e:
+            print(f"Error loading transaction columns: {e}")
+            return None
+    
+    def _column_row(self, record: Dict[str, Any], position: Optional[int]) -> Optional[int]:
+        """Row of the transaction an edit/delete record refers to in the user's cached
+        columns, looked up before the record is written (None when unknown)
+        
+        position is the transaction ID index's guess, checked before the list is scanned.
+        """
+        columns = self._columns.get(record["user_id"])
+        if columns is None or record.get("op") not in ("edit", "delete"):
+            return None
+        transactions = self.load_user_transactions(record["user_id"])
+        if len(transactions) != len(columns):
+            return None
+        transaction_id = record["transaction_id"]
+        if (position is not None and position < len(transactions)
+                and transactions[position]["transaction_id"] == transaction_id):
+            return position
+        for row, transaction in enumerate(transactions):
+            if transaction["transaction_id"] == transaction_id:
+                return row
+        return None
+    
+    def _save_dirty_columns(self) -> None:
+        """Write columns updated in place to the columnar store, so the next run maps them"""
+        if not self._columns_dirty:
+            return
+        from columnar import ColumnarStore
+        store = ColumnarStore(self.columnar_dir)
+        for user_id in self._columns_dirty:
+            columns = self._columns.get(user_id)
+            if columns is not None:
+                if columns.signature is None:
+                    columns.signature = self._columns_signature(user_id)
+                store.save(user_id, columns)
+        self._columns_dirty.clear()
+    
+    def _columns_signature(self, user_id: str) -> List[Any]:
+        """Signature of the files a user's transactions are read from"""
+        if self._backend is not None:
+            db_file = self._backend.db_file
+            return self._files_signature([db_file, db_file + "-wal"])
+        if self.sharded:
+            self._ensure_sharded("transactions")
+            return self._files_signature([self._shard_path("transactions", user_id),
+                                          self._shard_path("transactions", user_id, ".journal")])
+        return self._transaction_files_signature()
+    
+    def transactions_version(self, user_id: str) -> int:
+        """A number that changes whenever this process writes the user's transactions
+        
+        An index built over a loaded transaction list stays valid while
+        load_user_transactions returns the same list object and this number
+        is unchanged (a reload after another process wrote returns a new list).
+        """
+        return self._transaction_versions.get(user_id, self._transactions_version)
+    
+    def _transactions_changed(self, user_id: Optional[str] = None, record: Optional[Dict[str, Any]] = None,
+                              row: Optional[int] = None) -> None:
+        """Note that a user's transactions (everyone's when user_id is None) were written
+        
+        record is the add/edit/delete record written, when the change was a
+        single one; structures that can follow it are updated in place. row
+        is the column row an edit or delete refers to (see _column_row).
+        """
+        self._transactions_version += 1
+        if user_id is None:
+            self._columns = dict.fromkeys(self._columns)
+            self._columns_dirty.clear()
+            self._transaction_versions.clear()
+            self._description_indexes.clear()
+            self._trigram_indexes.clear()
+        else:
+            columns = self._columns.get(user_id)
+            if columns is not None and record is not None and columns.apply(record, row):
+                # Restamped with the files' new signature on next load
+                columns.signature = None
+                self._columns_dirty.add(user_id)
+            else:
+                self._columns[user_id] = None
+                self._columns_dirty.discard(user_id)
+            if self._backend is not None or not self.sharded:
+                # The users share one file (or database), whose signature just
+                # changed, but the other users' columns are still current
+                for other_id, other_columns in self._columns.items():
+                    if other_id != user_id and other_columns is not None:
+                        other_columns.signature = None
+                        self._columns_dirty.add(other_id)
+            self._transaction_versions[user_id] = self._transactions_version
+            for indexes in (self._description_indexes, self._trigram_indexes):
+                index = indexes.get(user_id)
+                if index is not None and (record is None or not index.apply(record)):
+                    del indexes[user_id]
+    
+    # ------------------------------
+    # Description full-text index
+    # ------------------------------
+    
+    def load_description_index(self, user_id: str) -> Optional[Any]:
+        """The full-text index of a user's transaction descriptions
+        (text_index.DescriptionIndex, None on error)
+        
+        Built on first use, then kept in step with every add, edit and
+        delete; a full save of the user's transactions drops it.
+        """
+        try:
+            from text_index import DescriptionIndex
+            with self._lock:
+                index = self._description_indexes.get(user_id)
+                if index is None:
+                    index = DescriptionIndex.from_transactions(self.load_user_transactions(user_id))
+                    self._description_indexes[user_id] = index
+                return index
+        except Exception as e:
+            print(f"Error loading description index: {e}")
+            return None
+    
+    def load_trigram_index(self, user_id: str) -> Optional[Any]:
+        """The fuzzy-match index of a user's transaction descriptions
+        (text_index.TrigramIndex, None on error)
+        
+        Built on first use and kept in step like load_description_index.
+        """
+        try:
+            from text_index import TrigramIndex
+            with self._lock:
+                index = self._trigram_indexes.get(user_id)
+                if index is None:
+                    index = TrigramIndex.from_transactions(self.load_user_transactions(user_id))
+                    self._trigram_indexes[user_id] = index
+                return index
+        except Exception as e:
+            print(f"Error loading trigram index: {e}")
+            return None
+    
+    # ------------------------------
+    # Single-user reads
+    # ------------------------------
+    
+    _WHITESPACE = re.compile(rb'[ \t\r\n]*+')
+    _STRING = re.compile(rb'"(?:[^"\\]++|\\.)*+"')
+    # A scalar, a flat object or an array of scalars and flat objects, matched
+    # in one go; anything nested deeper is skipped token by token
+    _FLAT_VALUE = re.compile(rb"""
+        "(?:[^"\\]++|\\.)*+"
+      | \{(?:[^\[\]{}"]++|"(?:[^"\\]++|\\.)*+")*+\}
+      | \[(?:[^\[\]{}"]++|"(?:[^"\\]++|\\.)*+"|\{(?:[^\[\]{}"]++|"(?:[^"\\]++|\\.)*+")*+\})*+\]
+      | [\w.+-]++
+    """, re.X)
+    _STRUCTURAL = re.compile(rb'[\[\]{}"]')
+    
+    def _whole_file_ready(self, path: str, journal_file: Optional[str] = None) -> bool:
+        """Whether the whole file is already in memory, or must be read whole (pending writes)"""
+        return (path in self._cache or path in self._pending_writes
+                or journal_file is not None and journal_file in self._pending_removals)
+    
+    def _load_member(self, path: str, user_id: str, default: Any, journal_file: Optional[str] = None) -> Any:
+        """Load one user's value from a multi-user file, replaying that user's journal records"""
+        key = (path, user_id)
+        paths = (path,) if journal_file is None else (path, journal_file)
+        with self._lock:
+            signature = self._cache_signature(paths)
+            cached = self._cache_get(key, paths, signature)
+            if cached is not self._MISS:
+                return cached
+            
+            value = self._read_json_member(path, user_id, default)
+            if journal_file is not None:
+                TransactionRecord.from_dicts(value)
+                records = [record for record in self._read_journal(journal_file)
+                           if record.get("user_id") == user_id]
+                if records:
+                    wrapped = {user_id: value}
+                    self._replay_journal(wrapped, records)
+                    value = wrapped[user_id]
+            
+            self._cache_put(key, paths, value, signature)
+            return value
+    
+    def _read_json_member(self, path: str, key: str, default: Any) -> Any:
+        """Parse only the value stored under key in the top-level object of path
+        
+        The file is memory-mapped and the byte ranges of all top-level members
+        are indexed once per file version, so other users' data is skipped
+        without being parsed. Compressed files are read whole.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return default
+        if stat.st_size == 0:
+            return default
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if buf[:2] == JsonCodec.GZIP_MAGIC or buf[:4] == JsonCodec.ZSTD_MAGIC:
+                return self.codec.decode(buf[:], {}).get(key, default)
+            
+            indexed = self._member_offsets.get(path)
+            if indexed is None or indexed[0] != signature:
+                indexed = (signature, self._index_members(buf))
+                self._member_offsets[path] = indexed
+            span = indexed[1].get(key)
+            if span is None:
+                return default
+            return self.codec.loads(buf[span[0]:span[1]])
+    
+    @classmethod
+    def _index_members(cls, buf: Any) -> Dict[str, tuple]:
+        """Map each key of a top-level JSON object to the (start, end) bytes of its value"""
+        offsets = {}
+        pos = cls._WHITESPACE.match(buf, 0).end()
+        if buf[pos:pos + 1] != b"{":
+            raise ValueError("top-level JSON value is not an object")
+        pos = cls._WHITESPACE.match(buf, pos + 1).end()
+        if buf[pos:pos + 1] == b"}":
+            return offsets
+        
+        while True:
+            match = cls._STRING.match(buf, pos)
+            if match is None:
+                raise ValueError(f"expected a member name at byte {pos}")
+            name = json.loads(match.group())
+            pos = cls._WHITESPACE.match(buf, match.end()).end()
+            if buf[pos:pos + 1] != b":":
+                raise ValueError(f"expected ':' at byte {pos}")
+            start = cls._WHITESPACE.match(buf, pos + 1).end()
+            end = cls._skip_value(buf, start)
+            offsets[name] = (start, end)
+            
+            pos = cls._WHITESPACE.match(buf, end).end()
+            separator = buf[pos:pos + 1]
+            if separator == b"}":
+                return offsets
+            if separator != b",":
+                raise ValueError(f"expected ',' or '}}' at byte {pos}")
+            pos = cls._WHITESPACE.match(buf, pos + 1).end()
+    
+    @classmethod
+    def _skip_value(cls, buf: Any, pos: int) -> int:
+        """Return the offset just past the JSON value starting at pos"""
+        match = cls._FLAT_VALUE.match(buf, pos)
+        if match is not None:
+            return match.end()
+        if buf[pos:pos + 1] not in (b"[", b"{"):
+            raise ValueError(f"unexpected data at byte {pos}")
+        
+        depth = 0
+        while True:
+            match = cls._STRUCTURAL.search(buf, pos)
+            if match is None:
+                raise ValueError("unterminated JSON value")
+            char = match.group()
+            if char == b'"':
+                string = cls._STRING.match(buf, match.start())
+                if string is None:
+                    raise ValueError(f"unterminated string at byte {match.start()}")
+                pos = string.end()
+                continue
+            pos = match.end()
+            depth += 1 if char in b"[{" else -1
+            if depth == 0:
+                return pos
+    
+    # ------------------------------
+    # In-memory cache
+    # ------------------------------
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return cache hit/miss counters"""
+        return {
+            "mode": self.cache_mode,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "entries": len(self._cache)
+        }
+    
+    def clear_cache(self) -> None:
+        """Drop all cached data so the next reads go to disk"""
+        self._cache.clear()
+        self._fingerprints.clear()
+        self._columns.clear()
+        self._columns_dirty.clear()
+        self._description_indexes.clear()
+        self._trigram_indexes.clear()
+        clear_interned()
+    
+    def _cache_signature(self, paths: tuple) -> Optional[tuple]:
+        """(mtime, size) of each file, or None when validation is not stat based"""
+        if self.cache_mode != "stat":
+            return None
+        signature = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                signature.append(None)
+        return tuple(signature)
+    
+    def _cache_get(self, key: str, paths: tuple, signature: Optional[tuple] = None, count: bool = True) -> Any:
+        """Return cached data for key, or _MISS if absent or stale"""
+        if self.cache_mode == "off":
+            return self._MISS
+        entry = self._cache.get(key)
+        if entry is not None:
+            if signature is None:
+                signature = self._cache_signature(paths)
+            if entry[0] == signature:
+                if count:
+                    self.cache_hits += 1
+                return entry[1]
+            del self._cache[key]
+        if count:
+            self.cache_misses += 1
+        return self._MISS
+    
+    def _cache_put(self, key: str, paths: tuple, data: Any, signature: Optional[tuple] = None) -> None:
+        """Store data for key, stamped with the signature it was read at (or the current one)"""
+        if self.cache_mode == "off":
+            return
+        if signature is None:
+            signature = self._cache_signature(paths)
+        self._cache[key] = (signature, data, paths)
+    
+    def _cache_invalidate(self, key: str) -> None:
+        """Forget cached data for key"""
+        self._cache.pop(key, None)
+    
+    def _cache_invalidate_members(self, path: str) -> None:
+        """Forget single-user entries read out of path"""
+        for key in [key for key in self._cache if isinstance(key, tuple) and key[0] == path]:
+            del self._cache[key]
+    
+    def _cache_restamp(self, changed: set) -> None:
+        """Re-sign entries whose files this process just wrote, so they stay valid"""
+        if self.cache_mode != "stat" or not changed:
+            return
+        for key, (signature, data, paths) in list(self._cache.items()):
+            if changed.intersection(paths):
+                self._cache[key] = (self._cache_signature(paths), data, paths)
+    
+    # ------------------------------
+    # Per-user shards
+    # ------------------------------
+    
+    def _shard_dir(self, collection: str) -> str:
+        """Directory holding the per-user shards of a collection"""
+        return os.path.join(self.data_dir, collection)
+    
+    def _shard_path(self, collection: str, user_id: str, suffix: str = ".json") -> str:
+        """Path of a user's shard; user IDs are percent-encoded to stay filesystem-safe"""
+        return os.path.join(self._shard_dir(collection), quote(user_id, safe="") + suffix)
+    
+    def _list_shards(self, collection: str) -> List[str]:
+        """User IDs that have a shard (or a shard journal) in a collection"""
+        shard_dir = self._shard_dir(collection)
+        if not os.path.isdir(shard_dir):
+            return []
+        user_ids = []
+        seen = set()
+        names = set(os.listdir(shard_dir))
+        names.update(os.path.basename(path) for path in self._pending_writes
+                     if os.path.dirname(path) == shard_dir)
+        for name in sorted(names):
+            stem, ext = os.path.splitext(name)
+            if ext in (".json", ".journal") and stem not in seen:
+                seen.add(stem)
+                user_ids.append(unquote(stem))
+        return user_ids
+    
+    def _remove_shard(self, collection: str, user_id: str) -> None:
+        """Delete a user's shard and any journal next to it"""
+        with self._lock:
+            self._wait_for_flush()
+            for suffix in (".json", ".journal"):
+                path = self._shard_path(collection, user_id, suffix)
+                self._pending_writes.pop(path, None)
+                self._pending_removals.discard(path)
+                self._pending_fsyncs.discard(path)
+                if os.path.exists(path):
+                    os.remove(path)
+                self._cache_invalidate(path)
+    
+    def _save_all_shards(self, collection: str, data: Dict[str, Any]) -> None:
+        """Write every user's shard of a collection and drop shards of removed users"""
+        for user_id in set(self._list_shards(collection)) - set(data):
+            self._remove_shard(collection, user_id)
+        for user_id, value in data.items():
+            self._write_json_file(self._shard_path(collection, user_id), value)
+    
+    def _ensure_sharded(self, collection: str) -> None:
+        """Migrate a collection from its single multi-user file to per-user shards
+        
+        Runs once per process on first access. The legacy file is renamed to
+        <name>.migrated afterwards, so the migration is never repeated.
+        """
+        if collection in self._migrated:
+            return
+        
+        os.makedirs(self._shard_dir(collection), exist_ok=True)
+        legacy_file = os.path.join(self.data_dir, f"{collection}.json")
+        legacy_journal = self.transactions_journal_file if collection == "transactions" else None
+        has_journal = legacy_journal is not None and os.path.exists(legacy_journal)
+        
+        if os.path.exists(legacy_file) or has_journal:
+            if collection == "transactions":
+                data = self._load_with_journal()
+            else:
+                data = self._read_json_file(legacy_file, {})
+            
+            for user_id, value in data.items():
+                if collection == "transactions":
+                    self._save_with_journal(value, user_id)
+                else:
+                    self._write_json_file(self._shard_path(collection, user_id), value)
+            
+            # The shards must be on disk before the legacy file is retired
+            if not self.flush():
+                raise IOError(f"the {collection} shards could not be written")
+            if os.path.exists(legacy_file):
+                os.replace(legacy_file, legacy_file + ".migrated")
+            if has_journal:
+                self._drop_journal(legacy_journal)
+            self._cache_invalidate(legacy_file)
+        
+        self._migrated.add(collection)
@@ -3,6 +3,7 @@ import sys
 from users import User
 from menu import main_menu
 from utility import Utilities
+from jsonhandler import JsonHandler
 
 def init_app():
     """Initialize application and handle user authentication"""
@@ -76,7 +77,10 @@ def main():
             # Launch main menu with authenticated user
             if current_user:
                 # If main_menu returns False, it means user logged out
-                if not main_menu(current_user):
+                logged_out = not main_menu(current_user)
+                # Write out anything the auto-save has not saved yet
+                JsonHandler().flush()
+                if logged_out:
                     utilities = Utilities()
                     utilities.clear_screen()
                     continue  # Return to login menu
@@ -86,6 +90,8 @@ def main():
     except Exception as e:
         print(f"Fatal error: {e}")
         sys.exit(1)
+    finally:
+        JsonHandler().flush()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
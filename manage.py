@@ -0,0 +1,148 @@
+import argparse
+import sys
+
+import config
+from jsonhandler import JsonHandler
+
+
+def migrate_sqlite(args: argparse.Namespace) -> int:
+    """Copy the JSON data files into a SQLite database"""
+    from sqlite_store import SqliteStore, migrate_json_to_sqlite
+
+    json_handler = JsonHandler()
+    # Always read from the JSON files, whatever backend is configured
+    json_handler.set_backend(None)
+
+    store = SqliteStore(args.db or config.SQLITE_FILE)
+    try:
+        counts = migrate_json_to_sqlite(json_handler, store)
+    finally:
+        store.close()
+
+    print(f"Migrated data into {store.db_file}:")
+    for name, count in counts.items():
+        print(f"   {name}: {count}")
+    print("Set PFM_STORAGE_BACKEND=sqlite to use the new database.")
+    return 0
+
+
+def migrate_cents(args: argparse.Namespace) -> int:
+    """Rewrite stored transactions with integer cents amounts
+
+    Loading already converts a float "amount" to cents; this saves the
+    converted transactions so the stored data no longer needs converting.
+    Nothing is saved while an amount could not be converted.
+    """
+    json_handler = JsonHandler()
+    transactions = json_handler.load_transactions()
+    count = sum(len(user_transactions) for user_transactions in transactions.values())
+    if not count:
+        print("No transactions to migrate.")
+        return 0
+    unreadable = [transaction for user_transactions in transactions.values()
+                  for transaction in user_transactions if "amount" in transaction]
+    if unreadable:
+        print(f"{len(unreadable)} transactions have an amount that is not a number; "
+              f"correct them and run this again:")
+        for transaction in unreadable:
+            print(f"  {transaction.get('transaction_id')} ({transaction.get('user_id')}): {transaction['amount']!r}")
+        return 1
+    if not args.no_backup:
+        manifest = json_handler.create_backup()
+        if manifest is None:
+            return 1
+        print(f"Backup {manifest['id']} created.")
+    if not json_handler.save_transactions(transactions) or not json_handler.flush():
+        return 1
+    print(f"Migrated {count} transactions to integer cents.")
+    return 0
+
+
+def backup(args: argparse.Namespace) -> int:
+    """Take an incremental backup of the data directory"""
+    manifest = JsonHandler().create_backup(args.dir)
+    if manifest is None:
+        return 1
+    print(f"Backup {manifest['id']} created: {len(manifest['files'])} files, "
+          f"{manifest['size'] / 1e6:.1f} MB of data, {manifest['new_bytes'] / 1e6:.1f} MB new")
+    return 0
+
+
+def list_backups(args: argparse.Namespace) -> int:
+    """Print the available backups, oldest first"""
+    backups = JsonHandler().list_backups(args.dir)
+    if not backups:
+        print("No backups found.")
+        return 0
+    print(f"   {'id':<20} {'created':<20} {'files':>6} {'MB':>9} {'new MB':>9}")
+    for backup in backups:
+        print(f"   {backup['id']:<20} {backup['created']:<20} {backup['files']:>6} "
+              f"{backup['size'] / 1e6:>9.1f} {backup['new_bytes'] / 1e6:>9.1f}")
+    return 0
+
+
+def restore(args: argparse.Namespace) -> int:
+    """Replace the current data with a backup"""
+    json_handler = JsonHandler()
+    if not args.yes:
+        answer = input(f"Replace all current data with backup {args.backup_id}? (y/n): ").strip().lower()
+        if answer != "y":
+            print("Restore cancelled.")
+            return 1
+    if not json_handler.restore_backup(args.backup_id, args.dir):
+        return 1
+    print(f"Restored backup {args.backup_id}.")
+    return 0
+
+
+def prune_backups(args: argparse.Namespace) -> int:
+    """Delete old backups and the chunks only they used"""
+    removed = JsonHandler().prune_backups(args.keep, args.dir)
+    print(f"Removed {removed['backups']} backups and {removed['chunks']} unused chunks.")
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Personal Finance Manager maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate = subparsers.add_parser("migrate-sqlite", help="Copy JSON data files into a SQLite database")
+    migrate.add_argument("--db", help=f"Database file (default: {config.SQLITE_FILE})")
+    migrate.set_defaults(func=migrate_sqlite)
+
+    cents = subparsers.add_parser("migrate-cents", help="Store transaction amounts as integer cents")
+    cents.add_argument("--no-backup", action="store_true", help="Do not take a backup first")
+    cents.set_defaults(func=migrate_cents)
+
+    backup_dir_help = f"Backup directory (default: {config.BACKUP_DIR})"
+
+    create = subparsers.add_parser("backup", help="Take an incremental backup of all data")
+    create.add_argument("--dir", help=backup_dir_help)
+    create.set_defaults(func=backup)
+
+    listing = subparsers.add_parser("list-backups", help="List available backups")
+    listing.add_argument("--dir", help=backup_dir_help)
+    listing.set_defaults(func=list_backups)
+
+    restoring = subparsers.add_parser("restore", help="Replace all data with a backup")
+    restoring.add_argument("backup_id", help="ID shown by list-backups")
+    restoring.add_argument("--dir", help=backup_dir_help)
+    restoring.add_argument("--yes", action="store_true", help="Do not ask for confirmation")
+    restoring.set_defaults(func=restore)
+
+    prune = subparsers.add_parser("prune-backups", help="Delete all but the newest backups")
+    prune.add_argument("--keep", type=int, default=config.BACKUP_KEEP,
+                       help=f"Number of backups to keep (default: {config.BACKUP_KEEP})")
+    prune.add_argument("--dir", help=backup_dir_help)
+    prune.set_defaults(func=prune_backups)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
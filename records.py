@@ -0,0 +1,191 @@
+from collections.abc import MutableMapping
+from operator import itemgetter
+from typing import Dict, List, Any, Iterator, Optional
+
+from utility import Utilities
+
+
+# Values repeated across many transactions are stored once. Unlike
+# sys.intern this also accepts non-string values read from old data. Only
+# low-cardinality fields are interned, and the table is emptied when it
+# grows past _INTERN_LIMIT (or the data is reloaded), so unusual data cannot
+# make it grow without bound; records keep the values they already hold.
+_interned: Dict[Any, Any] = {}
+_INTERN_LIMIT = 20000
+
+_MISSING = object()
+
+
+def clear_interned() -> None:
+    """Forget the shared field values, e.g. after all data was reloaded"""
+    _interned.clear()
+
+
+class TransactionRecord(MutableMapping):
+    """A transaction held in memory as a compact __slots__ object
+
+    Behaves like the transaction dict it replaces: indexing, get(), "in",
+    iteration, update(), {**record} and dict(record) all work, and it
+    compares equal to a dict with the same items. The eight standard fields
+    live in slots; the user ID, type, category, date and payment method are
+    interned, so thousands of transactions share one copy of each. Any other
+    key (such as "possible_duplicate") goes into a small dict.
+
+    Amounts are held as integer cents in "amount_cents". Data written before
+    that used a float "amount" in currency units; setting "amount" (as old
+    snapshots and journal edits do) stores the converted cents instead. An
+    old amount that is not a number is reported and kept as it is under
+    "amount" (with 0 cents) until a valid amount is set.
+    """
+
+    FIELDS = ("transaction_id", "user_id", "type", "amount_cents", "category", "date",
+              "description", "payment_method")
+    INTERNED = frozenset(("user_id", "type", "category", "date", "payment_method"))
+    _FIELD_SET = frozenset(FIELDS)
+
+    __slots__ = FIELDS + ("_extra",)
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, **fields: Any):
+        for name in self.FIELDS:
+            setattr(self, name, _MISSING)
+        self._extra = None
+        if data:
+            self.update(data)
+        if fields:
+            self.update(fields)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TransactionRecord":
+        """Build a record from a transaction dict (the fast path used on load)"""
+        try:
+            (transaction_id, user_id, type, amount_cents, category, date, description,
+             payment_method) = _field_values(data)
+        except KeyError:
+            # Old data missing a field (or with a float "amount") takes the slow, general path
+            return cls(data)
+        if len(_interned) > _INTERN_LIMIT:
+            _interned.clear()
+        intern = _interned.setdefault
+        record = cls.__new__(cls)
+        record.transaction_id = transaction_id
+        record.user_id = intern(user_id, user_id)
+        record.type = intern(type, type)
+        record.amount_cents = amount_cents
+        record.category = intern(category, category)
+        record.date = intern(date, date)
+        record.description = description
+        record.payment_method = intern(payment_method, payment_method)
+        if len(data) == len(cls.FIELDS):
+            record._extra = None
+        else:
+            record._extra = {key: value for key, value in data.items() if key not in cls._FIELD_SET}
+            if "amount" in record._extra:
+                _report_unreadable_amount(transaction_id, record._extra["amount"])
+        return record
+
+    @classmethod
+    def from_dicts(cls, transactions: List[Any]) -> List["TransactionRecord"]:
+        """Convert a list of transactions in place (records are kept as they are)"""
+        from_dict = cls.from_dict
+        for i, transaction in enumerate(transactions):
+            if type(transaction) is not cls:
+                transactions[i] = from_dict(transaction)
+        return transactions
+
+    def to_dict(self) -> Dict[str, Any]:
+        """A plain dict with the same items, fields first"""
+        data = {"transaction_id": self.transaction_id, "user_id": self.user_id, "type": self.type,
+                "amount_cents": self.amount_cents, "category": self.category, "date": self.date,
+                "description": self.description, "payment_method": self.payment_method}
+        if _MISSING in data.values():
+            data = {name: value for name, value in data.items() if value is not _MISSING}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self) -> "TransactionRecord":
+        """A shallow copy, like dict.copy()"""
+        return self.from_dict(self)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """dict.get without the exception handling Mapping.get relies on"""
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            return default if value is _MISSING else value
+        return self._extra.get(key, default) if self._extra else default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            if value is _MISSING:
+                raise KeyError(key)
+            return value
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key == "amount":
+            try:
+                key, value = "amount_cents", Utilities.to_cents(value)
+            except ValueError:
+                # Kept for the user to correct rather than silently zeroed
+                _report_unreadable_amount(self.get("transaction_id"), value)
+                if self.amount_cents is _MISSING:
+                    self.amount_cents = 0
+        if key == "amount_cents" and self._extra and "amount" in self._extra:
+            # A valid amount replaces an unreadable old one
+            del self._extra["amount"]
+        if key in self._FIELD_SET:
+            if key in self.INTERNED:
+                if len(_interned) > _INTERN_LIMIT:
+                    _interned.clear()
+                value = _interned.setdefault(value, value)
+            setattr(self, key, value)
+        elif self._extra is None:
+            self._extra = {key: value}
+        else:
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._FIELD_SET:
+            if getattr(self, key) is _MISSING:
+                raise KeyError(key)
+            setattr(self, key, _MISSING)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: Any) -> bool:
+        if key in self._FIELD_SET:
+            return getattr(self, key) is not _MISSING
+        return bool(self._extra) and key in self._extra
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.FIELDS:
+            if getattr(self, name) is not _MISSING:
+                yield name
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(getattr(self, name) is not _MISSING for name in self.FIELDS) + len(self._extra or ())
+
+    def __repr__(self) -> str:
+        return repr(self.to_dict())
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state)
+
+
+def _report_unreadable_amount(transaction_id: Any, amount: Any) -> None:
+    """Warn about an old amount that could not be converted to cents"""
+    print(f"Warning: transaction {transaction_id} has an unreadable amount {amount!r}; "
+          f"it counts as 0 until a valid amount is set")
+
+
+_field_values = itemgetter(*TransactionRecord.FIELDS)
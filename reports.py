@@ -1,16 +1,21 @@
-from typing import Dict, List
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta, date
 import json
 import os
 from collections import defaultdict
 
 # Import the transactions module to get user transactions
 from transactions import TransactionManager
+from jsonhandler import JsonHandler
+from columnar import TransactionColumns
+from utility import Utilities
+from search_filter import DateIndex, cached_index
 
 class ReportsManager:
     """
     This class handles all the reporting functionality for the Personal Finance Manager.
     It uses Object-Oriented Programming to organize the code better.
+    All totals are added up, and returned, as integer cents.
     """
     
     def __init__(self, user_id: str):
@@ -19,6 +24,7 @@ class ReportsManager:
         """
         self.user_id = user_id
         self.transactions = self._load_user_transactions()
+        self.columns = self._load_user_columns()
     
     def _load_user_transactions(self) -> List[Dict]:
         """
@@ -33,6 +39,40 @@ class ReportsManager:
             print(f"Error loading transactions: {e}")
             return []
     
+    def _load_user_columns(self) -> Optional[TransactionColumns]:
+        """
+        Load the columnar copy of this user's transactions
+        Returns None when the columnar store is off; row i is self.transactions[i]
+        """
+        columns = JsonHandler().load_user_columns(self.user_id)
+        if columns is not None and len(columns) != len(self.transactions):
+            return None
+        return columns
+    
+    def _column_sums(self, rows: Optional[List[int]] = None, key: Optional[str] = None) -> Dict[tuple, List[int]]:
+        """
+        Add up amounts (in cents) and count transactions straight from the columns
+        Groups are (is_income, id in column key); only the given rows are read when rows is set
+        """
+        columns = self.columns
+        income_ids = columns.ids("types", ["income"])
+        types = columns.types
+        amounts = columns.amounts
+        keys = getattr(columns, key) if key else None
+        sums = {}
+        for row in (range(len(columns)) if rows is None else rows):
+            group = (types[row] in income_ids, keys[row] if keys is not None else None)
+            entry = sums.get(group)
+            if entry is None:
+                entry = sums[group] = [0, 0]
+            entry[0] += amounts[row]
+            entry[1] += 1
+        return sums
+    
+    def _rows_between(self, first: int, last: int) -> List[int]:
+        """Rows whose date falls between two day ordinals (inclusive), from the shared date index"""
+        return cached_index(self.user_id, self.transactions, "date", DateIndex).rows_between(first, last)
+    
     def generate_dashboard(self) -> Dict:
         """
         Create a dashboard summary showing overall financial health
@@ -55,42 +95,57 @@ class ReportsManager:
         monthly_income = 0
         monthly_expenses = 0
         
-        # Loop through all transactions to calculate totals
-        for transaction in self.transactions:
-            amount = float(transaction['amount'])
-            
-            if transaction['type'] == 'income':
-                total_income += amount
-                income_count += 1
-                # Check if it's from current month
-                if transaction['date'].startswith(current_month):
-                    monthly_income += amount
-            else:  # expense
-                total_expenses += amount
-                expense_count += 1
-                # Check if it's from current month
-                if transaction['date'].startswith(current_month):
-                    monthly_expenses += amount
+        if self.columns is not None:
+            # Sum integer cents from the columns, without parsing any row
+            for (is_income, _), (cents, count) in self._column_sums().items():
+                if is_income:
+                    total_income, income_count = cents, count
+                else:
+                    total_expenses, expense_count = cents, count
+            today = datetime.now()
+            month_rows = self._rows_between(*TransactionColumns.month_range(today.month, today.year))
+            for (is_income, _), (cents, count) in self._column_sums(month_rows).items():
+                if is_income:
+                    monthly_income = cents
+                else:
+                    monthly_expenses = cents
+        else:
+            # Loop through all transactions to calculate totals
+            for transaction in self.transactions:
+                amount = transaction['amount_cents']
+                
+                if transaction['type'] == 'income':
+                    total_income += amount
+                    income_count += 1
+                    # Check if it's from current month
+                    if transaction['date'].startswith(current_month):
+                        monthly_income += amount
+                else:  # expense
+                    total_expenses += amount
+                    expense_count += 1
+                    # Check if it's from current month
+                    if transaction['date'].startswith(current_month):
+                        monthly_expenses += amount
         
         # Calculate net worth (income - expenses)
         net_worth = total_income - total_expenses
         monthly_net = monthly_income - monthly_expenses
         
         # Show dashboard
-        print(f"\nTOTAL INCOME: ${total_income:.2f} ({income_count} transactions)")
-        print(f"TOTAL EXPENSES: ${total_expenses:.2f} ({expense_count} transactions)")
-        print(f"NET WORTH: ${net_worth:.2f}")
+        print(f"\nTOTAL INCOME: ${Utilities.format_amount(total_income)} ({income_count} transactions)")
+        print(f"TOTAL EXPENSES: ${Utilities.format_amount(total_expenses)} ({expense_count} transactions)")
+        print(f"NET WORTH: ${Utilities.format_amount(net_worth)}")
         print("-" * 50)
         print(f"THIS MONTH ({current_month}):")
-        print(f"   Income: ${monthly_income:.2f}")
-        print(f"   Expenses: ${monthly_expenses:.2f}")
-        print(f"   Net: ${monthly_net:.2f}")
+        print(f"   Income: ${Utilities.format_amount(monthly_income)}")
+        print(f"   Expenses: ${Utilities.format_amount(monthly_expenses)}")
+        print(f"   Net: ${Utilities.format_amount(monthly_net)}")
         
         # Show financial health status
         if net_worth > 0:
-            print(f"\nFinancial Status: POSITIVE (${net_worth:.2f} saved)")
+            print(f"\nFinancial Status: POSITIVE (${Utilities.format_amount(net_worth)} saved)")
         else:
-            print(f"\nFinancial Status: NEGATIVE (${abs(net_worth):.2f} in debt)")
+            print(f"\nFinancial Status: NEGATIVE (${Utilities.format_amount(abs(net_worth))} in debt)")
         
         # Return data for potential use by other methods
         return {
@@ -111,12 +166,9 @@ class ReportsManager:
         print(f"        MONTHLY REPORT - {month:02d}/{year}")
         print("="*50)
         
-        # Filter transactions for the specific month
-        month_transactions = []
-        for transaction in self.transactions:
-            trans_date = datetime.strptime(transaction['date'], '%Y-%m-%d')
-            if trans_date.month == month and trans_date.year == year:
-                month_transactions.append(transaction)
+        # Find the month's transactions with a binary search of the date index
+        month_rows = self._rows_between(*TransactionColumns.month_range(month, year))
+        month_transactions = [self.transactions[row] for row in month_rows]
         
         if not month_transactions:
             print(f"\nNo transactions found for {month:02d}/{year}")
@@ -125,26 +177,36 @@ class ReportsManager:
         # Calculate monthly totals
         monthly_income = 0
         monthly_expenses = 0
-        income_by_category = defaultdict(float)
-        expense_by_category = defaultdict(float)
-        
-        # Process each transaction
-        for transaction in month_transactions:
-            amount = float(transaction['amount'])
-            category = transaction['category']
-            
-            if transaction['type'] == 'income':
-                monthly_income += amount
-                income_by_category[category] += amount
-            else:
-                monthly_expenses += amount
-                expense_by_category[category] += amount
+        income_by_category = defaultdict(int)
+        expense_by_category = defaultdict(int)
+        
+        if self.columns is not None:
+            for (is_income, category_id), (cents, _) in self._column_sums(month_rows, "categories").items():
+                category = self.columns.category_names[category_id]
+                if is_income:
+                    monthly_income += cents
+                    income_by_category[category] += cents
+                else:
+                    monthly_expenses += cents
+                    expense_by_category[category] += cents
+        else:
+            # Process each transaction
+            for transaction in month_transactions:
+                amount = transaction['amount_cents']
+                category = transaction['category']
+                
+                if transaction['type'] == 'income':
+                    monthly_income += amount
+                    income_by_category[category] += amount
+                else:
+                    monthly_expenses += amount
+                    expense_by_category[category] += amount
         
         # Display monthly summary
         monthly_net = monthly_income - monthly_expenses
-        print(f"\nMONTHLY INCOME: ${monthly_income:.2f}")
-        print(f"MONTHLY EXPENSES: ${monthly_expenses:.2f}")
-        print(f"MONTHLY NET: ${monthly_net:.2f}")
+        print(f"\nMONTHLY INCOME: ${Utilities.format_amount(monthly_income)}")
+        print(f"MONTHLY EXPENSES: ${Utilities.format_amount(monthly_expenses)}")
+        print(f"MONTHLY NET: ${Utilities.format_amount(monthly_net)}")
         print(f"TOTAL TRANSACTIONS: {len(month_transactions)}")
         
         # Show income breakdown by category
@@ -152,20 +214,20 @@ class ReportsManager:
             print(f"\nINCOME BREAKDOWN:")
             for category, amount in income_by_category.items():
                 percentage = (amount / monthly_income * 100) if monthly_income > 0 else 0
-                print(f"   {category}: ${amount:.2f} ({percentage:.1f}%)")
+                print(f"   {category}: ${Utilities.format_amount(amount)} ({percentage:.1f}%)")
         
         # Show expense breakdown by category
         if expense_by_category:
             print(f"\n💸 EXPENSE BREAKDOWN:")
             for category, amount in expense_by_category.items():
                 percentage = (amount / monthly_expenses * 100) if monthly_expenses > 0 else 0
-                print(f"   {category}: ${amount:.2f} ({percentage:.1f}%)")
+                print(f"   {category}: ${Utilities.format_amount(amount)} ({percentage:.1f}%)")
         
         # Show recent transactions
         print(f"\n📋 RECENT TRANSACTIONS ({month:02d}/{year}):")
         for transaction in sorted(month_transactions, key=lambda x: x['date'], reverse=True)[:10]:
             trans_type = "💰" if transaction['type'] == 'income' else "💸"
-            print(f"   {trans_type} {transaction['date']} - {transaction['category']} - ${transaction['amount']}")
+            print(f"   {trans_type} {transaction['date']} - {transaction['category']} - ${Utilities.format_amount(transaction['amount_cents'])}")
             print(f"      {transaction['description']}")
         
         return {
@@ -189,20 +251,29 @@ class ReportsManager:
         print("="*50)
         
         # Group transactions by category
-        income_by_category = defaultdict(float)
-        expense_by_category = defaultdict(float)
+        income_by_category = defaultdict(int)
+        expense_by_category = defaultdict(int)
         category_counts = defaultdict(int)
         
-        # Process all transactions
-        for transaction in self.transactions:
-            amount = float(transaction['amount'])
-            category = transaction['category']
-            category_counts[category] += 1
-            
-            if transaction['type'] == 'income':
-                income_by_category[category] += amount
-            else:
-                expense_by_category[category] += amount
+        if self.columns is not None:
+            for (is_income, category_id), (cents, count) in self._column_sums(key="categories").items():
+                category = self.columns.category_names[category_id]
+                category_counts[category] += count
+                if is_income:
+                    income_by_category[category] += cents
+                else:
+                    expense_by_category[category] += cents
+        else:
+            # Process all transactions
+            for transaction in self.transactions:
+                amount = transaction['amount_cents']
+                category = transaction['category']
+                category_counts[category] += 1
+                
+                if transaction['type'] == 'income':
+                    income_by_category[category] += amount
+                else:
+                    expense_by_category[category] += amount
         
         # Calculate totals
         total_income = sum(income_by_category.values())
@@ -214,7 +285,7 @@ class ReportsManager:
             for category, amount in sorted(income_by_category.items(), key=lambda x: x[1], reverse=True):
                 percentage = (amount / total_income * 100) if total_income > 0 else 0
                 count = category_counts[category]
-                print(f"   {category}: ${amount:.2f} ({percentage:.1f}%) - {count} transactions")
+                print(f"   {category}: ${Utilities.format_amount(amount)} ({percentage:.1f}%) - {count} transactions")
         
         # Display expense categories
         if expense_by_category:
@@ -222,14 +293,14 @@ class ReportsManager:
             for category, amount in sorted(expense_by_category.items(), key=lambda x: x[1], reverse=True):
                 percentage = (amount / total_expenses * 100) if total_expenses > 0 else 0
                 count = category_counts[category]
-                print(f"   {category}: ${amount:.2f} ({percentage:.1f}%) - {count} transactions")
+                print(f"   {category}: ${Utilities.format_amount(amount)} ({percentage:.1f}%) - {count} transactions")
         
         # Show top spending categories
         if expense_by_category:
             print(f"\n🏆 TOP SPENDING CATEGORIES:")
             sorted_expenses = sorted(expense_by_category.items(), key=lambda x: x[1], reverse=True)
             for i, (category, amount) in enumerate(sorted_expenses[:5], 1):
-                print(f"   {i}. {category}: ${amount:.2f}")
+                print(f"   {i}. {category}: ${Utilities.format_amount(amount)}")
         
         return {
             'income_by_category': dict(income_by_category),
@@ -251,15 +322,22 @@ class ReportsManager:
         # Group transactions by month
         monthly_data = defaultdict(lambda: {'income': 0, 'expenses': 0, 'count': 0})
         
-        # Process all transactions
-        for transaction in self.transactions:
-            # Extract year-month from date
-            date_parts = transaction['date'].split('-')
-            year_month = f"{date_parts[0]}-{date_parts[1]}"
-            amount = float(transaction['amount'])
-            
-            monthly_data[year_month][transaction['type']] += amount
-            monthly_data[year_month]['count'] += 1
+        if self.columns is not None:
+            # Group by day first, then fold the days into months
+            for (is_income, day), (cents, count) in self._column_sums(key="dates").items():
+                year_month = date.fromordinal(day).strftime('%Y-%m') if day else "unknown"
+                monthly_data[year_month]['income' if is_income else 'expenses'] += cents
+                monthly_data[year_month]['count'] += count
+        else:
+            # Process all transactions
+            for transaction in self.transactions:
+                # Extract year-month from date
+                date_parts = transaction['date'].split('-')
+                year_month = f"{date_parts[0]}-{date_parts[1]}"
+                amount = transaction['amount_cents']
+                
+                monthly_data[year_month]['income' if transaction['type'] == 'income' else 'expenses'] += amount
+                monthly_data[year_month]['count'] += 1
         
         if not monthly_data:
             print("\n❌ No transaction data available for trends")
@@ -275,7 +353,8 @@ class ReportsManager:
         trends_data = []
         for month, data in sorted_months:
             net = data['income'] - data['expenses']
-            print(f"{month:<12} ${data['income']:<11.2f} ${data['expenses']:<11.2f} ${net:<11.2f} {data['count']:<8}")
+            print(f"{month:<12} ${Utilities.format_amount(data['income']):<11} ${Utilities.format_amount(data['expenses']):<11} "
+                  f"${Utilities.format_amount(net):<11} {data['count']:<8}")
             
             trends_data.append({
                 'month': month,
@@ -295,13 +374,13 @@ class ReportsManager:
             expense_change = recent['expenses'] - previous['expenses']
             
             print(f"   Last month vs previous:")
-            print(f"   Income change: ${income_change:+.2f}")
-            print(f"   Expense change: ${expense_change:+.2f}")
+            print(f"   Income change: ${Utilities.format_amount(income_change, signed=True)}")
+            print(f"   Expense change: ${Utilities.format_amount(expense_change, signed=True)}")
             
             if expense_change > 0:
-                print(f"   ⚠️  Spending increased by ${expense_change:.2f}")
+                print(f"   ⚠️  Spending increased by ${Utilities.format_amount(expense_change)}")
             elif expense_change < 0:
-                print(f"   ✅ Spending decreased by ${abs(expense_change):.2f}")
+                print(f"   ✅ Spending decreased by ${Utilities.format_amount(abs(expense_change))}")
             else:
                 print(f"   ➡️  Spending stayed the same")
         
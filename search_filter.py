@@ -1,6 +1,178 @@
-from typing import List, Dict
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+from typing import Any, Callable, Iterable, List, Dict, Optional, Tuple, Union
 from datetime import datetime
 from transactions import TransactionManager
+from jsonhandler import JsonHandler
+from columnar import TransactionColumns
+from text_index import TrigramIndex
+from utility import Utilities
+
+# Indexes over users' transaction lists, shared by every manager:
+# {(user_id, kind): (transactions, data version, index)}
+_indexes: Dict[tuple, tuple] = {}
+
+def cached_index(user_id: str, transactions: List[Dict], kind: str, build: Callable[[List[Dict]], Any]) -> Any:
+    """
+    Return the index of the given kind over a user's transactions, building it with build(transactions)
+    An index is reused until the transactions are written or reloaded (see JsonHandler.transactions_version)
+    """
+    index = current_index(user_id, transactions, kind)
+    if index is None:
+        index = build(transactions)
+        _indexes[(user_id, kind)] = (transactions, JsonHandler().transactions_version(user_id), index)
+    return index
+
+def current_index(user_id: str, transactions: List[Dict], kind: str) -> Optional[Any]:
+    """Return the index of the given kind if one is built and up to date, without building it"""
+    entry = _indexes.get((user_id, kind))
+    if (entry is not None and entry[0] is transactions
+            and entry[1] == JsonHandler().transactions_version(user_id)):
+        return entry[2]
+    return None
+
+class DateIndex:
+    """
+    Row numbers of a transaction list ordered by date
+    A date range is found with two binary searches instead of parsing every date
+    """
+    
+    def __init__(self, transactions: List[Dict]):
+        # Each distinct date is parsed once; dates that do not parse sort first as 0
+        ordinals = {}
+        keys = []
+        for transaction in transactions:
+            day = transaction['date']
+            ordinal = ordinals.get(day)
+            if ordinal is None:
+                try:
+                    ordinal = datetime.strptime(day, '%Y-%m-%d').toordinal()
+                except (TypeError, ValueError):
+                    ordinal = 0
+                ordinals[day] = ordinal
+            keys.append(ordinal)
+        self.rows = sorted(range(len(keys)), key=keys.__getitem__)
+        self.ordinals = [keys[row] for row in self.rows]
+    
+    def rows_between(self, first: int, last: int) -> List[int]:
+        """Rows dated between two day ordinals (inclusive), in their original order"""
+        return sorted(self.rows[bisect_left(self.ordinals, first):bisect_right(self.ordinals, last)])
+
+class AmountIndex:
+    """
+    Row numbers of a transaction list ordered by amount (integer cents)
+    Equal amounts keep their original order, as sorted() would leave them
+    """
+    
+    def __init__(self, transactions: List[Dict]):
+        amounts = [transaction['amount_cents'] for transaction in transactions]
+        self.rows = sorted(range(len(amounts)), key=amounts.__getitem__)
+        self.cents = [amounts[row] for row in self.rows]
+        self._descending = None
+    
+    def rows_between(self, low: int, high: int) -> List[int]:
+        """Rows with an amount between low and high cents (inclusive), in their original order"""
+        return sorted(self.rows[bisect_left(self.cents, low):bisect_right(self.cents, high)])
+    
+    def descending(self) -> List[int]:
+        """Rows from the largest amount down, equal amounts still in their original order"""
+        if self._descending is None:
+            rows = []
+            end = len(self.rows)
+            while end > 0:
+                # Take each run of equal amounts whole, starting from the top
+                start = bisect_left(self.cents, self.cents[end - 1], 0, end)
+                rows.extend(self.rows[start:end])
+                end = start
+            self._descending = rows
+        return self._descending
+
+class TransactionQuery:
+    """
+    A search that combines several criteria; criteria left as None match everything
+    Dates (YYYY-MM-DD) and amounts (currency units) are inclusive bounds. Categories,
+    types and payment methods are matched ignoring case, and text must appear in the
+    description. terms is a word query for the description index (see search_descriptions).
+    Results keep their original order unless sort_by is one of SORT_KEYS.
+    """
+    
+    SORT_KEYS = {
+        'amount': lambda x: x['amount_cents'],
+        'date': lambda x: x['date'],
+        'category': lambda x: x['category'],
+        'type': lambda x: x['type']
+    }
+    
+    def __init__(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 categories: Union[str, Iterable[str], None] = None, types: Union[str, Iterable[str], None] = None,
+                 payment_methods: Union[str, Iterable[str], None] = None, min_amount: Optional[float] = None,
+                 max_amount: Optional[float] = None, text: Optional[str] = None, terms: Optional[str] = None,
+                 sort_by: Optional[str] = None, descending: bool = False, limit: Optional[int] = None):
+        """
+        Check and normalize the criteria once, so each row is compared without conversions
+        Raises ValueError for a bad date or an unknown sort key
+        """
+        if sort_by is not None and sort_by not in self.SORT_KEYS:
+            raise ValueError(f"Invalid sort key: {sort_by}")
+        self.first_day = datetime.strptime(start_date, '%Y-%m-%d').toordinal() if start_date else None
+        self.last_day = datetime.strptime(end_date, '%Y-%m-%d').toordinal() if end_date else None
+        self.low_cents = math.ceil(round(min_amount * 100, 6)) if min_amount is not None else None
+        self.high_cents = math.floor(round(max_amount * 100, 6)) if max_amount is not None else None
+        self.categories = self._names(categories)
+        self.types = self._names(types)
+        self.payment_methods = self._names(payment_methods)
+        self.text = text.lower() if text else None
+        self.terms = terms if terms and terms.strip() else None
+        self.sort_by = sort_by
+        self.descending = descending
+        self.limit = limit
+    
+    @staticmethod
+    def _names(values: Union[str, Iterable[str], None]) -> Optional[set]:
+        """Lowercased set of one name or several (None when not given)"""
+        if values is None:
+            return None
+        if isinstance(values, str):
+            values = [values]
+        return {value.strip().lower() for value in values}
+    
+    def predicates(self, skip: Optional[str] = None) -> List[Callable[[Dict], bool]]:
+        """
+        Get a test for every criterion that is set, except terms (see SearchFilterManager._plan)
+        skip names a criterion ('date' or 'amount') already applied through an index
+        """
+        tests = []
+        if skip != 'date' and (self.first_day is not None or self.last_day is not None):
+            first = self.first_day if self.first_day is not None else -math.inf
+            last = self.last_day if self.last_day is not None else math.inf
+            ordinals = {}
+            
+            def in_dates(transaction: Dict) -> bool:
+                # Each distinct date is parsed once per query
+                day = transaction['date']
+                ordinal = ordinals.get(day)
+                if ordinal is None:
+                    try:
+                        ordinal = datetime.strptime(day, '%Y-%m-%d').toordinal()
+                    except (TypeError, ValueError):
+                        ordinal = 0
+                    ordinals[day] = ordinal
+                return first <= ordinal <= last
+            tests.append(in_dates)
+        if skip != 'amount' and (self.low_cents is not None or self.high_cents is not None):
+            low = self.low_cents if self.low_cents is not None else -math.inf
+            high = self.high_cents if self.high_cents is not None else math.inf
+            tests.append(lambda x: low <= x['amount_cents'] <= high)
+        if self.categories is not None:
+            tests.append(lambda x: x['category'].lower() in self.categories)
+        if self.types is not None:
+            tests.append(lambda x: x['type'].lower() in self.types)
+        if self.payment_methods is not None:
+            tests.append(lambda x: (x.get('payment_method') or '').lower() in self.payment_methods)
+        if self.text:
+            tests.append(lambda x: self.text in (x.get('description') or '').lower())
+        return tests
 
 class SearchFilterManager:
     """
@@ -15,6 +187,8 @@ class SearchFilterManager:
         """
         self.user_id = user_id
         self.transactions = self._load_user_transactions()
+        self.columns = self._load_user_columns()
+        self.last_plan = None
     
     def _load_user_transactions(self) -> List[Dict]:
         """
@@ -29,6 +203,37 @@ class SearchFilterManager:
             print(f"Error loading transactions: {e}")
             return []
     
+    def _load_user_columns(self) -> Optional[TransactionColumns]:
+        """
+        Load the columnar copy of this user's transactions
+        Returns None when the columnar store is off; row i is self.transactions[i]
+        """
+        columns = JsonHandler().load_user_columns(self.user_id)
+        if columns is not None and len(columns) != len(self.transactions):
+            return None
+        return columns
+    
+    def date_index(self) -> DateIndex:
+        """
+        Get the date-ordered index of this user's transactions
+        It is built once and reused until the transactions change
+        """
+        return cached_index(self.user_id, self.transactions, "date", DateIndex)
+    
+    def amount_index(self) -> AmountIndex:
+        """
+        Get the amount-ordered index of this user's transactions
+        It is built once and reused until the transactions change
+        """
+        return cached_index(self.user_id, self.transactions, "amount", AmountIndex)
+    
+    def trigram_index(self) -> Optional[TrigramIndex]:
+        """
+        Get the trigram index of this user's transaction descriptions
+        It is built once and then kept in step with every add, edit and delete (None on error)
+        """
+        return JsonHandler().load_trigram_index(self.user_id)
+
     def search_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
         """
         Search transactions by date range
@@ -39,14 +244,9 @@ class SearchFilterManager:
             start_dt = datetime.strptime(start_date, '%Y-%m-%d')
             end_dt = datetime.strptime(end_date, '%Y-%m-%d')
             
-            # Filter transactions within the date range
-            filtered_transactions = []
-            for transaction in self.transactions:
-                trans_date = datetime.strptime(transaction['date'], '%Y-%m-%d')
-                if start_dt <= trans_date <= end_dt:
-                    filtered_transactions.append(transaction)
-            
-            return filtered_transactions
+            # Binary search the date index instead of parsing every date
+            rows = self.date_index().rows_between(start_dt.toordinal(), end_dt.toordinal())
+            return [self.transactions[row] for row in rows]
             
         except ValueError as e:
             print(f"Invalid date format. Use YYYY-MM-DD: {e}")
@@ -61,6 +261,10 @@ class SearchFilterManager:
         This helps you find all transactions in a specific category
         """
         try:
+            if self.columns is not None:
+                category_ids = self.columns.ids("categories", [category], ignore_case=True)
+                return [self.transactions[row] for row in self.columns.rows("categories", category_ids)]
+            
             filtered_transactions = []
             for transaction in self.transactions:
                 if transaction['category'].lower() == category.lower():
@@ -78,13 +282,11 @@ class SearchFilterManager:
         This helps you find transactions within a specific amount range
         """
         try:
-            filtered_transactions = []
-            for transaction in self.transactions:
-                amount = float(transaction['amount'])
-                if min_amount <= amount <= max_amount:
-                    filtered_transactions.append(transaction)
-            
-            return filtered_transactions
+            # Binary search the amount index with the bounds converted to cents once
+            low = math.ceil(round(min_amount * 100, 6))
+            high = math.floor(round(max_amount * 100, 6))
+            rows = self.amount_index().rows_between(low, high)
+            return [self.transactions[row] for row in rows]
             
         except Exception as e:
             print(f"Error filtering by amount range: {e}")
@@ -97,8 +299,13 @@ class SearchFilterManager:
         """
         try:
             if key == 'amount':
-                # Sort by amount (convert to float for proper sorting)
-                return sorted(transactions_list, key=lambda x: float(x['amount']), reverse=reverse)
+                if transactions_list is self.transactions:
+                    # All of the user's transactions are already in order in the amount index
+                    index = self.amount_index()
+                    rows = index.descending() if reverse else index.rows
+                    return [self.transactions[row] for row in rows]
+                # Sort by amount (integer cents, no conversion needed)
+                return sorted(transactions_list, key=lambda x: x['amount_cents'], reverse=reverse)
             elif key == 'date':
                 # Sort by date
                 return sorted(transactions_list, key=lambda x: x['date'], reverse=reverse)
@@ -116,6 +323,163 @@ class SearchFilterManager:
             print(f"Error sorting transactions: {e}")
             return transactions_list
     
+    def query(self, query: Optional[TransactionQuery] = None, **criteria) -> List[Dict]:
+        """
+        Run a combined search, given as a TransactionQuery or as its keyword arguments
+        The planner fetches candidates from the most selective index, then one pass
+        applies the other criteria; how it ran is left in self.last_plan
+        """
+        try:
+            if query is None:
+                query = TransactionQuery(**criteria)
+            if query.limit is not None and query.limit <= 0:
+                return []
+            
+            path, candidates, ordered, tests = self._plan(query)
+            self.last_plan = path
+            # Without sorting left to do, the pass can stop as soon as it has enough rows
+            stop = query.limit if ordered or query.sort_by is None else None
+            
+            results = []
+            for transaction in candidates:
+                if all(test(transaction) for test in tests):
+                    results.append(transaction)
+                    if stop is not None and len(results) >= stop:
+                        break
+            
+            if query.sort_by is not None and not ordered:
+                key = TransactionQuery.SORT_KEYS[query.sort_by]
+                if query.limit is not None:
+                    select = heapq.nlargest if query.descending else heapq.nsmallest
+                    return select(query.limit, results, key=key)
+                return sorted(results, key=key, reverse=query.descending)
+            return results
+        
+        except ValueError as e:
+            print(f"Invalid query: {e}")
+            return []
+        except Exception as e:
+            print(f"Error running query: {e}")
+            return []
+    
+    def _plan(self, query: TransactionQuery) -> Tuple[str, Iterable[Dict], bool, List[Callable[[Dict], bool]]]:
+        """
+        Choose how to find a query's candidate transactions
+        Each index that can answer a criterion counts its matches (two binary searches,
+        or a description index lookup) and the one with the fewest wins; with none,
+        every row is scanned. Returns (plan name, candidates, candidates already in sort
+        order, tests for the criteria the candidates still have to meet)
+        """
+        paths = []
+        if query.first_day is not None or query.last_day is not None:
+            index = self.date_index()
+            lo = bisect_left(index.ordinals, query.first_day) if query.first_day is not None else 0
+            hi = bisect_right(index.ordinals, query.last_day) if query.last_day is not None else len(index.rows)
+            paths.append((hi - lo, 'date', index.rows[lo:hi]))
+        if query.low_cents is not None or query.high_cents is not None:
+            index = self.amount_index()
+            lo = bisect_left(index.cents, query.low_cents) if query.low_cents is not None else 0
+            hi = bisect_right(index.cents, query.high_cents) if query.high_cents is not None else len(index.rows)
+            paths.append((hi - lo, 'amount', index.rows[lo:hi]))
+        matched_ids = None
+        if query.terms is not None:
+            terms_index = JsonHandler().load_description_index(self.user_id)
+            if terms_index is None:
+                # The index could not be loaded (already reported), so no description can match
+                return 'terms', [], True, []
+            matched_ids = terms_index.search(query.terms)
+            # The transactions are only fetched if this path is chosen
+            paths.append((len(matched_ids), 'terms', None))
+        
+        if paths:
+            _, path, rows = min(paths, key=lambda x: x[0])
+            # The slice of the amount index is already sorted by amount
+            ordered = path == 'amount' and query.sort_by == 'amount' and not query.descending
+            if path == 'terms':
+                candidates = terms_index.transactions(matched_ids)
+            elif not ordered:
+                rows = sorted(rows)
+        elif query.sort_by == 'amount':
+            # Walk the amount index in order, so a limit ends the scan early
+            index = self.amount_index()
+            path, rows, ordered = 'amount order', index.descending() if query.descending else index.rows, True
+        else:
+            path, rows, ordered = 'full scan', None, False
+        
+        if path == 'full scan':
+            candidates = self.transactions
+        elif path != 'terms':
+            candidates = (self.transactions[row] for row in rows)
+        tests = query.predicates(skip=path)
+        if matched_ids is not None and path != 'terms':
+            tests.append(lambda x: x['transaction_id'] in matched_ids)
+        return path, candidates, ordered, tests
+    
+    def search_descriptions(self, text_query: str) -> List[Dict]:
+        """
+        Search descriptions by words: every word must appear, "OR" separates alternatives
+        and a word ending in "*" matches as a prefix (e.g. "coffee OR tea", "amaz* mktp")
+        Words are looked up in the full-text index instead of reading every description,
+        and the index returns the matches in their original order
+        """
+        try:
+            index = JsonHandler().load_description_index(self.user_id)
+            if index is None:
+                return []
+            return index.transactions(index.search(text_query))
+        except Exception as e:
+            print(f"Error searching descriptions: {e}")
+            return []
+    
+    def similar_descriptions(self, text: str, min_similarity: float = 0.3,
+                             limit: Optional[int] = 10) -> List[Tuple[str, float, int]]:
+        """
+        Find descriptions (merchants) that look like text, despite spelling and punctuation
+        e.g. "amazon" finds "AMAZON.COM" and "Amazon Mktp". Returns (description,
+        similarity from 0 to 1, number of transactions), best match first
+        """
+        try:
+            index = self.trigram_index()
+            if index is None:
+                return []
+            matches = index.search(text, min_similarity)[:limit]
+            return [(index.labels[number], score, index.count(number)) for score, number in matches]
+        except Exception as e:
+            print(f"Error finding similar descriptions: {e}")
+            return []
+    
+    def fuzzy_search(self, text: str, min_similarity: float = 0.3) -> List[Dict]:
+        """
+        Find transactions whose description looks like text, best match first
+        Transactions with the same description stay in their original order
+        """
+        try:
+            index = self.trigram_index()
+            if index is None:
+                return []
+            return [transaction
+                    for _, number in index.search(text, min_similarity)
+                    for transaction in index.transactions(number)]
+        except Exception as e:
+            print(f"Error running fuzzy search: {e}")
+            return []
+    
+    def top_transactions(self, n: int, largest: bool = True) -> List[Dict]:
+        """
+        Get the n largest (or, with largest=False, smallest) transactions by amount
+        Reads the amount index when it is already built, otherwise selects with a heap in one pass
+        """
+        try:
+            index = current_index(self.user_id, self.transactions, "amount")
+            if index is not None:
+                rows = index.descending() if largest else index.rows
+                return [self.transactions[row] for row in rows[:max(n, 0)]]
+            select = heapq.nlargest if largest else heapq.nsmallest
+            return select(n, self.transactions, key=lambda x: x['amount_cents'])
+        except Exception as e:
+            print(f"Error finding top transactions: {e}")
+            return []
+    
     def display_transactions(self, transactions_list: List[Dict], title: str = "Search Results"):
         """
         Display a list of transactions in a nice format
@@ -134,7 +498,7 @@ class SearchFilterManager:
         for i, transaction in enumerate(transactions_list, 1):
             trans_type = "💰" if transaction['type'] == 'income' else "💸"
             print(f"\n[{i}] {trans_type} {transaction['date']} - {transaction['type'].upper()}")
-            print(f"    Amount: ${transaction['amount']} | Category: {transaction['category']}")
+            print(f"    Amount: ${Utilities.format_amount(transaction['amount_cents'])} | Category: {transaction['category']}")
             print(f"    Description: {transaction['description']}")
             print(f"    Payment Method: {transaction['payment_method']}")
             print("-" * 40)
@@ -144,6 +508,9 @@ class SearchFilterManager:
         Get all unique categories from user's transactions
         This helps users see what categories are available
         """
+        if self.columns is not None:
+            # The category dictionary already holds each distinct category once
+            return sorted(self.columns.category_names)
         categories = set()
         for transaction in self.transactions:
             categories.add(transaction['category'])
@@ -160,10 +527,13 @@ def search_menu(current_user: Dict) -> None:
         print("3. Filter by Amount Range")
         print("4. Sort Transactions")
         print("5. View All Transactions")
-        print("6. Back to Main Menu")
+        print("6. Search Descriptions")
+        print("7. Fuzzy Search (similar descriptions)")
+        print("8. Advanced Search")
+        print("9. Back to Main Menu")
         print("----------------------------------")
         
-        choice = input("Enter your choice (1-6): ").strip()
+        choice = input("Enter your choice (1-9): ").strip()
         
         # Create a SearchFilterManager instance for this user
         search_manager = SearchFilterManager(current_user['id'])
@@ -225,8 +595,10 @@ def search_menu(current_user: Dict) -> None:
             print("4. Date (Newest First)")
             print("5. Category (A-Z)")
             print("6. Type (Income first)")
+            print("7. Largest Amounts (Top N)")
+            print("8. Smallest Amounts (Bottom N)")
             
-            sort_choice = input("Enter your choice (1-6): ").strip()
+            sort_choice = input("Enter your choice (1-8): ").strip()
             
             if sort_choice == "1":
                 results = search_manager.sort_transactions(search_manager.transactions, 'amount', False)
@@ -246,6 +618,14 @@ def search_menu(current_user: Dict) -> None:
             elif sort_choice == "6":
                 results = search_manager.sort_transactions(search_manager.transactions, 'type', False)
                 search_manager.display_transactions(results, "Transactions sorted by Type (Income first)")
+            elif sort_choice in ("7", "8"):
+                try:
+                    n = int(input("How many transactions? ").strip())
+                    largest = sort_choice == "7"
+                    results = search_manager.top_transactions(n, largest)
+                    search_manager.display_transactions(results, f"{'Largest' if largest else 'Smallest'} {n} Transactions by Amount")
+                except ValueError:
+                    print("Please enter a valid number!")
             else:
                 print("Invalid choice!")
             
@@ -257,8 +637,86 @@ def search_menu(current_user: Dict) -> None:
             input("\nPress Enter to continue...")
             
         elif choice == "6":
+            print("\n--- Search Descriptions ---")
+            print("All words must match; use OR between alternatives and * for a prefix (e.g. coffee OR tea, amaz*)")
+            text_query = input("Search for: ").strip()
+            if text_query:
+                results = search_manager.search_descriptions(text_query)
+                search_manager.display_transactions(results, f"Descriptions matching '{text_query}'")
+            else:
+                print("Please enter at least one word!")
+            input("\nPress Enter to continue...")
+        
+        elif choice == "7":
+            print("\n--- Fuzzy Search ---")
+            text = input("Description or merchant (spelling need not be exact): ").strip()
+            matches = search_manager.similar_descriptions(text) if text else []
+            if matches:
+                print(f"\n{'Similarity':<12} {'Count':<7} Description")
+                print("-" * 60)
+                for description, score, count in matches:
+                    print(f"{score:>9.0%}    {count:<7} {description}")
+                print("-" * 60)
+                if input("Show the matching transactions? (y/n): ").strip().lower() == "y":
+                    results = search_manager.fuzzy_search(text)
+                    search_manager.display_transactions(results, f"Descriptions similar to '{text}'")
+            else:
+                print("No similar descriptions found!")
+            input("\nPress Enter to continue...")
+        
+        elif choice == "8":
+            print("\n--- Advanced Search ---")
+            print("Press Enter to skip any field.")
+            try:
+                criteria = {}
+                start_date = input("Start date (YYYY-MM-DD): ").strip()
+                end_date = input("End date (YYYY-MM-DD): ").strip()
+                categories = input("Categories (comma separated): ").strip()
+                trans_type = input("Type (income/expense): ").strip()
+                payment_methods = input("Payment methods (comma separated): ").strip()
+                min_amount = input("Minimum amount: ").strip()
+                max_amount = input("Maximum amount: ").strip()
+                text = input("Description contains: ").strip()
+                terms = input("Description words (OR, prefix*): ").strip()
+                sort_by = input("Sort by (amount/date/category/type): ").strip().lower()
+                descending = sort_by and input("Descending? (y/n): ").strip().lower() == "y"
+                limit = input("Maximum number of results: ").strip()
+                
+                if start_date:
+                    criteria['start_date'] = start_date
+                if end_date:
+                    criteria['end_date'] = end_date
+                if categories:
+                    criteria['categories'] = [c for c in categories.split(",") if c.strip()]
+                if trans_type:
+                    criteria['types'] = trans_type
+                if payment_methods:
+                    criteria['payment_methods'] = [p for p in payment_methods.split(",") if p.strip()]
+                if min_amount:
+                    criteria['min_amount'] = float(min_amount)
+                if max_amount:
+                    criteria['max_amount'] = float(max_amount)
+                if text:
+                    criteria['text'] = text
+                if terms:
+                    criteria['terms'] = terms
+                if sort_by:
+                    criteria['sort_by'] = sort_by
+                    criteria['descending'] = bool(descending)
+                if limit:
+                    criteria['limit'] = int(limit)
+                
+                results = search_manager.query(**criteria)
+                search_manager.display_transactions(results, "Advanced Search Results")
+            except ValueError:
+                print("Please enter valid numbers!")
+            except Exception as e:
+                print(f"Error: {e}")
+            input("\nPress Enter to continue...")
+        
+        elif choice == "9":
             break
-            
+        
         else:
-            print("Invalid choice! Please enter 1-6.")
+            print("Invalid choice! Please enter 1-9.")
             input("\nPress Enter to continue...")
\ No newline at end of file
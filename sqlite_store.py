@@ -0,0 +1,432 @@
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Any, Optional
+
+from utility import Utilities
+from records import TransactionRecord
+
+
+class SqliteStore:
+    """SQLite storage backend exposing the same load/save interface as JsonHandler"""
+
+    TRANSACTION_FIELDS = ["transaction_id", "user_id", "type", "amount_cents", "category",
+                          "date", "description", "payment_method"]
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS users (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            user_id TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_users_user_id ON users (user_id);
+
+        CREATE TABLE IF NOT EXISTS transactions (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaction_id TEXT NOT NULL UNIQUE,
+            user_id TEXT NOT NULL,
+            type TEXT,
+            amount_cents INTEGER,
+            category TEXT,
+            date TEXT,
+            description TEXT,
+            payment_method TEXT,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions (user_id, seq);
+        CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (user_id, date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (user_id, category);
+
+        CREATE TABLE IF NOT EXISTS bills (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            bill_id TEXT,
+            user_id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_bills_user_id ON bills (user_id, seq);
+
+        CREATE TABLE IF NOT EXISTS budgets (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            month TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_budgets_user_id ON budgets (user_id, month);
+
+        CREATE TABLE IF NOT EXISTS imports (
+            key TEXT PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        db_dir = os.path.dirname(db_file)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        self._conn.commit()
+        self._migrate_amounts()
+
+    def _migrate_amounts(self) -> None:
+        """Add integer cents to a database created when amounts were REAL
+
+        The cents are computed the same way as for JSON data. The old amount
+        column is left in place (NULL for new rows) rather than rebuilding
+        the table, so an amount that is not a number is reported, counted as
+        0 cents and still there to correct.
+        """
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(transactions)")}
+        if "amount_cents" in columns:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("ALTER TABLE transactions ADD COLUMN amount_cents INTEGER")
+            rows = self._conn.execute("SELECT seq, transaction_id, amount FROM transactions").fetchall()
+            updates = []
+            for seq, transaction_id, amount in rows:
+                try:
+                    amount_cents = 0 if amount is None else Utilities.to_cents(amount)
+                except ValueError:
+                    print(f"Warning: transaction {transaction_id} has an unreadable amount {amount!r}; "
+                          f"it counts as 0 until a valid amount is set")
+                    amount_cents = 0
+                updates.append((amount_cents, seq))
+            self._conn.executemany("UPDATE transactions SET amount_cents = ? WHERE seq = ?", updates)
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------
+    # Users
+    # ------------------------------
+
+    def load_users(self) -> Dict[str, Any]:
+        """Load all users keyed by username"""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, data FROM users ORDER BY seq").fetchall()
+        return {name: json.loads(data) for name, data in rows}
+
+    def save_users(self, users: Dict[str, Any]) -> bool:
+        """Replace all users"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM users")
+            self._conn.executemany(
+                "INSERT INTO users (name, user_id, data) VALUES (?, ?, ?)",
+                ((name, user.get("id"), json.dumps(user)) for name, user in users.items())
+            )
+        return True
+
+    # ------------------------------
+    # Transactions
+    # ------------------------------
+
+    def load_transactions(self) -> Dict[str, Any]:
+        """Load all transactions grouped by user ID"""
+        transactions = {}
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT transaction_id, user_id, type, amount_cents, category, date, description, "
+                "payment_method, extra FROM transactions ORDER BY seq"
+            )
+            for row in cursor:
+                transaction = self._row_to_transaction(row)
+                transactions.setdefault(transaction["user_id"], []).append(transaction)
+        return transactions
+
+    def load_user_transactions(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load transactions of a single user"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT transaction_id, user_id, type, amount_cents, category, date, description, "
+                "payment_method, extra FROM transactions WHERE user_id = ? ORDER BY seq",
+                (user_id,)
+            )
+            return [self._row_to_transaction(row) for row in cursor]
+
+    def save_transactions(self, transactions: Dict[str, Any]) -> bool:
+        """Replace all transactions"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions")
+            self._conn.executemany(
+                self._insert_transaction_sql(),
+                (self._transaction_to_row(t) for user_transactions in transactions.values()
+                 for t in user_transactions)
+            )
+        return True
+
+    def save_user_transactions(self, user_id: str, user_transactions: List[Dict[str, Any]]) -> bool:
+        """Replace the transactions of a single user"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM transactions WHERE user_id = ?", (user_id,))
+            self._conn.executemany(
+                self._insert_transaction_sql(),
+                (self._transaction_to_row(t) for t in user_transactions)
+            )
+        return True
+
+    def append_transaction(self, transaction: Dict[str, Any]) -> bool:
+        """Insert a single transaction
+
+        Raises:
+            sqlite3.IntegrityError: If its transaction_id is already stored
+        """
+        with self._lock, self._conn:
+            self._conn.execute(self._insert_transaction_sql(), self._transaction_to_row(transaction))
+        return True
+
+    def append_transactions(self, transactions: List[Dict[str, Any]]) -> bool:
+        """Insert many transactions in one database transaction
+
+        Raises:
+            sqlite3.IntegrityError: If a transaction_id is already stored (nothing is inserted)
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(self._insert_transaction_sql(),
+                                   (self._transaction_to_row(t) for t in transactions))
+        return True
+
+    def update_transaction(self, user_id: str, transaction_id: str, fields: Dict[str, Any]) -> bool:
+        """Update fields of an existing transaction"""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT transaction_id, user_id, type, amount_cents, category, date, description, "
+                "payment_method, extra FROM transactions WHERE transaction_id = ? AND user_id = ?",
+                (transaction_id, user_id)
+            ).fetchone()
+            if row is None:
+                return False
+            transaction = self._row_to_transaction(row)
+            transaction.update(fields)
+            values = self._transaction_to_row(transaction)
+            self._conn.execute(
+                "UPDATE transactions SET type = ?, amount_cents = ?, category = ?, date = ?, "
+                "description = ?, payment_method = ?, extra = ? WHERE transaction_id = ?",
+                values[2:] + (transaction_id,)
+            )
+        return True
+
+    def remove_transaction(self, user_id: str, transaction_id: str) -> bool:
+        """Delete a transaction"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM transactions WHERE transaction_id = ? AND user_id = ?",
+                (transaction_id, user_id)
+            )
+        return cursor.rowcount > 0
+
+    def find_transaction(self, transaction_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a transaction by ID"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT transaction_id, user_id, type, amount_cents, category, date, description, "
+                "payment_method, extra FROM transactions WHERE transaction_id = ?",
+                (transaction_id,)
+            ).fetchone()
+        return self._row_to_transaction(row) if row is not None else None
+
+    def count_duplicates(self, transaction: Dict[str, Any]) -> int:
+        """Number of stored transactions of the same user with the same fingerprint
+        
+        Candidates come from the (user_id, date) index and are narrowed down
+        in SQL, so only the description is compared here.
+        """
+        fingerprint = Utilities.transaction_fingerprint(transaction)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, amount_cents, type, category, description, payment_method FROM transactions "
+                "WHERE user_id = ? AND date = ? AND amount_cents = ? AND lower(type) = ? "
+                "AND lower(category) = ? AND lower(coalesce(payment_method, '')) = ?",
+                (transaction.get("user_id"), transaction.get("date"), int(transaction.get("amount_cents") or 0),
+                 str(transaction.get("type") or "").lower(), str(transaction.get("category") or "").lower(),
+                 str(transaction.get("payment_method") or "").lower())
+            ).fetchall()
+        fields = ("date", "amount_cents", "type", "category", "description", "payment_method")
+        return sum(1 for row in rows
+                   if Utilities.transaction_fingerprint(dict(zip(fields, row))) == fingerprint)
+
+    def compact_transactions(self) -> bool:
+        """Nothing to compact; SQLite maintains its own storage"""
+        return True
+
+    def _insert_transaction_sql(self) -> str:
+        # A plain INSERT: an existing transaction_id raises sqlite3.IntegrityError
+        # (rolling back the whole batch) instead of silently replacing that row
+        return ("INSERT INTO transactions (transaction_id, user_id, type, amount_cents, category, "
+                "date, description, payment_method, extra) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)")
+
+    def _transaction_to_row(self, transaction: Dict[str, Any]) -> tuple:
+        """Split a transaction dict into column values plus a JSON blob of extra keys"""
+        if type(transaction) is not TransactionRecord:
+            # Converts a float "amount" from older callers to cents
+            transaction = TransactionRecord.from_dict(transaction)
+        extra = {k: v for k, v in transaction.items() if k not in self.TRANSACTION_FIELDS}
+        return tuple(transaction.get(field) for field in self.TRANSACTION_FIELDS) + \
+            (json.dumps(extra) if extra else None,)
+
+    def _row_to_transaction(self, row: tuple) -> Dict[str, Any]:
+        """Rebuild a transaction (as a compact TransactionRecord) from a database row"""
+        transaction = dict(zip(self.TRANSACTION_FIELDS, row[:8]))
+        if row[8]:
+            transaction.update(json.loads(row[8]))
+        return TransactionRecord.from_dict(transaction)
+
+    # ------------------------------
+    # Bills
+    # ------------------------------
+
+    def load_bills(self) -> Dict[str, Any]:
+        """Load all bills grouped by user ID"""
+        bills = {}
+        with self._lock:
+            for user_id, data in self._conn.execute("SELECT user_id, data FROM bills ORDER BY seq"):
+                bills.setdefault(user_id, []).append(json.loads(data))
+        return bills
+
+    def load_user_bills(self, user_id: str) -> List[Dict[str, Any]]:
+        """Load bills of a single user"""
+        with self._lock:
+            cursor = self._conn.execute("SELECT data FROM bills WHERE user_id = ? ORDER BY seq", (user_id,))
+            return [json.loads(data) for (data,) in cursor]
+
+    def save_bills(self, bills: Dict[str, Any]) -> bool:
+        """Replace all bills"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM bills")
+            self._conn.executemany(
+                "INSERT INTO bills (bill_id, user_id, data) VALUES (?, ?, ?)",
+                ((bill.get("bill_id"), user_id, json.dumps(bill))
+                 for user_id, user_bills in bills.items() for bill in user_bills)
+            )
+        return True
+
+    def save_user_bills(self, user_id: str, user_bills: List[Dict[str, Any]]) -> bool:
+        """Replace the bills of a single user"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM bills WHERE user_id = ?", (user_id,))
+            self._conn.executemany(
+                "INSERT INTO bills (bill_id, user_id, data) VALUES (?, ?, ?)",
+                ((bill.get("bill_id"), user_id, json.dumps(bill)) for bill in user_bills)
+            )
+        return True
+
+    # ------------------------------
+    # Budgets
+    # ------------------------------
+
+    def load_budgets(self) -> Dict[str, Any]:
+        """Load all budgets as {user_id: {month: {category: amount}}}"""
+        budgets = {}
+        with self._lock:
+            cursor = self._conn.execute("SELECT user_id, month, category, amount FROM budgets ORDER BY seq")
+            for user_id, month, category, amount in cursor:
+                budgets.setdefault(user_id, {}).setdefault(month, {})[category] = amount
+        return budgets
+
+    def load_user_budgets(self, user_id: str) -> Dict[str, Any]:
+        """Load budgets of a single user as {month: {category: amount}}"""
+        budgets = {}
+        with self._lock:
+            cursor = self._conn.execute(
+                "SELECT month, category, amount FROM budgets WHERE user_id = ? ORDER BY seq", (user_id,))
+            for month, category, amount in cursor:
+                budgets.setdefault(month, {})[category] = amount
+        return budgets
+
+    def save_budgets(self, budgets: Dict[str, Any]) -> bool:
+        """Replace all budgets"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM budgets")
+            self._conn.executemany(
+                "INSERT INTO budgets (user_id, month, category, amount) VALUES (?, ?, ?, ?)",
+                ((user_id, month, category, amount)
+                 for user_id, months in budgets.items()
+                 for month, categories in months.items()
+                 for category, amount in categories.items())
+            )
+        return True
+
+    def save_user_budgets(self, user_id: str, user_budgets: Dict[str, Any]) -> bool:
+        """Replace the budgets of a single user"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM budgets WHERE user_id = ?", (user_id,))
+            self._conn.executemany(
+                "INSERT INTO budgets (user_id, month, category, amount) VALUES (?, ?, ?, ?)",
+                ((user_id, month, category, amount)
+                 for month, categories in user_budgets.items()
+                 for category, amount in categories.items())
+            )
+        return True
+
+    # ------------------------------
+    # Import checkpoints
+    # ------------------------------
+
+    def load_imports(self) -> Dict[str, Any]:
+        """Load import checkpoints keyed by user ID and source file hash"""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, data FROM imports").fetchall()
+        return {key: json.loads(data) for key, data in rows}
+
+    def save_imports(self, imports: Dict[str, Any]) -> bool:
+        """Replace all import checkpoints"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM imports")
+            self._conn.executemany(
+                "INSERT INTO imports (key, data) VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in imports.items())
+            )
+        return True
+
+    # ------------------------------
+    # Maintenance
+    # ------------------------------
+
+    def backup(self, backup_file: str) -> bool:
+        """Write a consistent copy of the database to backup_file"""
+        with self._lock:
+            target = sqlite3.connect(backup_file)
+            try:
+                self._conn.backup(target)
+            finally:
+                target.close()
+        return True
+
+    def restore(self, backup_file: str) -> bool:
+        """Replace the contents of the database with a copy made by backup()"""
+        with self._lock:
+            source = sqlite3.connect(backup_file)
+            try:
+                source.backup(self._conn)
+            finally:
+                source.close()
+        return True
+
+
+def migrate_json_to_sqlite(source: Any, target: SqliteStore) -> Dict[str, int]:
+    """Copy every collection from a JSON-backed handler into a SQLite store
+
+    Args:
+        source: Object exposing load_users/load_transactions/load_bills/load_budgets/load_imports
+        target: Destination store
+
+    Returns:
+        Number of top-level records copied per collection
+    """
+    counts = {}
+    for name in ("users", "transactions", "bills", "budgets", "imports"):
+        data = getattr(source, f"load_{name}")()
+        getattr(target, f"save_{name}")(data)
+        if name in ("users", "imports"):
+            counts[name] = len(data)
+        else:
+            counts[name] = sum(len(value) for value in data.values())
+    return counts
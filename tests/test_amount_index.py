@@ -0,0 +1,64 @@
+"""The amount-ordered index behind amount ranges, sorting and top-N"""
+import unittest
+from unittest import mock
+
+import search_filter
+from search_filter import AmountIndex, SearchFilterManager
+from support import StorageTestCase, make_transaction
+
+CENTS = [500, 101, 2500, 103, 101, 99, 500, 2500]
+
+
+class AmountIndexTest(unittest.TestCase):
+    def test_ranges_and_both_orders_keep_ties_in_original_order(self):
+        index = AmountIndex([{"amount_cents": cents} for cents in CENTS])
+        self.assertEqual(index.rows_between(101, 500), [0, 1, 3, 4, 6])
+        self.assertEqual(index.rows_between(600, 2000), [])
+        self.assertEqual(index.rows, [5, 1, 4, 3, 0, 6, 2, 7])
+        self.assertEqual(index.descending(), [2, 7, 0, 6, 3, 1, 4, 5])
+
+
+class AmountSearchTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(self.handler.append_transactions(
+            [make_transaction(i, amount_cents=cents) for i, cents in enumerate(CENTS)]))
+        self.manager = SearchFilterManager("u")
+
+    def ids(self, transactions: list) -> list:
+        return [t["transaction_id"] for t in transactions]
+
+    def test_amount_range_bounds_are_exact_cents(self):
+        self.assertEqual(self.ids(self.manager.filter_by_amount_range(1.01, 1.03)), ["t1", "t3", "t4"])
+        self.assertEqual(self.ids(self.manager.filter_by_amount_range(0.995, 1.025)), ["t1", "t4"])
+        self.assertEqual(self.manager.filter_by_amount_range(30, 20), [])
+
+    def test_sorting_matches_sorted(self):
+        transactions = self.manager.transactions
+        for reverse in (False, True):
+            expected = sorted(transactions, key=lambda t: t["amount_cents"], reverse=reverse)
+            self.assertEqual(self.ids(self.manager.sort_transactions(transactions, reverse=reverse)),
+                             self.ids(expected))
+            self.assertEqual(self.ids(self.manager.sort_transactions(transactions[2:], reverse=reverse)),
+                             self.ids(sorted(transactions[2:], key=lambda t: t["amount_cents"], reverse=reverse)))
+
+    def test_top_n_is_the_same_with_or_without_the_index(self):
+        with mock.patch.object(search_filter, "AmountIndex", side_effect=AmountIndex) as build:
+            by_heap = (self.manager.top_transactions(3), self.manager.top_transactions(2, largest=False))
+            build.assert_not_called()
+            self.manager.sort_transactions(self.manager.transactions)
+            by_index = (self.manager.top_transactions(3), self.manager.top_transactions(2, largest=False))
+            self.manager.filter_by_amount_range(1, 5)
+            self.assertEqual(build.call_count, 1)
+        self.assertEqual([self.ids(found) for found in by_heap], [["t2", "t7", "t0"], ["t5", "t1"]])
+        self.assertEqual(by_index, by_heap)
+        self.assertEqual(self.manager.top_transactions(0), [])
+
+    def test_index_is_rebuilt_after_a_change(self):
+        self.assertEqual(self.ids(self.manager.filter_by_amount_range(0, 1)), ["t5"])
+        self.assertTrue(self.handler.update_transaction("u", "t0", {"amount_cents": 1}))
+        self.assertEqual(self.ids(SearchFilterManager("u").filter_by_amount_range(0, 1)), ["t0", "t5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Incremental backups and restoring them"""
+import glob
+import os
+import unittest
+from unittest import mock
+
+from support import StorageTestCase, make_transaction
+
+
+class BackupTest(StorageTestCase):
+    def add(self, start: int, stop: int) -> None:
+        for i in range(start, stop):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+
+    def test_restore_brings_back_the_data_of_the_backup(self):
+        self.add(0, 3)
+        self.assertTrue(self.handler.save_users({"alice": {"id": "u"}}))
+        backup_id = self.handler.create_backup()["id"]
+
+        self.add(3, 5)
+        self.assertTrue(self.handler.save_bills({"u": [{"bill_id": "1"}]}))
+        self.assertTrue(self.handler.restore_backup(backup_id))
+        self.assertEqual(self.ids(), ["t0", "t1", "t2"])
+        self.assertFalse(os.path.exists(self.handler.bills_file))
+        self.assertEqual(self.handler.load_bills(), {})
+
+        self.restart()
+        self.assertEqual(self.ids(), ["t0", "t1", "t2"])
+        self.assertEqual(self.handler.load_users(), {"alice": {"id": "u"}})
+
+    def test_unchanged_data_adds_no_chunks(self):
+        self.add(0, 3)
+        self.assertGreater(self.handler.create_backup()["new_bytes"], 0)
+        self.assertEqual(self.handler.create_backup()["new_bytes"], 0)
+        self.assertEqual(len(self.handler.list_backups()), 2)
+
+    def test_damaged_backup_leaves_current_data_untouched(self):
+        self.add(0, 3)
+        backup_id = self.handler.create_backup()["id"]
+        self.add(3, 5)
+        self.assertTrue(self.handler.save_bills({"u": [{"bill_id": "1"}]}))
+        for path in glob.glob(os.path.join(self.data_dir, "backup", "objects", "*", "*")):
+            with open(path, "wb") as f:
+                f.write(b"not a chunk")
+
+        with mock.patch("builtins.print"):
+            self.assertFalse(self.handler.restore_backup(backup_id))
+        self.assertEqual(self.ids(), [f"t{i}" for i in range(5)])
+        self.restart()
+        self.assertEqual(self.ids(), [f"t{i}" for i in range(5)])
+        self.assertEqual(self.handler.load_bills(), {"u": [{"bill_id": "1"}]})
+        self.assertEqual(glob.glob(os.path.join(self.data_dir, ".restore_*")), [])
+
+    def test_damaged_journals_and_migrated_files_are_left_alone(self):
+        self.add(0, 2)
+        kept = [self.handler.transactions_journal_file + ".damaged-20240101-000000",
+                self.handler.transactions_file + ".migrated"]
+        for path in kept:
+            with open(path, "w") as f:
+                f.write("{}")
+        manifest = self.handler.create_backup()
+        backup_id = manifest["id"]
+        self.assertEqual(sorted(manifest["files"]), ["transactions.journal"])
+        self.assertTrue(self.handler.restore_backup(backup_id))
+        for path in kept:
+            self.assertTrue(os.path.exists(path))
+
+    def test_prune_keeps_the_newest_backups(self):
+        backup_ids = []
+        for i in range(3):
+            self.add(i, i + 1)
+            backup_ids.append(self.handler.create_backup()["id"])
+        self.assertEqual(self.handler.prune_backups(1)["backups"], 2)
+        self.assertEqual([b["id"] for b in self.handler.list_backups()], backup_ids[-1:])
+        self.add(3, 4)
+        self.assertTrue(self.handler.restore_backup(backup_ids[-1]))
+        self.assertEqual(self.ids(), ["t0", "t1", "t2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+"""Adding many transactions at once through TransactionManager.add_transactions"""
+import unittest
+
+from support import StorageTestCase
+from transactions import TransactionManager
+
+
+def rows() -> list:
+    """Two valid rows around two invalid ones, with categories in any case"""
+    return [
+        {"type": "Expense", "amount": "12.50", "category": "food", "date": "2024-01-02",
+         "description": "lunch", "payment_method": "credit card", "transaction_id": "a"},
+        {"type": "expense", "amount": "0", "category": "Food", "payment_method": "Cash"},
+        {"type": "income", "amount": 100, "category": "Food", "payment_method": "Cash"},
+        {"type": "income", "amount": 2000, "category": "salary", "date": "2024-01-31",
+         "payment_method": "BANK TRANSFER", "transaction_id": "b"},
+    ]
+
+
+class BulkAddTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = TransactionManager()
+
+    def test_all_or_nothing_adds_nothing_when_a_row_is_invalid(self):
+        result = self.manager.add_transactions("u", rows())
+        self.assertFalse(result["success"])
+        self.assertEqual(result["data"]["errors"], [
+            {"row": 1, "message": "Invalid amount"},
+            {"row": 2, "message": "Invalid category for transaction type"},
+        ])
+        self.restart()
+        self.assertEqual(self.ids(), [])
+
+    def test_best_effort_adds_the_valid_rows_in_one_write(self):
+        result = self.manager.add_transactions("u", rows(), mode="best_effort")
+        self.assertTrue(result["success"])
+        self.assertEqual([error["row"] for error in result["data"]["errors"]], [1, 2])
+        self.restart()
+        stored = self.handler.load_user_transactions("u")
+        self.assertEqual([t["transaction_id"] for t in stored], ["a", "b"])
+        self.assertEqual([(t["type"], t["category"], t["payment_method"], t["amount_cents"]) for t in stored],
+                         [("expense", "Food", "Credit Card", 1250), ("income", "Salary", "Bank Transfer", 200000)])
+
+    def test_valid_rows_are_all_added(self):
+        valid = [row for row in rows() if "transaction_id" in row]
+        result = self.manager.add_transactions("u", valid)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["data"]["errors"], [])
+        self.assertEqual(self.ids(), ["a", "b"])
+
+    def test_unknown_mode_is_refused(self):
+        self.assertRaises(ValueError, self.manager.add_transactions, "u", rows(), mode="some")
+        self.assertEqual(self.ids(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""The in-memory cache of parsed data files shared by every manager"""
+import json
+import unittest
+
+from support import StorageTestCase, make_transaction
+
+
+class CacheTest(StorageTestCase):
+    def write_users_elsewhere(self, users: dict) -> None:
+        """Change users.json the way another process would"""
+        with open(self.handler.users_file, "w") as f:
+            json.dump(users, f)
+
+    def test_repeated_reads_share_one_parsed_copy(self):
+        self.assertTrue(self.handler.save_users({"alice": {"id": "a"}}))
+        first = self.handler.load_users()
+        hits = self.handler.cache_stats()["hits"]
+        self.assertIs(self.handler.load_users(), first)
+        self.assertEqual(self.handler.cache_stats()["hits"], hits + 1)
+
+    def test_writes_of_this_process_are_seen_without_rereading(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0)))
+        loaded = self.handler.load_user_transactions("u")
+        self.assertTrue(self.handler.append_transaction(make_transaction(1)))
+        self.assertTrue(self.handler.update_transaction("u", "t0", {"description": "edited"}))
+        misses = self.handler.cache_stats()["misses"]
+        self.assertEqual(self.ids(), ["t0", "t1"])
+        self.assertEqual(loaded[0]["description"], "edited")
+        self.assertEqual(self.handler.cache_stats()["misses"], misses)
+
+        self.assertTrue(self.handler.save_users({"bob": {"id": "b"}}))
+        self.assertEqual(self.handler.load_users(), {"bob": {"id": "b"}})
+
+    def test_version_mode_trusts_the_cache_until_it_is_cleared(self):
+        self.assertTrue(self.handler.save_users({"alice": {"id": "a"}}))
+        self.assertEqual(self.handler.load_users(), {"alice": {"id": "a"}})
+        self.write_users_elsewhere({"carol": {"id": "c", "note": "changed elsewhere"}})
+        self.assertEqual(self.handler.load_users(), {"alice": {"id": "a"}})
+        self.handler.clear_cache()
+        self.assertEqual(self.handler.load_users(), {"carol": {"id": "c", "note": "changed elsewhere"}})
+
+    def test_stat_mode_sees_changes_made_by_another_process(self):
+        self.restart(CACHE_MODE="stat")
+        self.assertTrue(self.handler.save_users({"alice": {"id": "a"}}))
+        self.assertEqual(self.handler.load_users(), {"alice": {"id": "a"}})
+        self.write_users_elsewhere({"carol": {"id": "c", "note": "changed elsewhere"}})
+        self.assertEqual(self.handler.load_users(), {"carol": {"id": "c", "note": "changed elsewhere"}})
+
+    def test_off_mode_always_reads_the_file(self):
+        self.restart(CACHE_MODE="off")
+        self.assertTrue(self.handler.save_users({"alice": {"id": "a"}}))
+        self.assertIsNot(self.handler.load_users(), self.handler.load_users())
+        self.assertEqual(self.handler.cache_stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
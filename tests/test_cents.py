@@ -0,0 +1,109 @@
+"""Amounts stored as integer cents, and data from before they were"""
+import json
+import sqlite3
+import unittest
+from unittest import mock
+
+import manage
+from support import StorageTestCase, make_transaction
+from transactions import Transaction, TransactionManager
+from utility import Utilities
+
+
+class ToCentsTest(unittest.TestCase):
+    def test_amounts_round_half_away_from_zero_without_float_error(self):
+        self.assertEqual(Utilities.to_cents("12.34"), 1234)
+        self.assertEqual(Utilities.to_cents(0.1 + 0.2), 30)
+        self.assertEqual(Utilities.to_cents("1.005"), 101)
+        self.assertEqual(Utilities.to_cents(" 7 "), 700)
+        self.assertRaises(ValueError, Utilities.to_cents, "twelve")
+
+    def test_an_amount_must_be_worth_a_cent(self):
+        self.assertTrue(Utilities.validate_amount("0.005"))
+        self.assertFalse(Utilities.validate_amount("0.004"))
+        self.assertFalse(Utilities.validate_amount("-1"))
+        self.assertFalse(Utilities.validate_amount("abc"))
+
+
+class EnteredAmountTest(StorageTestCase):
+    def test_amount_rounding_to_zero_is_not_added(self):
+        manager = TransactionManager()
+        with mock.patch("builtins.print"):
+            self.assertIsNone(manager.add_transaction("u", "expense", "0.004", "Food", "2024-01-01",
+                                                      payment_method="Cash"))
+            self.assertIsNone(Transaction("u", "expense", 0.004, "Food", "2024-01-01",
+                                          payment_method="Cash").add_transaction())
+        self.assertEqual(self.ids(), [])
+        added = manager.add_transaction("u", "expense", "0.005", "Food", "2024-01-01", payment_method="Cash")
+        self.assertEqual(added["amount_cents"], 1)
+
+    def test_edit_rejects_an_amount_rounding_to_zero(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0)))
+        for change in ({"amount": "0.004"}, {"amount_cents": 0}, {"amount": "-3"}):
+            self.assertEqual(Transaction.edit_transaction("t0", change),
+                             {"success": False, "message": "Invalid amount"})
+        self.assertTrue(Transaction.edit_transaction("t0", {"amount": "12.345"})["success"])
+        self.restart()
+        self.assertEqual(self.handler.find_transaction("t0")["amount_cents"], 1235)
+
+
+class LegacyAmountTest(StorageTestCase):
+    def write_legacy(self, amounts: list) -> None:
+        transactions = []
+        for i, amount in enumerate(amounts):
+            transaction = make_transaction(i, amount=amount)
+            del transaction["amount_cents"]
+            transactions.append(transaction)
+        with open(self.handler.transactions_file, "w") as f:
+            json.dump({"u": transactions}, f)
+        self.restart()
+
+    def stored(self) -> list:
+        with open(self.handler.transactions_file) as f:
+            return json.load(f)["u"]
+
+    def test_float_amounts_are_converted_and_migrated(self):
+        self.write_legacy([12.34, 0.1])
+        self.assertEqual([t["amount_cents"] for t in self.handler.load_user_transactions("u")], [1234, 10])
+        self.assertEqual(manage.main(["migrate-cents", "--no-backup"]), 0)
+        self.assertEqual([(t["amount_cents"], "amount" in t) for t in self.stored()], [(1234, False), (10, False)])
+
+    def test_unreadable_amount_is_reported_and_kept(self):
+        with mock.patch("builtins.print") as printed:
+            self.write_legacy([5, "twelve"])
+            transaction = self.handler.find_transaction("t1")
+        self.assertIn("t1", str(printed.call_args))
+        self.assertEqual(transaction["amount_cents"], 0)
+        self.assertEqual(transaction["amount"], "twelve")
+
+        with mock.patch("builtins.print"):
+            self.assertEqual(manage.main(["migrate-cents", "--no-backup"]), 1)
+        self.assertNotIn("amount_cents", self.stored()[1])
+
+        with mock.patch("builtins.print"):
+            self.assertTrue(Transaction.edit_transaction("t1", {"amount": "12"})["success"])
+        self.assertEqual(manage.main(["migrate-cents", "--no-backup"]), 0)
+        self.assertEqual(self.stored()[1]["amount_cents"], 1200)
+        self.assertNotIn("amount", self.stored()[1])
+
+
+class LegacySqliteAmountTest(StorageTestCase):
+    def test_real_amounts_get_a_cents_column(self):
+        conn = sqlite3.connect(f"{self.data_dir}/finance.db")
+        conn.execute("CREATE TABLE transactions (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                     "transaction_id TEXT NOT NULL UNIQUE, user_id TEXT NOT NULL, type TEXT, amount REAL, "
+                     "category TEXT, date TEXT, description TEXT, payment_method TEXT, extra TEXT)")
+        conn.executemany("INSERT INTO transactions (transaction_id, user_id, type, amount, category, date, "
+                         "description, payment_method) VALUES (?, 'u', 'expense', ?, 'Food', '2024-01-01', '', 'Cash')",
+                         [("t0", 19.99), ("t1", "n/a")])
+        conn.commit()
+        conn.close()
+
+        with mock.patch("builtins.print") as printed:
+            self.restart(STORAGE_BACKEND="sqlite")
+        self.assertIn("t1", str(printed.call_args))
+        self.assertEqual([t["amount_cents"] for t in self.handler.load_user_transactions("u")], [1999, 0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Data file encodings, and reading files written with other settings"""
+import gzip
+import unittest
+
+from jsonhandler import JsonCodec, orjson
+from records import TransactionRecord
+from support import StorageTestCase, make_transaction
+
+DATA = {"u": [make_transaction(0, description="café ☕"), make_transaction(1, possible_duplicate=True)],
+        "v": []}
+
+
+class JsonCodecTest(unittest.TestCase):
+    def test_every_setting_round_trips(self):
+        for format in ("pretty", "compact"):
+            for parser in ("json", "auto"):
+                for compression in ("none", "gzip"):
+                    codec = JsonCodec(format, parser, compression)
+                    with self.subTest(format=format, parser=parser, compression=compression):
+                        self.assertEqual(codec.decode(codec.encode(DATA), None), DATA)
+
+    def test_output_matches_the_setting(self):
+        pretty = JsonCodec("pretty", "json").encode(DATA)
+        compact = JsonCodec("compact", "json").encode(DATA)
+        self.assertIn(b'\n    "u"', pretty)
+        self.assertNotIn(b"\n", compact)
+        self.assertLess(len(compact), len(pretty))
+        self.assertEqual(gzip.decompress(JsonCodec("compact", "json", "gzip").encode(DATA)), compact)
+
+    def test_any_file_is_read_whatever_the_setting(self):
+        written = [JsonCodec(format, "json", compression).encode(DATA)
+                   for format in ("pretty", "compact") for compression in ("none", "gzip")]
+        reader = JsonCodec("pretty", "auto", "none")
+        for raw in written:
+            self.assertEqual(reader.decode(raw, None), DATA)
+        self.assertEqual(reader.decode(b"  \n", {}), {})
+
+    def test_records_are_written_as_dicts(self):
+        records = [TransactionRecord(make_transaction(0, possible_duplicate=True))]
+        for codec in (JsonCodec("pretty", "json"), JsonCodec("compact", "auto")):
+            self.assertEqual(codec.decode(codec.encode(records), None), [make_transaction(0, possible_duplicate=True)])
+            self.assertEqual(codec.loads(codec.dumps_line({"t": records[0]})), {"t": records[0]})
+
+    @unittest.skipIf(orjson is None, "orjson is not installed")
+    def test_orjson_falls_back_for_what_it_cannot_write(self):
+        codec = JsonCodec("compact", "orjson")
+        self.assertEqual(codec.loads(codec.dumps_line({1: "non-string key"})), {"1": "non-string key"})
+
+
+class StoredFormatTest(StorageTestCase):
+    def test_data_written_in_one_format_is_read_in_another(self):
+        self.restart(JSON_FORMAT="compact", JSON_COMPRESSION="gzip")
+        self.assertTrue(self.handler.save_transactions({"u": [make_transaction(0)]}))
+        self.assertTrue(self.handler.append_transaction(make_transaction(1)))
+        with open(self.handler.transactions_file, "rb") as f:
+            self.assertTrue(f.read().startswith(JsonCodec.GZIP_MAGIC))
+
+        self.restart(JSON_FORMAT="pretty", JSON_COMPRESSION="none")
+        self.assertEqual(self.ids(), ["t0", "t1"])
+        self.assertTrue(self.handler.compact_transactions())
+        with open(self.handler.transactions_file, "rb") as f:
+            self.assertTrue(f.read().startswith(b"{\n"))
+        self.restart()
+        self.assertEqual(self.ids(), ["t0", "t1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""The memory-mapped columnar copy of each user's transactions"""
+import os
+import unittest
+from unittest import mock
+
+from columnar import ColumnarStore, TransactionColumns
+from reports import ReportsManager
+from support import StorageTestCase, make_transaction
+
+def decoded(columns: TransactionColumns) -> list:
+    """Each row with its dictionary ids turned back into names"""
+    return [(columns.dates[row], columns.amounts[row], columns.type_names[columns.types[row]],
+             columns.category_names[columns.categories[row]],
+             columns.payment_method_names[columns.payment_methods[row]])
+            for row in range(len(columns))]
+
+
+class TransactionColumnsTest(unittest.TestCase):
+    def test_records_applied_in_place_match_a_rebuild(self):
+        transactions = [make_transaction(i) for i in range(3)]
+        columns = TransactionColumns.from_transactions(transactions)
+        records = [
+            {"op": "add", "transaction": make_transaction(3, type="income", category="Salary")},
+            {"op": "edit", "fields": {"date": "2024-02-29", "amount_cents": 5, "payment_method": "Debit Card"}},
+            {"op": "delete"},
+        ]
+        rows = [None, 1, 0]
+        for record, row in zip(records, rows):
+            self.assertTrue(columns.apply(record, row))
+        transactions.append(records[0]["transaction"])
+        transactions[1] = {**transactions[1], **records[1]["fields"]}
+        del transactions[0]
+        self.assertEqual(decoded(columns), decoded(TransactionColumns.from_transactions(transactions)))
+
+    def test_records_that_cannot_be_followed_are_refused(self):
+        columns = TransactionColumns.from_transactions([make_transaction(0)])
+        self.assertFalse(columns.apply({"op": "edit", "fields": {"amount": 1.5}}, 0))
+        self.assertFalse(columns.apply({"op": "delete"}, 1))
+        self.assertFalse(columns.apply({"op": "delete"}, None))
+        self.assertEqual(len(columns), 1)
+
+    def test_id_columns_widen_when_names_outgrow_them(self):
+        columns = TransactionColumns.from_transactions([make_transaction(0)])
+        self.assertEqual(columns.categories.typecode, "B")
+        for i in range(300):
+            columns.apply({"op": "add", "transaction": make_transaction(i, category=f"c{i}")})
+        self.assertEqual(columns.categories.typecode, "H")
+        self.assertEqual(columns.category_names[columns.categories[-1]], "c299")
+        self.assertEqual(columns.rows("categories", columns.ids("categories", ["C7", "food"], ignore_case=True)),
+                         [0, 8])
+
+
+class ColumnarStoreTest(StorageTestCase):
+    def test_files_are_mapped_back_only_for_the_same_signature(self):
+        store = ColumnarStore(os.path.join(self.data_dir, "columnar"))
+        columns = TransactionColumns.from_transactions([make_transaction(i, date=f"2024-01-0{i + 1}")
+                                                        for i in range(3)], signature=["a", 1])
+        store.save("some/user", columns)
+        loaded = store.load("some/user", ["a", 1])
+        self.assertIsInstance(loaded.amounts, memoryview)
+        self.assertEqual(decoded(loaded), decoded(columns))
+        self.assertIsNone(store.load("some/user", ["a", 2]))
+        self.assertIsNone(store.load("other", ["a", 1]))
+
+        self.assertTrue(loaded.apply({"op": "add", "transaction": make_transaction(3)}))
+        self.assertEqual(list(loaded.amounts), [100, 101, 102, 103])
+
+
+class ColumnarHandlerTest(StorageTestCase):
+    SETTINGS = {"COLUMNAR_STORE": True}
+
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(self.handler.append_transactions(
+            [make_transaction(i, date=f"2024-01-{i + 1:02d}", type="income" if i % 3 == 0 else "expense",
+                              category="Salary" if i % 3 == 0 else "Food") for i in range(6)]))
+
+    def rebuilt(self, user_id: str = "u") -> list:
+        return decoded(TransactionColumns.from_transactions(self.handler.load_user_transactions(user_id)))
+
+    def test_changes_are_followed_without_a_rebuild(self):
+        self.assertEqual(decoded(self.handler.load_user_columns("u")), self.rebuilt())
+        self.assertTrue(self.handler.append_transaction(make_transaction(0, "v")))
+        self.assertIsNotNone(self.handler.load_user_columns("v"))
+        with mock.patch.object(TransactionColumns, "from_transactions") as build:
+            self.assertTrue(self.handler.append_transaction(make_transaction(6, category="Bills")))
+            self.assertTrue(self.handler.update_transaction("u", "t2", {"amount_cents": 1, "category": "Gift",
+                                                                        "type": "income"}))
+            self.assertTrue(self.handler.remove_transaction("u", "t4"))
+            self.assertTrue(self.handler.append_transaction(make_transaction(1, "v")))
+            columns = self.handler.load_user_columns("u")
+            other = self.handler.load_user_columns("v")
+        build.assert_not_called()
+        self.assertEqual(decoded(columns), self.rebuilt())
+        self.assertEqual(decoded(other), self.rebuilt("v"))
+
+    def test_next_run_maps_the_saved_columns_and_can_change_them(self):
+        expected = decoded(self.handler.load_user_columns("u"))
+        self.restart()
+        with mock.patch.object(TransactionColumns, "from_transactions") as build:
+            columns = self.handler.load_user_columns("u")
+            self.assertIsInstance(columns.amounts, memoryview)
+            self.assertTrue(self.handler.remove_transaction("u", "t0"))
+            self.assertTrue(self.handler.append_transaction(make_transaction(6)))
+            columns = self.handler.load_user_columns("u")
+        build.assert_not_called()
+        self.assertEqual(decoded(columns), self.rebuilt())
+        self.assertEqual(decoded(columns)[:-1], expected[1:])
+
+    def test_columns_changed_in_place_are_saved_at_exit(self):
+        self.handler.load_user_columns("u")
+        self.assertTrue(self.handler.remove_transaction("u", "t0"))
+        self.handler._shutdown()
+        self.restart()
+        with mock.patch.object(TransactionColumns, "from_transactions") as build:
+            columns = self.handler.load_user_columns("u")
+        build.assert_not_called()
+        self.assertEqual(decoded(columns), self.rebuilt())
+
+    def test_full_save_makes_them_be_rebuilt(self):
+        self.handler.load_user_columns("u")
+        self.assertTrue(self.handler.save_transactions({"u": [make_transaction(9, amount_cents=7)]}))
+        self.assertEqual([row[1] for row in decoded(self.handler.load_user_columns("u"))], [7])
+
+    def test_reports_add_up_the_same_from_columns_and_rows(self):
+        self.assertTrue(self.handler.update_transaction("u", "t1", {"amount_cents": 250}))
+        with mock.patch("builtins.print"):
+            with_columns = ReportsManager("u")
+            self.assertIsNotNone(with_columns.columns)
+            self.restart(COLUMNAR_STORE=False)
+            without_columns = ReportsManager("u")
+            self.assertIsNone(without_columns.columns)
+            for manager in (with_columns, without_columns):
+                manager.report = (manager.generate_dashboard(), manager.generate_monthly_report(1, 2024),
+                                  manager.generate_category_breakdown())
+        self.assertEqual(with_columns.report, without_columns.report)
+        self.assertEqual(with_columns.report[1]["monthly_income"], 100 + 103)
+
+
+if __name__ == "__main__":
+    unittest.main()
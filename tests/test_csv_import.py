@@ -0,0 +1,111 @@
+"""CSV export and import, with checkpoints to resume an interrupted import"""
+import csv
+import os
+import unittest
+from unittest import mock
+
+import data_store
+from jsonhandler import JsonHandler
+from support import StorageTestCase, make_transaction
+
+HEADERS = ["Type", "Amount", "Category", "Date", "Description", "Payment Method"]
+
+
+class CsvImportTest(StorageTestCase):
+    SETTINGS = {"IMPORT_CHUNK_ROWS": 2}
+
+    def write_csv(self, rows: list) -> str:
+        path = os.path.join(self.data_dir, "import.csv")
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(HEADERS)
+            writer.writerows(rows)
+        return path
+
+    def rows(self, count: int) -> list:
+        return [["expense", f"{i + 1}.25", "Food", f"2024-01-{i + 1:02d}", f"shop {i}", "Cash"]
+                for i in range(count)]
+
+    def descriptions(self, user_id: str = "u") -> list:
+        return [t["description"] for t in self.handler.load_user_transactions(user_id)]
+
+    def test_export_then_import_round_trips(self):
+        for i in range(3):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i, "a")))
+        path = os.path.join(self.data_dir, "export.csv")
+        self.assertTrue(data_store.export_to_csv("a", path))
+
+        success, message, count = data_store.import_from_csv("b", path)
+        self.assertTrue(success, message)
+        self.assertEqual(count, 3)
+        imported = self.handler.load_user_transactions("b")
+        self.assertEqual([t["amount_cents"] for t in imported], [100, 101, 102])
+        self.assertEqual([t["description"] for t in imported], ["row 0", "row 1", "row 2"])
+
+    def test_invalid_row_saves_nothing(self):
+        rows = self.rows(3)
+        rows[1][1] = "lots"
+        success, message, count = data_store.import_from_csv("u", self.write_csv(rows))
+        self.assertFalse(success)
+        self.assertIn("Row 3", message)
+        self.assertEqual(self.descriptions(), [])
+
+    def test_interrupted_import_resumes_where_it_stopped(self):
+        path = self.write_csv(self.rows(5))
+        append = JsonHandler.append_transactions
+        calls = []
+
+        def fail_second_batch(handler, transactions):
+            calls.append(len(transactions))
+            return False if len(calls) == 2 else append(handler, transactions)
+
+        with mock.patch.object(JsonHandler, "append_transactions", fail_second_batch):
+            success, message, count = data_store.import_from_csv("u", path)
+        self.assertFalse(success)
+        self.assertIn("run the import again to resume", message)
+        self.assertEqual(count, 2)
+
+        self.restart()
+        success, message, count = data_store.import_from_csv("u", path)
+        self.assertTrue(success, message)
+        self.assertEqual(count, 3)
+        self.assertIn("resumed after row 3", message)
+        self.assertEqual(self.descriptions(), [f"shop {i}" for i in range(5)])
+
+        success, message, count = data_store.import_from_csv("u", path)
+        self.assertTrue(success)
+        self.assertIn("already imported", message)
+        self.assertEqual(count, 0)
+
+    def test_rows_saved_before_a_lost_checkpoint_are_not_saved_twice(self):
+        path = self.write_csv(self.rows(5))
+        with mock.patch.object(JsonHandler, "save_imports", return_value=False):
+            success, message, count = data_store.import_from_csv("u", path)
+        self.assertFalse(success)
+        self.assertIn("import checkpoint", message)
+        self.assertEqual(count, 2)
+
+        # A larger chunk now spans rows saved before and after the failure
+        self.restart(IMPORT_CHUNK_ROWS=10)
+        success, message, count = data_store.import_from_csv("u", path)
+        self.assertTrue(success, message)
+        self.assertEqual(count, 3)
+        self.assertEqual(self.descriptions(), [f"shop {i}" for i in range(5)])
+
+    def test_duplicates_follow_the_policy(self):
+        self.assertTrue(self.handler.append_transaction(
+            make_transaction(0, amount_cents=125, date="2024-01-01", description="shop 0")))
+        path = self.write_csv(self.rows(2))
+        success, message, count = data_store.import_from_csv("u", path, duplicates="skip")
+        self.assertTrue(success, message)
+        self.assertEqual(count, 1)
+        self.assertIn("1 possible duplicates skipped", message)
+        self.assertEqual(self.descriptions(), ["shop 0", "shop 1"])
+
+
+class SqliteCsvImportTest(CsvImportTest):
+    SETTINGS = {"IMPORT_CHUNK_ROWS": 2, "STORAGE_BACKEND": "sqlite"}
+
+
+if __name__ == "__main__":
+    unittest.main()
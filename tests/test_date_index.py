@@ -0,0 +1,60 @@
+"""The date-ordered index that date ranges and monthly reports are found with"""
+import unittest
+from datetime import date
+from unittest import mock
+
+import search_filter
+from reports import ReportsManager
+from search_filter import DateIndex, SearchFilterManager
+from support import StorageTestCase, make_transaction
+
+DATES = ["2024-03-01", "2024-01-15", "not a date", "2024-01-31", "2024-02-01", "2024-01-15", "2023-12-31"]
+
+
+def ordinal(day: str) -> int:
+    return date.fromisoformat(day).toordinal()
+
+
+class DateIndexTest(unittest.TestCase):
+    def test_ranges_are_inclusive_and_keep_the_original_order(self):
+        index = DateIndex([{"date": day} for day in DATES])
+        self.assertEqual(index.rows_between(ordinal("2024-01-01"), ordinal("2024-01-31")), [1, 3, 5])
+        self.assertEqual(index.rows_between(ordinal("2024-01-15"), ordinal("2024-01-15")), [1, 5])
+        self.assertEqual(index.rows_between(ordinal("2025-01-01"), ordinal("2025-12-31")), [])
+        self.assertEqual(index.rows_between(0, 0), [2])
+
+
+class DateSearchTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(self.handler.append_transactions(
+            [make_transaction(i, date=day) for i, day in enumerate(DATES)]))
+
+    def test_date_range_matches_a_full_scan(self):
+        manager = SearchFilterManager("u")
+        found = manager.search_by_date_range("2024-01-15", "2024-02-29")
+        self.assertEqual([t["transaction_id"] for t in found], ["t1", "t3", "t4", "t5"])
+        with mock.patch("builtins.print"):
+            self.assertEqual(manager.search_by_date_range("2024-01-01", "31/01/2024"), [])
+
+    def test_index_is_built_once_per_data_version_and_shared_with_reports(self):
+        with mock.patch.object(search_filter, "DateIndex", side_effect=DateIndex) as build, \
+                mock.patch("builtins.print"):
+            manager = SearchFilterManager("u")
+            manager.search_by_date_range("2024-01-01", "2024-01-31")
+            manager.search_by_date_range("2023-01-01", "2023-12-31")
+            report = ReportsManager("u")
+            self.assertIs(report.transactions, manager.transactions)
+            january = report.generate_monthly_report(1, 2024)
+            self.assertEqual(build.call_count, 1)
+
+            self.assertTrue(self.handler.append_transaction(make_transaction(7, date="2024-01-20")))
+            manager = SearchFilterManager("u")
+            found = manager.search_by_date_range("2024-01-01", "2024-01-31")
+            self.assertEqual(build.call_count, 2)
+        self.assertEqual(january["transaction_count"], 3)
+        self.assertEqual([t["transaction_id"] for t in found], ["t1", "t3", "t5", "t7"])
+
+
+if __name__ == "__main__":
+    unittest.main()
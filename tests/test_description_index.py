@@ -0,0 +1,81 @@
+"""Word search over transaction descriptions through the inverted index"""
+import unittest
+from unittest import mock
+
+from search_filter import SearchFilterManager
+from support import StorageTestCase, make_transaction
+from text_index import DescriptionIndex
+
+DESCRIPTIONS = ["Coffee at Joe's", "AMAZON Mktp order", "tea and coffee", "Amazon prime", "", "Rent - March"]
+
+
+def transactions() -> list:
+    return [make_transaction(i, description=text) for i, text in enumerate(DESCRIPTIONS)]
+
+
+class DescriptionIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = DescriptionIndex.from_transactions(transactions())
+
+    def found(self, query: str) -> list:
+        return [t["transaction_id"] for t in self.index.transactions(self.index.search(query))]
+
+    def test_and_or_and_prefix_queries(self):
+        self.assertEqual(self.found("coffee"), ["t0", "t2"])
+        self.assertEqual(self.found("COFFEE tea"), ["t2"])
+        self.assertEqual(self.found("rent | tea"), ["t2", "t5"])
+        self.assertEqual(self.found("amaz* mktp"), ["t1"])
+        self.assertEqual(self.found("am*"), ["t1", "t3"])
+        self.assertEqual(self.found("joe's"), ["t0"])
+        self.assertEqual(self.found("coffee missing"), [])
+        self.assertEqual(self.found("--"), [])
+
+    def test_changes_are_applied_in_place(self):
+        records = [
+            {"op": "edit", "transaction_id": "t0", "fields": {"description": "Rent - April"}},
+            {"op": "delete", "transaction_id": "t5"},
+            {"op": "add", "transaction": make_transaction(6, description="rental car")},
+            {"op": "edit", "transaction_id": "t3", "fields": {"amount_cents": 1}},
+        ]
+        for record in records:
+            self.assertTrue(self.index.apply(record))
+        self.assertEqual(self.found("rent*"), ["t0", "t6"])
+        self.assertEqual(self.found("coffee"), ["t2"])
+        self.assertEqual(self.found("march"), [])
+        self.assertEqual(self.index.transactions({"t3"})[0]["amount_cents"], 1)
+        self.assertEqual(self.index.vocabulary, sorted(self.index.postings))
+        self.assertFalse(self.index.apply({"op": "edit", "transaction_id": "nope", "fields": {}}))
+        self.assertFalse(self.index.apply({"op": "compact"}))
+
+
+class DescriptionSearchTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.assertTrue(self.handler.append_transactions(transactions()))
+        self.assertTrue(self.handler.append_transaction(make_transaction(9, "other", description="coffee")))
+
+    def found(self, query: str) -> list:
+        return [t["transaction_id"] for t in SearchFilterManager("u").search_descriptions(query)]
+
+    def test_index_follows_every_change_without_a_rebuild(self):
+        self.assertEqual(self.found("coffee"), ["t0", "t2"])
+        with mock.patch.object(DescriptionIndex, "from_transactions") as build:
+            self.assertTrue(self.handler.append_transaction(make_transaction(6, description="iced coffee")))
+            self.assertTrue(self.handler.update_transaction("u", "t0", {"description": "espresso"}))
+            self.assertTrue(self.handler.remove_transaction("u", "t2"))
+            self.assertEqual(self.found("coffee"), ["t6"])
+            self.assertEqual(self.found("espresso OR prime"), ["t0", "t3"])
+        build.assert_not_called()
+
+    def test_a_full_save_or_restart_rebuilds_it(self):
+        self.assertEqual(self.found("amazon"), ["t1", "t3"])
+        self.assertTrue(self.handler.save_user_transactions("u", [make_transaction(7, description="amazon")]))
+        self.assertEqual(self.found("amazon"), ["t7"])
+        self.restart()
+        self.assertEqual(self.found("amazon"), ["t7"])
+        self.assertEqual([t["transaction_id"] for t in SearchFilterManager("other").search_descriptions("coffee")],
+                         ["t9"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+"""Spotting transactions that were already recorded, by content fingerprint"""
+import unittest
+from unittest import mock
+
+from support import StorageTestCase, make_transaction
+from transactions import Transaction, TransactionManager
+from utility import Utilities
+
+
+class FingerprintTest(unittest.TestCase):
+    def test_case_and_spacing_of_the_description_are_folded(self):
+        self.assertEqual(Utilities.transaction_fingerprint(make_transaction(0, description="Corner  SHOP ")),
+                         Utilities.transaction_fingerprint(make_transaction(1, description="corner shop",
+                                                                            amount_cents=100)))
+
+    def test_every_other_field_counts(self):
+        original = Utilities.transaction_fingerprint(make_transaction(0))
+        for change in ({"date": "2024-01-02"}, {"amount_cents": 101}, {"type": "income"},
+                       {"category": "Bills"}, {"description": "row 1"}, {"payment_method": "Debit Card"}):
+            with self.subTest(**change):
+                self.assertNotEqual(Utilities.transaction_fingerprint(make_transaction(0, **change)), original)
+
+
+class DuplicatePolicyTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manager = TransactionManager()
+
+    def add(self, duplicates: str, description: str = "lunch"):
+        return self.manager.add_transaction("u", "expense", "4.50", "Food", "2024-01-01", description,
+                                            "Cash", duplicates=duplicates)
+
+    def test_policies_of_a_single_add(self):
+        self.assertIsNotNone(self.add("skip"))
+        with mock.patch("builtins.print") as printed:
+            self.assertIsNone(self.add("skip", " LUNCH"))
+        self.assertIn("Skipped", str(printed.call_args))
+        self.assertTrue(self.add("flag")["possible_duplicate"])
+        self.assertNotIn("possible_duplicate", self.add("allow"))
+        self.restart()
+        self.assertEqual([t.get("possible_duplicate", False) for t in self.handler.load_user_transactions("u")],
+                         [False, True, False])
+
+    def test_duplicates_within_one_batch_and_of_other_users(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0, "other", amount_cents=450,
+                                                                         description="lunch")))
+        row = {"type": "expense", "amount": "4.50", "category": "Food", "date": "2024-01-01",
+               "description": "lunch", "payment_method": "Cash"}
+        result = self.manager.add_transactions("u", [dict(row), dict(row), dict(row)], duplicates="skip")
+        self.assertEqual((len(result["data"]["added"]), len(result["data"]["duplicates"])), (1, 2))
+        self.assertIn("2 possible duplicates skipped", result["message"])
+
+    def test_counts_follow_edits_and_deletes_without_a_rebuild(self):
+        self.assertTrue(self.handler.append_transactions([make_transaction(i) for i in range(50)]))
+        self.assertEqual(self.handler.count_duplicates(make_transaction(9, amount_cents=100, description="row 0")), 1)
+        fingerprint = Utilities.transaction_fingerprint
+        with mock.patch.object(Utilities, "transaction_fingerprint", side_effect=fingerprint) as computed:
+            self.assertTrue(self.handler.update_transaction("u", "t1", {"amount_cents": 100,
+                                                                        "description": "ROW 0"}))
+            self.assertEqual(self.handler.count_duplicates(make_transaction(0)), 2)
+            self.assertTrue(self.handler.remove_transaction("u", "t0"))
+            self.assertEqual(self.handler.count_duplicates(make_transaction(0)), 1)
+            self.assertTrue(self.handler.append_transaction(make_transaction(50)))
+            self.assertEqual(self.handler.count_duplicates(make_transaction(50)), 1)
+        # Reading every stored transaction again would take 50 or more
+        self.assertLess(computed.call_count, 20)
+        self.restart()
+        self.assertEqual(self.handler.count_duplicates(make_transaction(0)), 1)
+        self.assertEqual(self.handler.count_duplicates(make_transaction(1)), 0)
+
+    def test_unknown_policy_is_refused(self):
+        self.assertRaises(ValueError, TransactionManager.check_duplicates, [make_transaction(0)], "ignore")
+        with mock.patch("builtins.print"):
+            self.assertIsNone(Transaction("u", "expense", 1, "Food", "2024-01-01",
+                                          payment_method="Cash").add_transaction("ignore"))
+        self.assertEqual(self.ids(), [])
+
+
+class SqliteDuplicatePolicyTest(DuplicatePolicyTest):
+    SETTINGS = {"STORAGE_BACKEND": "sqlite"}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Exporting transactions to Excel workbooks"""
+import os
+import unittest
+
+import openpyxl
+
+from excel import ExcelHandler
+from support import StorageTestCase, make_transaction
+
+
+class ExcelExportTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        transactions = [make_transaction(0, date="2024-01-05"),
+                        make_transaction(1, date="2024-01-20", type="income", category="Salary"),
+                        make_transaction(2, date="2024-02-01"),
+                        make_transaction(3, date="2024-03-09")]
+        self.assertTrue(self.handler.append_transactions(transactions))
+        self.exporter = ExcelHandler("u")
+
+    def path(self, name: str = "export.xlsx") -> str:
+        return os.path.join(self.data_dir, name)
+
+    def sheets(self, path: str) -> dict:
+        workbook = openpyxl.load_workbook(path, read_only=True)
+        try:
+            return {sheet.title: [list(row) for row in sheet.iter_rows(values_only=True)]
+                    for sheet in workbook.worksheets}
+        finally:
+            workbook.close()
+
+    def test_one_sheet_holds_every_row(self):
+        success, message = self.exporter.export_excel_transactions(self.path())
+        self.assertTrue(success, message)
+        rows = self.sheets(self.path())["Transactions"]
+        self.assertEqual(rows[0], ExcelHandler.EXPORT_HEADERS)
+        self.assertEqual(rows[1], ["t0", "expense", 1, "Food", "2024-01-05", "row 0", "Cash"])
+        self.assertEqual([row[0] for row in rows[1:]], ["t0", "t1", "t2", "t3"])
+
+    def test_sheet_per_month_with_a_summary(self):
+        success, message = self.exporter.export_excel_transactions(self.path(), by_month=True,
+                                                                   start_date="2024-01-01", end_date="2024-02-28")
+        self.assertTrue(success, message)
+        sheets = self.sheets(self.path())
+        self.assertEqual(list(sheets), ["Summary", "2024-01", "2024-02"])
+        self.assertEqual(sheets["Summary"][1:], [["2024-01", 2, 1.01, 1, 0.01], ["2024-02", 1, 0, 1.02, -1.02]])
+        self.assertEqual([row[0] for row in sheets["2024-01"][1:]], ["t0", "t1"])
+
+    def test_months_split_across_files(self):
+        success, message = self.exporter.export_excel_transactions(self.path(), months_per_file=2)
+        self.assertTrue(success, message)
+        first, second = self.path("export_2024-01.xlsx"), self.path("export_2024-03.xlsx")
+        self.assertIn("2 files", message)
+        self.assertEqual([row[0] for row in self.sheets(first)["Transactions"][1:]], ["t0", "t1", "t2"])
+        self.assertEqual([row[0] for row in self.sheets(second)["Transactions"][1:]], ["t3"])
+
+    def test_bad_arguments_and_empty_ranges_are_refused(self):
+        self.assertFalse(self.exporter.export_excel_transactions(self.path(), start_date="01/01/2024")[0])
+        self.assertFalse(self.exporter.export_excel_transactions(self.path(), months_per_file=0)[0])
+        self.assertEqual(self.exporter.export_excel_transactions(self.path(), start_date="2025-01-01"),
+                         (False, "No transactions found to export"))
+        self.assertFalse(os.path.exists(self.path()))
+
+
+if __name__ == "__main__":
+    unittest.main()
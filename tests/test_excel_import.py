@@ -0,0 +1,156 @@
+"""Importing transactions from Excel workbooks"""
+import os
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from unittest import mock
+
+import openpyxl
+
+from excel import ExcelHandler
+from jsonhandler import JsonHandler
+from support import StorageTestCase
+
+
+class ExcelImportTest(StorageTestCase):
+    SETTINGS = {"IMPORT_CHUNK_ROWS": 2}
+
+    def write_workbook(self, rows: list, headers: list = ExcelHandler.REQUIRED_COLUMNS) -> str:
+        path = os.path.join(self.data_dir, "import.xlsx")
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+        sheet.append(headers)
+        for row in rows:
+            sheet.append(row)
+        workbook.save(path)
+        return path
+
+    def rows(self, count: int) -> list:
+        return [["expense", i + 1.25, "Food", datetime(2024, 1, i + 1), f"shop {i}", "Cash"]
+                for i in range(count)]
+
+    def descriptions(self, user_id: str = "u") -> list:
+        return [t["description"] for t in self.handler.load_user_transactions(user_id)]
+
+    def test_rows_are_converted_and_saved(self):
+        rows = self.rows(3)
+        rows[1] = ["Income", "2000", "Salary", "2024-01-31", None, None]
+        success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(
+            self.write_workbook(rows + [[None] * 6]))
+        self.assertTrue(success, message)
+        self.assertEqual(count, 3)
+        self.restart()
+        stored = self.handler.load_user_transactions("u")
+        self.assertEqual([(t["type"], t["amount_cents"], t["date"], t["description"], t["payment_method"])
+                          for t in stored],
+                         [("expense", 125, "2024-01-01", "shop 0", "Cash"),
+                          ("income", 200000, "2024-01-31", "", "Cash"),
+                          ("expense", 325, "2024-01-03", "shop 2", "Cash")])
+
+    def test_invalid_rows_are_reported_and_nothing_is_saved(self):
+        rows = self.rows(5)
+        rows[1][1] = "lots"
+        rows[3][2] = "Salary"
+        success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(self.write_workbook(rows))
+        self.assertFalse(success)
+        self.assertEqual(count, 0)
+        self.assertEqual(message.splitlines(), [
+            "Row 3: Amount must be a valid number",
+            "Row 5: Category for expense must be one of Food, Transport, Bills, Shopping, Entertainment, Other",
+        ])
+        self.assertEqual(self.descriptions(), [])
+
+    def test_missing_columns_are_reported(self):
+        path = self.write_workbook([["expense", 1]], headers=["Type", "Amount"])
+        valid, message = ExcelHandler("u").validate_format(path)
+        self.assertFalse(valid)
+        self.assertIn("Missing required columns: Category, Date, Description, Payment Method", message)
+        success, message, count = ExcelHandler("u").import_excel_transactions(path)
+        self.assertFalse(success)
+        self.assertIn("Missing required columns", message)
+
+    def test_rows_are_saved_in_one_write_per_chunk(self):
+        path = self.write_workbook(self.rows(5))
+        with mock.patch.object(JsonHandler, "append_transactions", autospec=True,
+                               side_effect=JsonHandler.append_transactions) as append, \
+                mock.patch.object(JsonHandler, "append_transaction") as append_one:
+            success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(path)
+        self.assertTrue(success, message)
+        self.assertEqual([len(call.args[1]) for call in append.call_args_list], [2, 2, 1])
+        append_one.assert_not_called()
+        self.assertEqual(self.descriptions(), [f"shop {i}" for i in range(5)])
+
+    def test_workers_give_the_same_result_in_row_order(self):
+        rows = self.rows(7)
+        path = self.write_workbook(rows)
+        success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(path)
+        self.assertTrue(success, message)
+        serial = self.handler.load_user_transactions("u")
+
+        with mock.patch("excel.ProcessPoolExecutor", side_effect=ProcessPoolExecutor) as pool:
+            success, message, count = ExcelHandler("v", workers=2).import_excel_transactions(path)
+        self.assertTrue(success, message)
+        pool.assert_called_once_with(max_workers=2)
+        self.assertIn("rows/s with 2 worker(s)", message)
+        parallel = self.handler.load_user_transactions("v")
+        self.assertEqual([{**t, "transaction_id": None, "user_id": None} for t in parallel],
+                         [{**t, "transaction_id": None, "user_id": None} for t in serial])
+
+        rows[5][0] = "refund"
+        rows[0][1] = -1
+        rows[3][3] = "someday"
+        success, message, count = ExcelHandler("w", workers=2).import_excel_transactions(self.write_workbook(rows))
+        self.assertFalse(success)
+        self.assertEqual([line.split(":")[0] for line in message.splitlines()], ["Row 2", "Row 5", "Row 7"])
+        self.assertEqual(self.descriptions("w"), [])
+
+    def test_interrupted_import_resumes_where_it_stopped(self):
+        path = self.write_workbook(self.rows(5))
+        append = JsonHandler.append_transactions
+        calls = []
+
+        def fail_second_batch(handler, transactions):
+            calls.append(len(transactions))
+            return False if len(calls) == 2 else append(handler, transactions)
+
+        with mock.patch.object(JsonHandler, "append_transactions", fail_second_batch):
+            success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(path)
+        self.assertFalse(success)
+        self.assertIn("run the import again to resume", message)
+        self.assertEqual(count, 2)
+
+        self.restart()
+        success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(path)
+        self.assertTrue(success, message)
+        self.assertEqual(count, 3)
+        self.assertIn("resumed after row 3", message)
+        self.assertEqual(self.descriptions(), [f"shop {i}" for i in range(5)])
+
+        with mock.patch.object(ExcelHandler, "_iter_rows") as read:
+            success, message, count = ExcelHandler("u").import_excel_transactions(path)
+        read.assert_not_called()
+        self.assertTrue(success)
+        self.assertIn("already imported", message)
+        self.assertEqual(count, 0)
+
+        # The same file is a new import for another user
+        success, message, count = ExcelHandler("v", workers=1).import_excel_transactions(path)
+        self.assertEqual((success, count), (True, 5))
+
+    def test_rows_saved_before_a_lost_checkpoint_are_not_saved_twice(self):
+        path = self.write_workbook(self.rows(5))
+        with mock.patch.object(JsonHandler, "save_imports", return_value=False):
+            success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(path)
+        self.assertFalse(success)
+        self.assertIn("import checkpoint", message)
+        self.assertEqual(count, 2)
+
+        self.restart(IMPORT_CHUNK_ROWS=10)
+        success, message, count = ExcelHandler("u", workers=1).import_excel_transactions(path)
+        self.assertTrue(success, message)
+        self.assertEqual(count, 3)
+        self.assertEqual(self.descriptions(), [f"shop {i}" for i in range(5)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Atomic file writes, group commit and the reporting of failed deferred writes"""
+import os
+import time
+import unittest
+from unittest import mock
+
+from support import StorageTestCase
+
+
+class AtomicWriteTest(StorageTestCase):
+    def test_save_is_on_disk_when_it_returns(self):
+        self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+        with open(self.handler.users_file, "rb") as f:
+            self.assertIn(b'"a"', f.read())
+
+    def test_failed_write_keeps_the_old_file_and_no_temporary_file(self):
+        self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            self.assertFalse(self.handler.save_users({"b": {"id": "b"}}))
+        self.assertEqual(os.listdir(self.data_dir), ["users.json"])
+        self.restart()
+        self.assertEqual(self.handler.load_users(), {"a": {"id": "a"}})
+
+
+class GroupCommitTest(StorageTestCase):
+    def test_saves_in_a_group_are_written_once_at_the_end(self):
+        self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+        with mock.patch("os.replace", wraps=os.replace) as replace:
+            with self.handler.group_commit():
+                for name in "bcd":
+                    self.assertTrue(self.handler.save_users({name: {"id": name}}))
+                self.assertEqual(self.handler.load_users(), {"d": {"id": "d"}})
+                replace.assert_not_called()
+            self.assertEqual(replace.call_count, 1)
+        self.restart()
+        self.assertEqual(self.handler.load_users(), {"d": {"id": "d"}})
+
+    def test_journal_appends_in_a_group_are_folded_into_one_snapshot(self):
+        with self.handler.group_commit():
+            for i in range(5):
+                self.assertTrue(self.handler.append_transaction({
+                    "transaction_id": f"t{i}", "user_id": "u", "type": "expense", "amount_cents": 100,
+                    "category": "Food", "date": "2024-01-01", "description": "", "payment_method": "Cash"}))
+        self.assertFalse(os.path.exists(self.handler.transactions_journal_file))
+        self.restart()
+        self.assertEqual(self.ids(), [f"t{i}" for i in range(5)])
+
+
+class DeferredWriteErrorTest(StorageTestCase):
+    SETTINGS = {"GROUP_COMMIT_WINDOW_MS": 20}
+
+    def fail_in_background(self):
+        """Save while writes fail, and let the group commit timer try to write it"""
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+            time.sleep(0.3)
+
+    def test_next_save_reports_the_failure_and_is_kept(self):
+        self.fail_in_background()
+        self.assertFalse(self.handler.save_users({"b": {"id": "b"}}))
+        self.assertTrue(self.handler.flush())
+        self.restart()
+        self.assertEqual(self.handler.load_users(), {"b": {"id": "b"}})
+
+    def test_flush_reports_the_failure_once_and_writes_the_data(self):
+        self.fail_in_background()
+        self.assertFalse(self.handler.flush())
+        self.assertTrue(self.handler.flush())
+        self.restart()
+        self.assertEqual(self.handler.load_users(), {"a": {"id": "a"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
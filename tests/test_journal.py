@@ -0,0 +1,93 @@
+"""Crash safety and replay of the transaction journal
+
+Run with:
+    python -m unittest discover tests
+"""
+import glob
+import os
+import unittest
+
+from support import StorageTestCase, make_transaction
+
+
+class JournalTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.journal = self.handler.transactions_journal_file
+
+    def test_changes_are_appended_and_replayed_after_a_restart(self):
+        for i in range(4):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        self.assertTrue(self.handler.update_transaction("u", "t1", {"description": "edited"}))
+        self.assertTrue(self.handler.remove_transaction("u", "t2"))
+        self.assertFalse(os.path.exists(self.handler.transactions_file))
+        with open(self.journal, "rb") as f:
+            self.assertEqual(len(f.read().splitlines()), 6)
+
+        self.restart()
+        self.assertEqual(self.ids(), ["t0", "t1", "t3"])
+        self.assertEqual(self.handler.load_user_transactions("u")[1]["description"], "edited")
+
+    def test_journal_is_folded_into_the_snapshot_at_the_threshold(self):
+        self.restart(JOURNAL_COMPACT_THRESHOLD=5)
+        for i in range(4):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        self.assertTrue(os.path.exists(self.journal))
+        self.assertTrue(self.handler.append_transaction(make_transaction(4)))
+        self.assertFalse(os.path.exists(self.journal))
+
+        self.restart()
+        self.assertEqual(self.ids(), [f"t{i}" for i in range(5)])
+
+    def test_without_journal_mode_the_snapshot_is_rewritten(self):
+        self.restart(JOURNAL_MODE=False)
+        for i in range(3):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        self.assertTrue(self.handler.remove_transaction("u", "t0"))
+        self.assertFalse(os.path.exists(self.journal))
+        self.restart()
+        self.assertEqual(self.ids(), ["t1", "t2"])
+
+    def test_append_after_torn_line_keeps_every_record(self):
+        for i in range(9):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        with open(self.journal, "ab") as f:
+            f.write(b'{"op": "add", "user_id": "u", "transa')
+
+        self.restart()
+        self.assertTrue(self.handler.append_transaction(make_transaction(9)))
+        self.restart()
+        self.assertEqual(self.ids(), [f"t{i}" for i in range(10)])
+
+        self.assertTrue(self.handler.compact_transactions())
+        self.restart()
+        self.assertEqual(self.ids(), [f"t{i}" for i in range(10)])
+
+    def test_complete_record_missing_its_newline_is_kept(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0)))
+        with open(self.journal, "rb+") as f:
+            f.truncate(os.path.getsize(self.journal) - 1)
+
+        self.restart()
+        self.assertTrue(self.handler.append_transaction(make_transaction(1)))
+        self.restart()
+        self.assertEqual(self.ids(), ["t0", "t1"])
+
+    def test_unreadable_line_is_skipped_and_journal_kept(self):
+        for i in range(5):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        with open(self.journal, "rb") as f:
+            lines = f.read().split(b"\n")
+        lines[2] = b'{"op": "add", "us' + lines[2]
+        with open(self.journal, "wb") as f:
+            f.write(b"\n".join(lines))
+
+        self.restart()
+        self.assertEqual(self.ids(), ["t0", "t1", "t3", "t4"])
+        self.assertTrue(self.handler.compact_transactions())
+        self.assertFalse(os.path.exists(self.journal))
+        self.assertEqual(len(glob.glob(self.journal + ".damaged-*")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
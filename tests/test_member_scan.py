@@ -0,0 +1,60 @@
+"""Loading one user's data from the shared files without parsing the others"""
+import json
+import unittest
+from unittest import mock
+
+from jsonhandler import JsonHandler
+from support import StorageTestCase, make_transaction
+
+
+def tricky() -> dict:
+    """Users and values that a naive scan for a member would get wrong"""
+    return {
+        'quo"te': [make_transaction(0, 'quo"te', description='say "hi" \\ {not} [an] object')],
+        "brace}": [make_transaction(1, "brace}", description="}]},{", tags=[{"a": [1, {"b": "]"}]}, []])],
+        "ünï": [make_transaction(2, "ünï", description="☃ \\u2603 \\\\")],
+        "empty": [],
+        "u": [make_transaction(i) for i in range(3, 6)],
+    }
+
+
+class MemberScanTest(StorageTestCase):
+    def write(self, name: str, data: dict, **dump_options) -> None:
+        with open(getattr(self.handler, name), "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_options)
+        self.restart()
+
+    def test_each_user_is_read_exactly_from_tricky_data(self):
+        for options in ({"indent": 4}, {"separators": (",", ":")}, {"ensure_ascii": False}):
+            with self.subTest(**{key: str(value) for key, value in options.items()}):
+                self.write("transactions_file", tricky(), **options)
+                with mock.patch.object(JsonHandler, "load_transactions", side_effect=AssertionError("whole file")):
+                    for user_id, transactions in tricky().items():
+                        self.assertEqual(self.handler.load_user_transactions(user_id), transactions)
+                    self.assertEqual(self.handler.load_user_transactions("nobody"), [])
+
+    def test_journal_records_of_the_user_are_replayed(self):
+        self.write("transactions_file", tricky())
+        self.assertTrue(self.handler.append_transaction(make_transaction(6)))
+        self.assertTrue(self.handler.append_transaction(make_transaction(7, "brace}")))
+        self.assertTrue(self.handler.remove_transaction("u", "t4"))
+        self.restart()
+        self.assertEqual(self.ids(), ["t3", "t5", "t6"])
+        self.assertEqual(self.ids("brace}"), ["t1", "t7"])
+        self.assertEqual(self.ids("empty"), [])
+
+    def test_bills_and_budgets_of_one_user(self):
+        self.write("bills_file", {"a": [{"bill_id": "{1}"}], "b": [{"bill_id": "2"}]})
+        self.write("budgets_file", {"a": {"2024-01": {"Food": 10.5}}, "b": {}})
+        self.assertEqual(self.handler.load_user_bills("b"), [{"bill_id": "2"}])
+        self.assertEqual(self.handler.load_user_budgets("a"), {"2024-01": {"Food": 10.5}})
+
+    def test_compressed_files_are_read_whole(self):
+        self.restart(JSON_COMPRESSION="gzip")
+        self.assertTrue(self.handler.save_transactions(tricky()))
+        self.restart()
+        self.assertEqual(self.handler.load_user_transactions("brace}"), tricky()["brace}"])
+
+
+if __name__ == "__main__":
+    unittest.main()
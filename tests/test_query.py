@@ -0,0 +1,48 @@
+"""Combined searches and the index the planner picks for them"""
+import unittest
+from unittest import mock
+
+from jsonhandler import JsonHandler
+from search_filter import SearchFilterManager
+from support import StorageTestCase, make_transaction
+
+
+class QueryPlanTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        transactions = [make_transaction(i, date=f"2024-01-{i + 1:02d}", amount_cents=1000 * (i % 4) + 100,
+                                         description="coffee shop" if i % 5 == 0 else f"market {i}")
+                        for i in range(20)]
+        self.assertTrue(self.handler.append_transactions(transactions))
+        self.manager = SearchFilterManager("u")
+
+    def query(self, **criteria) -> list:
+        return [t["transaction_id"] for t in self.manager.query(**criteria)]
+
+    def test_the_most_selective_index_is_used(self):
+        self.assertEqual(self.query(start_date="2024-01-03", end_date="2024-01-04", min_amount=1),
+                         ["t2", "t3"])
+        self.assertEqual(self.manager.last_plan, "date")
+        self.assertEqual(self.query(start_date="2024-01-02", min_amount=30, max_amount=31),
+                         ["t3", "t7", "t11", "t15", "t19"])
+        self.assertEqual(self.manager.last_plan, "amount")
+        self.assertEqual(self.query(terms="coffee", start_date="2024-01-01"), ["t0", "t5", "t10", "t15"])
+        self.assertEqual(self.manager.last_plan, "terms")
+        self.assertEqual(self.query(categories="food"), [f"t{i}" for i in range(20)])
+        self.assertEqual(self.manager.last_plan, "full scan")
+
+    def test_amount_order_stops_at_the_limit(self):
+        self.assertEqual(self.query(sort_by="amount", descending=True, limit=2), ["t3", "t7"])
+        self.assertEqual(self.manager.last_plan, "amount order")
+
+    def test_terms_without_a_description_index_match_nothing(self):
+        with mock.patch.object(JsonHandler, "load_description_index", return_value=None), \
+                mock.patch("builtins.print") as printed:
+            self.assertEqual(self.query(terms="coffee"), [])
+            self.assertEqual(self.query(terms="coffee", start_date="2024-01-01"), [])
+        self.assertEqual(self.manager.last_plan, "terms")
+        printed.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""TransactionRecord, the compact in-memory transaction, used wherever a dict was"""
+import copy
+import json
+import pickle
+import sys
+import unittest
+from unittest import mock
+
+from records import TransactionRecord
+from support import StorageTestCase, make_transaction
+from transactions import Transaction
+
+
+class DictCompatibilityTest(unittest.TestCase):
+    def test_reads_like_the_dict_it_was_built_from(self):
+        data = make_transaction(0, possible_duplicate=True)
+        record = TransactionRecord.from_dict(data)
+        self.assertEqual(record, data)
+        self.assertEqual(data, record)
+        self.assertEqual(dict(record), data)
+        self.assertEqual({**record}, data)
+        self.assertEqual(list(record), list(data))
+        self.assertEqual(len(record), 9)
+        self.assertEqual(record["category"], "Food")
+        self.assertEqual(record.get("missing", "x"), "x")
+        self.assertIn("possible_duplicate", record)
+        self.assertNotIn("missing", record)
+        self.assertRaises(KeyError, record.__getitem__, "missing")
+        self.assertEqual(json.dumps(record.to_dict()), json.dumps(data))
+
+    def test_writes_like_a_dict(self):
+        record = TransactionRecord.from_dict(make_transaction(0))
+        record.update({"description": "new", "note": "extra"})
+        record["category"] = "Bills"
+        del record["note"]
+        self.assertEqual(record, make_transaction(0, description="new", category="Bills"))
+        self.assertEqual(record.pop("description"), "new")
+        self.assertNotIn("description", record)
+        self.assertEqual(record.setdefault("description", "again"), "again")
+        self.assertRaises(KeyError, record.__delitem__, "note")
+
+    def test_copies_are_independent(self):
+        record = TransactionRecord.from_dict(make_transaction(0, tags=["a"]))
+        for duplicate in (record.copy(), copy.copy(record), pickle.loads(pickle.dumps(record))):
+            self.assertIsInstance(duplicate, TransactionRecord)
+            self.assertEqual(duplicate, record)
+            duplicate["description"] = "changed"
+            self.assertEqual(record["description"], "row 0")
+
+    def test_old_float_amounts_become_cents(self):
+        data = make_transaction(0, amount=12.34)
+        del data["amount_cents"]
+        record = TransactionRecord.from_dict(data)
+        self.assertEqual(record["amount_cents"], 1234)
+        self.assertNotIn("amount", record)
+
+    def test_repeated_values_are_shared_and_records_are_small(self):
+        first, second = (TransactionRecord.from_dict(make_transaction(i, category="".join(["Fo", "od"])))
+                         for i in range(2))
+        self.assertIs(first["category"], second["category"])
+        self.assertLess(sys.getsizeof(first), sys.getsizeof(make_transaction(0)))
+
+
+class StoredRecordTest(StorageTestCase):
+    def test_loaded_transactions_are_records_that_save_as_dicts(self):
+        self.assertTrue(self.handler.append_transactions([make_transaction(0), make_transaction(1, flag=1)]))
+        self.assertTrue(self.handler.flush())
+        self.restart()
+        transactions = Transaction.view_transactions("u")
+        self.assertTrue(all(isinstance(t, TransactionRecord) for t in transactions))
+        self.assertEqual(transactions, [make_transaction(0), make_transaction(1, flag=1)])
+
+        with mock.patch("builtins.print"):
+            self.assertTrue(Transaction.edit_transaction("t1", {"description": "edited"})["success"])
+        self.assertTrue(self.handler.compact_transactions())
+        with open(self.handler.transactions_file) as f:
+            self.assertEqual(json.load(f)["u"][1], make_transaction(1, flag=1, description="edited"))
+
+
+if __name__ == "__main__":
+    unittest.main()
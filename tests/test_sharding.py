@@ -0,0 +1,74 @@
+"""Per-user sharded data files"""
+import os
+import unittest
+
+from support import StorageTestCase, make_transaction
+
+
+class ShardedLayoutTest(StorageTestCase):
+    SETTINGS = {"STORAGE_LAYOUT": "sharded"}
+
+    def shard(self, collection: str, name: str) -> str:
+        return os.path.join(self.data_dir, collection, name)
+
+    def test_each_user_has_own_transaction_files(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0, "a")))
+        self.assertTrue(self.handler.append_transaction(make_transaction(1, "b")))
+        self.assertTrue(os.path.exists(self.shard("transactions", "a.journal")))
+        self.assertTrue(os.path.exists(self.shard("transactions", "b.journal")))
+        self.assertFalse(os.path.exists(self.handler.transactions_file))
+
+        self.assertTrue(self.handler.compact_transactions())
+        self.assertTrue(os.path.exists(self.shard("transactions", "a.json")))
+        self.assertFalse(os.path.exists(self.shard("transactions", "a.journal")))
+
+        self.restart()
+        self.assertEqual(self.ids("a"), ["t0"])
+        self.assertEqual(self.ids("b"), ["t1"])
+        self.assertEqual(set(self.handler.load_transactions()), {"a", "b"})
+
+    def test_saving_one_user_leaves_other_shards_alone(self):
+        self.assertTrue(self.handler.save_user_bills("a", [{"bill_id": "1"}]))
+        self.assertTrue(self.handler.save_user_bills("b", [{"bill_id": "2"}]))
+        other = self.shard("bills", "b.json")
+        before = os.stat(other).st_mtime_ns
+        self.assertTrue(self.handler.save_user_bills("a", [{"bill_id": "3"}]))
+        self.assertEqual(os.stat(other).st_mtime_ns, before)
+        self.restart()
+        self.assertEqual(self.handler.load_bills(), {"a": [{"bill_id": "3"}], "b": [{"bill_id": "2"}]})
+
+    def test_full_save_drops_shards_of_removed_users(self):
+        self.assertTrue(self.handler.save_budgets({"a": {"2024-01": {"Food": 1}}, "b": {}}))
+        self.assertTrue(self.handler.save_budgets({"a": {}}))
+        self.assertFalse(os.path.exists(self.shard("budgets", "b.json")))
+        self.restart()
+        self.assertEqual(self.handler.load_budgets(), {"a": {}})
+
+    def test_user_ids_are_made_safe_for_file_names(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0, "a/../b")))
+        self.assertEqual(os.listdir(os.path.join(self.data_dir, "transactions")), ["a%2F..%2Fb.journal"])
+        self.restart()
+        self.assertEqual(self.ids("a/../b"), ["t0"])
+
+
+class MigrateToShardsTest(StorageTestCase):
+    def test_single_files_are_split_once_and_kept_as_migrated(self):
+        self.assertTrue(self.handler.save_transactions({"a": [make_transaction(0, "a")]}))
+        self.assertTrue(self.handler.append_transaction(make_transaction(1, "b")))
+        self.assertTrue(self.handler.save_bills({"a": [{"bill_id": "1"}]}))
+
+        self.restart(STORAGE_LAYOUT="sharded")
+        self.assertEqual(self.ids("a"), ["t0"])
+        self.assertEqual(self.ids("b"), ["t1"])
+        self.assertEqual(self.handler.load_user_bills("a"), [{"bill_id": "1"}])
+        self.assertTrue(os.path.exists(self.handler.transactions_file + ".migrated"))
+        self.assertFalse(os.path.exists(self.handler.transactions_file))
+        self.assertFalse(os.path.exists(self.handler.transactions_journal_file))
+
+        self.assertTrue(self.handler.append_transaction(make_transaction(2, "a")))
+        self.restart(STORAGE_LAYOUT="sharded")
+        self.assertEqual(self.ids("a"), ["t0", "t2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""The SQLite backend behind the JsonHandler interface"""
+import os
+import unittest
+
+import manage
+from support import StorageTestCase, make_transaction
+
+
+class SqliteBackendTest(StorageTestCase):
+    SETTINGS = {"STORAGE_BACKEND": "sqlite"}
+
+    def test_changes_are_kept_in_the_database(self):
+        for i in range(4):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        self.assertTrue(self.handler.update_transaction("u", "t1", {"description": "edited"}))
+        self.assertTrue(self.handler.remove_transaction("u", "t2"))
+        self.assertFalse(os.path.exists(self.handler.transactions_file))
+
+        self.restart()
+        self.assertEqual(self.ids(), ["t0", "t1", "t3"])
+        self.assertEqual(self.handler.find_transaction("t1")["description"], "edited")
+        self.assertIsNone(self.handler.find_transaction("t2"))
+
+    def test_extra_keys_survive_a_round_trip(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0, possible_duplicate=True)))
+        self.restart()
+        self.assertEqual(self.handler.find_transaction("t0"), make_transaction(0, possible_duplicate=True))
+
+    def test_existing_transaction_id_is_rejected_not_replaced(self):
+        for i in range(3):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        self.assertFalse(self.handler.append_transaction(make_transaction(0, description="other")))
+        self.assertEqual(self.ids(), ["t0", "t1", "t2"])
+        self.assertEqual(self.handler.find_transaction("t0")["description"], "row 0")
+
+    def test_batch_with_an_existing_id_saves_nothing(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(1)))
+        batch = [make_transaction(i) for i in range(3)]
+        self.assertFalse(self.handler.append_transactions(batch))
+        self.assertEqual(self.ids(), ["t1"])
+
+    def test_other_collections_round_trip(self):
+        self.assertTrue(self.handler.save_users({"alice": {"id": "a", "username": "alice"}}))
+        self.assertTrue(self.handler.save_bills({"a": [{"bill_id": "b1", "name": "Rent"}]}))
+        self.assertTrue(self.handler.save_budgets({"a": {"2024-01": {"Food": 200.0}}}))
+        self.assertTrue(self.handler.save_imports({"a:hash": {"last_row": 7}}))
+        self.restart()
+        self.assertEqual(self.handler.load_users(), {"alice": {"id": "a", "username": "alice"}})
+        self.assertEqual(self.handler.load_user_bills("a"), [{"bill_id": "b1", "name": "Rent"}])
+        self.assertEqual(self.handler.load_user_budgets("a"), {"2024-01": {"Food": 200.0}})
+        self.assertEqual(self.handler.load_imports(), {"a:hash": {"last_row": 7}})
+
+    def test_duplicates_are_counted_ignoring_case_and_spacing(self):
+        self.assertTrue(self.handler.append_transaction(make_transaction(0, description="Corner  Shop")))
+        self.assertEqual(self.handler.count_duplicates(make_transaction(1, amount_cents=100,
+                                                                        description="corner shop")), 1)
+        self.assertEqual(self.handler.count_duplicates(make_transaction(1, description="corner shop")), 0)
+
+
+class MigrateToSqliteTest(StorageTestCase):
+    def test_json_data_is_copied_into_the_database(self):
+        for i in range(3):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i)))
+        self.assertTrue(self.handler.save_users({"alice": {"id": "u"}}))
+
+        self.assertEqual(manage.main(["migrate-sqlite"]), 0)
+        self.restart(STORAGE_BACKEND="sqlite")
+        self.assertEqual(self.ids(), ["t0", "t1", "t2"])
+        self.assertEqual(self.handler.load_users(), {"alice": {"id": "u"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Looking transactions up by ID through the transaction ID index"""
+import json
+import os
+import unittest
+from unittest import mock
+
+from jsonhandler import JsonHandler
+from support import StorageTestCase, make_transaction
+
+
+class TransactionIndexTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i, "a" if i % 2 else "b")))
+
+    def description(self, transaction_id: str):
+        transaction = self.handler.find_transaction(transaction_id)
+        return transaction["description"] if transaction is not None else None
+
+    def test_lookups_stay_right_after_deletes_without_reindexing(self):
+        self.assertEqual(self.description("t5"), "row 5")
+        with mock.patch.object(JsonHandler, "_index_user", side_effect=AssertionError("reindexed")):
+            self.assertTrue(self.handler.remove_transaction("a", "t1"))
+            self.assertTrue(self.handler.remove_transaction("a", "t3"))
+            self.assertTrue(self.handler.append_transaction(make_transaction(6, "a")))
+            self.assertTrue(self.handler.update_transaction("a", "t5", {"description": "edited"}))
+            self.assertIsNone(self.handler.find_transaction("t1"))
+            self.assertEqual(self.description("t5"), "edited")
+            self.assertEqual(self.description("t6"), "row 6")
+            self.assertEqual(self.description("t4"), "row 4")
+        self.restart()
+        self.assertEqual(self.ids("a"), ["t5", "t6"])
+
+    def test_index_is_saved_with_the_snapshot(self):
+        self.assertEqual(self.description("t0"), "row 0")
+        self.assertTrue(self.handler.remove_transaction("b", "t2"))
+        self.assertTrue(self.handler.compact_transactions())
+        with open(self.handler.transaction_index_file) as f:
+            self.assertEqual(json.load(f)["users"], {"a": ["t1", "t3", "t5"], "b": ["t0", "t4"]})
+
+        # No clean exit: the index written with the snapshot is used as it is
+        self.restart()
+        with mock.patch.object(JsonHandler, "load_transactions", side_effect=AssertionError("rebuilt")):
+            self.assertEqual(self.description("t4"), "row 4")
+            self.assertIsNone(self.handler.find_transaction("t2"))
+
+    def test_index_waits_for_a_deferred_snapshot(self):
+        self.restart(GROUP_COMMIT_WINDOW_MS=60000)
+        self.assertEqual(self.description("t0"), "row 0")
+        os.remove(self.handler.transaction_index_file)
+        self.assertTrue(self.handler.compact_transactions())
+        self.assertFalse(os.path.exists(self.handler.transaction_index_file))
+        self.assertTrue(self.handler.flush())
+        self.assertTrue(os.path.exists(self.handler.transaction_index_file))
+        self.restart()
+        with mock.patch.object(JsonHandler, "load_transactions", side_effect=AssertionError("rebuilt")):
+            self.assertEqual(self.description("t3"), "row 3")
+
+    def test_index_of_changed_files_is_rebuilt(self):
+        self.assertEqual(self.description("t0"), "row 0")
+        self.assertTrue(self.handler.compact_transactions())
+        self.assertTrue(self.handler.append_transaction(make_transaction(6, "a")))
+        self.restart()
+        self.assertEqual(self.description("t6"), "row 6")
+        self.assertEqual(self.description("t1"), "row 1")
+
+
+class ShardedTransactionIndexTest(TransactionIndexTest):
+    SETTINGS = {"STORAGE_LAYOUT": "sharded"}
+
+
+if __name__ == "__main__":
+    unittest.main()
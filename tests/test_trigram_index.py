@@ -0,0 +1,49 @@
+"""Fuzzy description search and the trigram index behind it"""
+import unittest
+from unittest import mock
+
+from search_filter import SearchFilterManager
+from support import StorageTestCase, make_transaction
+from text_index import TrigramIndex
+
+
+class TrigramIndexTest(StorageTestCase):
+    def setUp(self):
+        super().setUp()
+        descriptions = ["STARBUCKS COFFEE", "Amazon.com", "starbucks  coffee", "Rent", "AMAZON MARKETPLACE"]
+        for i, description in enumerate(descriptions):
+            self.assertTrue(self.handler.append_transaction(make_transaction(i, description=description)))
+
+    def fuzzy_ids(self, text: str) -> list:
+        return [t["transaction_id"] for t in SearchFilterManager("u").fuzzy_search(text)]
+
+    def test_similar_spellings_are_found_best_first(self):
+        matches = SearchFilterManager("u").similar_descriptions("starbuks")
+        self.assertEqual(matches[0][0], "STARBUCKS COFFEE")
+        self.assertEqual(matches[0][2], 2)
+        self.assertEqual(self.fuzzy_ids("starbuks")[:2], ["t0", "t2"])
+        self.assertEqual(set(self.fuzzy_ids("amazon")), {"t1", "t4"})
+
+    def test_writes_update_the_index_without_rebuilding_it(self):
+        self.assertEqual(self.fuzzy_ids("rent"), ["t3"])
+        with mock.patch.object(TrigramIndex, "from_transactions", side_effect=AssertionError("rebuilt")):
+            self.assertTrue(self.handler.append_transaction(make_transaction(5, description="Rent June")))
+            self.assertTrue(self.handler.update_transaction("u", "t0", {"description": "Rent"}))
+            self.assertTrue(self.handler.remove_transaction("u", "t3"))
+            self.assertEqual(self.fuzzy_ids("rent"), ["t0", "t5"])
+            self.assertEqual(self.fuzzy_ids("starbuks"), ["t2"])
+
+    def test_description_no_longer_used_is_not_offered(self):
+        self.assertTrue(self.handler.remove_transaction("u", "t3"))
+        self.assertEqual(SearchFilterManager("u").similar_descriptions("rent"), [])
+        self.assertTrue(self.handler.append_transaction(make_transaction(5, description="RENT")))
+        self.assertEqual(SearchFilterManager("u").similar_descriptions("rent"), [("RENT", 1.0, 1)])
+
+    def test_full_save_rebuilds_the_index(self):
+        self.assertEqual(self.fuzzy_ids("rent"), ["t3"])
+        self.assertTrue(self.handler.save_transactions({"u": [make_transaction(9, description="Rent")]}))
+        self.assertEqual(self.fuzzy_ids("rent"), ["t9"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""Write-behind auto-save: saves kept in memory and written by a background thread"""
+import json
+import time
+import unittest
+
+import data_store
+from support import StorageTestCase, make_transaction
+
+
+class WriteBehindTest(StorageTestCase):
+    SETTINGS = {"WRITE_BEHIND": True, "AUTO_SAVE_INTERVAL_MS": 60000, "AUTO_SAVE_MAX_DIRTY": 3}
+
+    def tearDown(self):
+        self.handler.set_write_behind(False)
+        super().tearDown()
+
+    def users_on_disk(self):
+        try:
+            with open(self.handler.users_file) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def wait_for(self, condition) -> bool:
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_saves_stay_in_memory_until_flushed(self):
+        self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+        self.assertTrue(self.handler.append_transaction(make_transaction(0)))
+        self.assertEqual(self.handler.dirty_count(), 2)
+        self.assertIsNone(self.users_on_disk())
+        self.assertEqual(self.handler.load_users(), {"a": {"id": "a"}})
+        self.assertEqual(self.ids(), ["t0"])
+
+        self.assertTrue(self.handler.flush())
+        self.assertEqual(self.handler.dirty_count(), 0)
+        self.assertEqual(self.users_on_disk(), {"a": {"id": "a"}})
+        self.restart()
+        self.assertEqual(self.ids(), ["t0"])
+
+    def test_enough_dirty_saves_wake_the_background_writer(self):
+        for name in "abc":
+            self.assertTrue(self.handler.save_users({name: {"id": name}}))
+        self.assertTrue(self.wait_for(lambda: self.users_on_disk() == {"c": {"id": "c"}}))
+        self.assertEqual(self.handler.dirty_count(), 0)
+
+    def test_background_writer_runs_on_the_interval(self):
+        self.handler.set_write_behind(True, interval_ms=20)
+        self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+        self.assertTrue(self.wait_for(lambda: self.users_on_disk() == {"a": {"id": "a"}}))
+
+    def test_turning_it_off_writes_everything(self):
+        self.assertTrue(self.handler.save_users({"a": {"id": "a"}}))
+        data_store.auto_save(False)
+        self.assertEqual(self.users_on_disk(), {"a": {"id": "a"}})
+        self.assertTrue(self.handler.save_users({"b": {"id": "b"}}))
+        self.assertEqual(self.users_on_disk(), {"b": {"id": "b"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
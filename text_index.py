@@ -0,0 +1,345 @@
+import math
+import re
+from bisect import bisect_left, insort
+from functools import lru_cache
+from typing import Dict, List, Any, Iterable, Set, Tuple
+
+
+class DescriptionIndex:
+    """An inverted index from description words to transaction IDs
+
+    Descriptions are split into lowercase words (runs of letters and
+    digits). The index keeps the words of each transaction, so adds, edits
+    and deletes update it in place instead of rebuilding it, and a sorted
+    vocabulary so a prefix finds its words with a binary search. It also
+    keeps each transaction with its place in the user's list, so matches
+    come back as transactions in list order without a scan of the list.
+    """
+
+    _WORD = re.compile(r"[^\W_]+")
+
+    def __init__(self):
+        self.postings: Dict[str, Set[str]] = {}
+        self.vocabulary: List[str] = []
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._words: Dict[str, tuple] = {}
+        # Transactions are only ever appended or deleted, so numbering them in
+        # the order they are added keeps the order of the user's list
+        self._order: Dict[str, int] = {}
+        self._next = 0
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict[str, Any]]) -> "DescriptionIndex":
+        """Index a list of transactions"""
+        index = cls()
+        postings = index.postings
+        for transaction in transactions:
+            transaction_id = transaction["transaction_id"]
+            index.records[transaction_id] = transaction
+            index._order[transaction_id] = index._next
+            index._next += 1
+            words = tuple(set(cls.tokenize(transaction.get("description"))))
+            index._words[transaction_id] = words
+            for word in words:
+                ids = postings.get(word)
+                if ids is None:
+                    postings[word] = {transaction_id}
+                else:
+                    ids.add(transaction_id)
+        index.vocabulary = sorted(postings)
+        return index
+
+    @classmethod
+    def tokenize(cls, text: Any) -> List[str]:
+        """Lowercase words of a description"""
+        return cls._WORD.findall(str(text).lower()) if text else []
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def add(self, transaction: Dict[str, Any]) -> None:
+        """Index a new transaction, after every transaction indexed so far"""
+        transaction_id = transaction["transaction_id"]
+        if transaction_id not in self._order:
+            self._order[transaction_id] = self._next
+            self._next += 1
+        self.records[transaction_id] = transaction
+        self.index_description(transaction_id, transaction.get("description"))
+
+    def index_description(self, transaction_id: str, description: Any) -> None:
+        """Index a transaction's description, replacing what was indexed for it before"""
+        self._unindex(transaction_id)
+        words = tuple(set(self.tokenize(description)))
+        self._words[transaction_id] = words
+        for word in words:
+            ids = self.postings.get(word)
+            if ids is None:
+                self.postings[word] = {transaction_id}
+                insort(self.vocabulary, word)
+            else:
+                ids.add(transaction_id)
+
+    def remove(self, transaction_id: str) -> None:
+        """Drop a transaction from the index (nothing happens if it is not there)"""
+        self._unindex(transaction_id)
+        self.records.pop(transaction_id, None)
+        self._order.pop(transaction_id, None)
+
+    def _unindex(self, transaction_id: str) -> None:
+        """Drop the words indexed for a transaction"""
+        for word in self._words.pop(transaction_id, ()):
+            ids = self.postings[word]
+            ids.discard(transaction_id)
+            if not ids:
+                del self.postings[word]
+                del self.vocabulary[bisect_left(self.vocabulary, word)]
+
+    def apply(self, record: Dict[str, Any]) -> bool:
+        """Keep the index in step with an add/edit/delete journal record
+
+        Returns False when the record cannot be applied, in which case the
+        index should be rebuilt.
+        """
+        op = record.get("op")
+        if op == "add":
+            self.add(record["transaction"])
+        elif op == "edit":
+            transaction = self.records.get(record["transaction_id"])
+            if transaction is None:
+                return False
+            # Usually the user's own transaction, already updated; a copy from
+            # another load (or an added record) is brought up to date here
+            transaction.update(record["fields"])
+            if "description" in record["fields"]:
+                self.index_description(record["transaction_id"], record["fields"]["description"])
+        elif op == "delete":
+            self.remove(record["transaction_id"])
+        else:
+            return False
+        return True
+
+    def transactions(self, transaction_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """The indexed transactions with the given IDs, in the order of the user's list"""
+        order = self._order
+        return [self.records[transaction_id] for transaction_id in sorted(transaction_ids, key=order.__getitem__)]
+
+    def prefix_ids(self, prefix: str) -> Set[str]:
+        """IDs of transactions with a word starting with prefix"""
+        vocabulary = self.vocabulary
+        position = bisect_left(vocabulary, prefix)
+        ids = set()
+        while position < len(vocabulary) and vocabulary[position].startswith(prefix):
+            ids |= self.postings[vocabulary[position]]
+            position += 1
+        return ids
+
+    def search(self, query: str) -> Set[str]:
+        """IDs of transactions whose description matches query
+
+        Words are all required (AND); "OR" (or "|") between groups of words
+        accepts either group, and a word ending in "*" matches as a prefix,
+        so "coffee OR tea" and "amaz* mktp" both work.
+        """
+        matches = set()
+        for group in re.split(r"\s+(?:OR|\|)\s+", query.strip()):
+            matches |= self._search_all(group.split())
+        return matches
+
+    def _search_all(self, terms: List[str]) -> Set[str]:
+        """IDs of transactions matching every term"""
+        sets = []
+        for term in terms:
+            prefix = term.endswith("*")
+            words = self.tokenize(term)
+            if not words:
+                continue
+            for i, word in enumerate(words):
+                if prefix and i == len(words) - 1:
+                    ids = self.prefix_ids(word)
+                else:
+                    ids = self.postings.get(word, set())
+                if not ids:
+                    return set()
+                sets.append(ids)
+        if not sets:
+            return set()
+        # Intersect starting from the rarest word, so the work is bounded by it
+        sets.sort(key=len)
+        result = set(sets[0])
+        for ids in sets[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+
+class TrigramIndex:
+    """Fuzzy lookup of descriptions by the trigrams (three-character pieces) they share
+
+    Each distinct description (after normalizing) gets a number and is
+    indexed once, with the IDs of the transactions that use it, and a lookup
+    scores only descriptions that share a trigram with the search text.
+    Like DescriptionIndex it follows adds, edits and deletes in place. A
+    description no transaction uses any more keeps its number but is left
+    out of searches.
+    """
+
+    _WORD = re.compile(r"[^\W_]+")
+
+    def __init__(self):
+        self.labels: List[str] = []              # spelling of each distinct description
+        self.grams: List[frozenset] = []         # trigram set of each distinct description
+        self.members: List[Dict[str, None]] = []  # IDs using each distinct description
+        self.postings: Dict[str, List[int]] = {}  # trigram -> distinct descriptions containing it
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._numbers: Dict[str, int] = {}        # normalized text -> number
+        self._by_text: Dict[Any, int] = {}        # exact description -> number
+        self._number_of: Dict[str, int] = {}      # transaction ID -> number
+        # Numbered in the order added, which is the order of the user's list
+        self._order: Dict[str, int] = {}
+        self._next = 0
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable[Dict[str, Any]]) -> "TrigramIndex":
+        """Index a list of transactions"""
+        index = cls()
+        for transaction in transactions:
+            index.add(transaction)
+        return index
+
+    @classmethod
+    def normalize(cls, text: Any) -> str:
+        """Lowercase words of a description joined by single spaces ("AMZN*Mktp" -> "amzn mktp")"""
+        return " ".join(cls._WORD.findall(str(text).lower())) if text else ""
+
+    @classmethod
+    def trigrams(cls, text: str) -> frozenset:
+        """Trigrams of normalized text; words are padded so their starts and ends count too"""
+        words = text.split()
+        if len(words) == 1:
+            return cls._word_trigrams(words[0])
+        grams = set()
+        for word in words:
+            grams |= cls._word_trigrams(word)
+        return frozenset(grams)
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _word_trigrams(word: str) -> frozenset:
+        """Trigrams of one word (merchant names repeat, so these are cached)"""
+        padded = "  " + word + " "
+        return frozenset([padded[i:i + 3] for i in range(len(padded) - 2)])
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def add(self, transaction: Dict[str, Any]) -> None:
+        """Index a new transaction, after every transaction indexed so far"""
+        transaction_id = transaction["transaction_id"]
+        if transaction_id not in self._order:
+            self._order[transaction_id] = self._next
+            self._next += 1
+        self.records[transaction_id] = transaction
+        self.index_description(transaction_id, transaction.get("description"))
+
+    def index_description(self, transaction_id: str, description: Any) -> None:
+        """Index a transaction's description, replacing what was indexed for it before"""
+        self._unindex(transaction_id)
+        # Exact repeats skip normalizing; spellings that normalize alike share a number
+        number = self._by_text.get(description)
+        if number is None:
+            text = self.normalize(description)
+            number = self._numbers.get(text)
+            if number is None:
+                number = self._numbers[text] = len(self.labels)
+                self.labels.append(description or "")
+                self.members.append({})
+                grams = self.trigrams(text)
+                self.grams.append(grams)
+                postings = self.postings
+                for gram in grams:
+                    numbers_with_gram = postings.get(gram)
+                    if numbers_with_gram is None:
+                        postings[gram] = [number]
+                    else:
+                        numbers_with_gram.append(number)
+            self._by_text[description] = number
+        members = self.members[number]
+        if not members:
+            self.labels[number] = description or ""
+        members[transaction_id] = None
+        self._number_of[transaction_id] = number
+
+    def remove(self, transaction_id: str) -> None:
+        """Drop a transaction from the index (nothing happens if it is not there)"""
+        self._unindex(transaction_id)
+        self.records.pop(transaction_id, None)
+        self._order.pop(transaction_id, None)
+
+    def _unindex(self, transaction_id: str) -> None:
+        """Drop a transaction from the members of its description"""
+        number = self._number_of.pop(transaction_id, None)
+        if number is not None:
+            del self.members[number][transaction_id]
+
+    def apply(self, record: Dict[str, Any]) -> bool:
+        """Keep the index in step with an add/edit/delete journal record
+
+        Returns False when the record cannot be applied, in which case the
+        index should be rebuilt.
+        """
+        op = record.get("op")
+        if op == "add":
+            self.add(record["transaction"])
+        elif op == "edit":
+            transaction = self.records.get(record["transaction_id"])
+            if transaction is None:
+                return False
+            transaction.update(record["fields"])
+            if "description" in record["fields"]:
+                self.index_description(record["transaction_id"], record["fields"]["description"])
+        elif op == "delete":
+            self.remove(record["transaction_id"])
+        else:
+            return False
+        return True
+
+    def count(self, number: int) -> int:
+        """Number of transactions using a distinct description"""
+        return len(self.members[number])
+
+    def transactions(self, number: int) -> List[Dict[str, Any]]:
+        """The transactions using a distinct description, in the order of the user's list"""
+        order = self._order
+        return [self.records[transaction_id] for transaction_id in sorted(self.members[number], key=order.__getitem__)]
+
+    def search(self, text: str, min_similarity: float = 0.3) -> List[Tuple[float, int]]:
+        """Find descriptions similar to text, best first, as (similarity, description number)
+
+        Similarity is the share of the text's trigrams found in a description
+        (1.0 when every one is); ties go to the description closest in
+        length, then the first seen.
+        """
+        wanted = self.trigrams(self.normalize(text))
+        if not wanted:
+            return []
+        # A description scoring min_similarity shares at least `needed` trigrams, so it
+        # has one of the len(wanted) - needed + 1 rarest and only those lists are read
+        needed = max(1, math.ceil(min_similarity * len(wanted) - 1e-9))
+        if needed > len(wanted):
+            return []
+        lists = sorted((self.postings.get(gram, ()) for gram in wanted), key=len)
+        candidates = set()
+        for numbers in lists[:len(wanted) - needed + 1]:
+            candidates.update(numbers)
+        matches = []
+        for number in candidates:
+            if not self.members[number]:
+                continue
+            grams = self.grams[number]
+            shared = len(wanted & grams)
+            if shared >= needed:
+                overlap = shared / (len(wanted) + len(grams) - shared)
+                matches.append((shared / len(wanted), overlap, -number))
+        matches.sort(reverse=True)
+        return [(score, -number) for score, _, number in matches]
@@ -1,7 +1,9 @@
 from jsonhandler import JsonHandler
 from utility import Utilities
+from records import TransactionRecord
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+import config
 
 
 class TransactionManager:
@@ -12,6 +14,8 @@ class TransactionManager:
         "income": ["Salary", "Freelance", "Investment", "Gift", "Other"]
     }
     PAYMENT_METHODS = ["Cash", "Credit Card", "Debit Card", "Bank Transfer"]
+    BULK_MODES = ("all_or_nothing", "best_effort")
+    DUPLICATE_POLICIES = ("skip", "flag", "allow")
     
     def __init__(self):
         self._json_handler = JsonHandler()
@@ -19,8 +23,11 @@ class TransactionManager:
     
     def add_transaction(self, user_id: str, type: str, amount: str, category: str, 
                        date: Optional[str] = None, description: str = "", 
-                       payment_method: str = "") -> Optional[Dict[str, Any]]:
-        """Add a new transaction"""
+                       payment_method: str = "", duplicates: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Add a new transaction
+        
+        duplicates is one of DUPLICATE_POLICIES (default config.DUPLICATE_POLICY).
+        """
         try:
             # Normalize inputs
             type = type.lower().strip()
@@ -51,12 +58,170 @@ class TransactionManager:
                 payment_method=payment_method
             )
             
-            return transaction.add_transaction()
+            return transaction.add_transaction(duplicates)
             
         except Exception as e:
             print(f"Error adding transaction: {e}")
             return None
     
+    def add_transactions(self, user_id: str, rows: List[Dict[str, Any]],
+                         mode: str = "all_or_nothing", duplicates: Optional[str] = None) -> Dict[str, Any]:
+        """Add many transactions at once, committed in a single write
+        
+        Args:
+            user_id: The user's ID
+            rows: Dicts with type, amount (in currency units, stored as
+                integer cents), category and optionally date, description
+                and payment_method
+            mode: "all_or_nothing" saves nothing if any row is invalid;
+                "best_effort" saves the valid rows and skips the rest
+            duplicates: One of DUPLICATE_POLICIES (default config.DUPLICATE_POLICY)
+        
+        Returns:
+            Dict with success status, message and data holding the added
+            transactions, a list of {"row": index, "message": error} and the
+            transactions that matched existing ones
+        """
+        if mode not in self.BULK_MODES:
+            raise ValueError(f"mode must be one of {', '.join(self.BULK_MODES)}")
+        
+        transactions, errors = self.prepare_transactions(user_id, rows)
+        
+        if errors and mode == "all_or_nothing":
+            return {
+                "success": False,
+                "message": f"{len(errors)} invalid rows, nothing was added",
+                "data": {"added": [], "errors": errors, "duplicates": []}
+            }
+        
+        transactions, found = self.check_duplicates(transactions, duplicates)
+        if not self._json_handler.append_transactions(transactions):
+            return {
+                "success": False,
+                "message": "Failed to save transactions",
+                "data": {"added": [], "errors": errors, "duplicates": found}
+            }
+        
+        message = f"{len(transactions)} transactions added"
+        if errors:
+            message += f", {len(errors)} rows skipped"
+        if found:
+            message += f", {len(found)} possible duplicates {self._duplicate_action(duplicates)}"
+        return {
+            "success": True,
+            "message": message,
+            "data": {"added": transactions, "errors": errors, "duplicates": found}
+        }
+    
+    @classmethod
+    def check_duplicates(cls, transactions: List[Dict[str, Any]],
+                         policy: Optional[str] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Apply a duplicate policy to new transactions before they are saved
+        
+        A transaction is a duplicate when the same user already has one with
+        the same fingerprint (see Utilities.transaction_fingerprint), or when
+        an earlier transaction of the same batch has it. "skip" drops
+        duplicates, "flag" keeps them marked with "possible_duplicate": True
+        and "allow" (the default) does not check at all.
+        
+        Returns:
+            Tuple of (transactions to save, duplicates found)
+        """
+        policy = policy or config.DUPLICATE_POLICY
+        if policy not in cls.DUPLICATE_POLICIES:
+            raise ValueError(f"duplicates must be one of {', '.join(cls.DUPLICATE_POLICIES)}")
+        if policy == "allow":
+            return transactions, []
+        
+        json_handler = JsonHandler()
+        kept = []
+        found = []
+        seen = set()
+        for transaction in transactions:
+            key = (transaction["user_id"], Utilities.transaction_fingerprint(transaction))
+            duplicate = key in seen or json_handler.count_duplicates(transaction)
+            seen.add(key)
+            if duplicate:
+                found.append(transaction)
+                if policy == "skip":
+                    continue
+                transaction["possible_duplicate"] = True
+            kept.append(transaction)
+        return kept, found
+    
+    @staticmethod
+    def _duplicate_action(policy: Optional[str]) -> str:
+        """Past tense of what a duplicate policy does, for messages"""
+        return "skipped" if (policy or config.DUPLICATE_POLICY) == "skip" else "flagged"
+    
+    @classmethod
+    def prepare_transactions(cls, user_id: str,
+                             rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Validate and normalize rows into new transactions without saving them
+        
+        Has no side effects, so it can also run in worker processes. A row may
+        carry its own "transaction_id"; otherwise a new one is generated.
+        
+        Returns:
+            Tuple of (transactions for the valid rows, [{"row": index, "message": error}])
+        """
+        # Lookup tables built once for the whole batch
+        categories = {t: {c.lower(): c for c in names} for t, names in cls.CATEGORIES.items()}
+        payment_methods = {m.lower(): m for m in cls.PAYMENT_METHODS}
+        today = datetime.now().date()
+        current_date = today.strftime('%Y-%m-%d')
+        checked_dates = {}
+        
+        transactions = []
+        errors = []
+        for index, row in enumerate(rows):
+            try:
+                type = str(row.get("type") or "").lower().strip()
+                if type not in cls.CATEGORIES:
+                    raise ValueError("Invalid transaction type")
+                
+                try:
+                    amount_cents = Utilities.to_cents(row.get("amount"))
+                except ValueError:
+                    raise ValueError("Invalid amount")
+                if not amount_cents > 0:
+                    raise ValueError("Invalid amount")
+                
+                category = str(row.get("category") or "")
+                category = categories[type].get(category.lower(), category)
+                if category not in cls.CATEGORIES[type]:
+                    raise ValueError("Invalid category for transaction type")
+                
+                payment_method = str(row.get("payment_method") or "")
+                payment_method = payment_methods.get(payment_method.lower(), payment_method)
+                if payment_method not in cls.PAYMENT_METHODS:
+                    raise ValueError("Invalid payment method")
+                
+                date = row.get("date") or current_date
+                if date not in checked_dates:
+                    try:
+                        parsed = datetime.strptime(date, '%Y-%m-%d').date()
+                        checked_dates[date] = "Date cannot be in the future" if parsed > today else None
+                    except (TypeError, ValueError):
+                        checked_dates[date] = "Invalid date format. Use YYYY-MM-DD"
+                if checked_dates[date]:
+                    raise ValueError(checked_dates[date])
+                
+                transactions.append({
+                    "transaction_id": row.get("transaction_id") or Utilities.generate_uuid(),
+                    "user_id": user_id,
+                    "type": type,
+                    "amount_cents": amount_cents,
+                    "category": category,
+                    "date": date,
+                    "description": row.get("description") or "",
+                    "payment_method": payment_method
+                })
+            except ValueError as e:
+                errors.append({"row": index, "message": str(e)})
+        
+        return transactions, errors
+    
     def view_transactions(self, user_id: str) -> List[Dict[str, Any]]:
         """View all transactions for a user"""
         return Transaction.view_transactions(user_id)
@@ -127,10 +292,12 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
         print("4. Delete Transaction")
         print("5. Import from Excel")
         print("6. Export to Excel")
-        print("7. Back to Main Menu")
+        print("7. Import from CSV")
+        print("8. Export to CSV")
+        print("9. Back to Main Menu")
         print("-------------------------------")
 
-        choice = input("Enter your choice (1-7): ").strip()
+        choice = input("Enter your choice (1-9): ").strip()
 
         if choice == "1":
             try:
@@ -158,6 +325,8 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
                 
                 if transaction:
                     print("\nTransaction added successfully!")
+                    if transaction.get("possible_duplicate"):
+                        print("Note: it matches an existing transaction and was flagged as a possible duplicate.")
                 
             except Exception as e:
                 print(f"\nError: {e}")
@@ -170,7 +339,7 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
                 print(f"\n--- Your Transactions ({len(transactions)}) ---")
                 for idx, t in enumerate(transactions, 1):
                     print(f"\n[{idx}] {t['date']} - {t['type'].upper()}")
-                    print(f"    Amount: {t['amount']} | Category: {t['category']}")
+                    print(f"    Amount: {utilities.format_amount(t['amount_cents'])} | Category: {t['category']}")
                     print(f"    Description: {t['description']}")
                     print(f"    Payment Method: {t['payment_method']}")
                     print("-" * 40)
@@ -189,7 +358,7 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
                 while True:
                     print("\nCurrent Transaction Values:")
                     print(f"1. Type: {selected['type']}")
-                    print(f"2. Amount: {selected['amount']}")
+                    print(f"2. Amount: {utilities.format_amount(selected['amount_cents'])}")
                     print(f"3. Category: {selected['category']}")
                     print(f"4. Date: {selected['date']}")
                     print(f"5. Description: {selected['description']}")
@@ -211,11 +380,11 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
                             print("Invalid type! Must be 'expense' or 'income'")
                             
                     elif edit_choice == "2":
-                        print(f"Current amount: {selected['amount']}")
+                        print(f"Current amount: {utilities.format_amount(selected['amount_cents'])}")
                         new_amount = input("New amount: ")
                         if utilities.validate_amount(new_amount):
-                            new_values['amount'] = float(new_amount)
-                            selected['amount'] = float(new_amount)
+                            new_values['amount'] = new_amount
+                            selected['amount_cents'] = utilities.to_cents(new_amount)
                             print("Amount updated!")
                         else:
                             print("Invalid amount!")
@@ -309,10 +478,13 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
                 print("No file path provided.")
                 utilities.pause()
                 continue
+            duplicates = input(f"Rows matching existing transactions "
+                               f"({'/'.join(manager.DUPLICATE_POLICIES)}, "
+                               f"or press Enter for {config.DUPLICATE_POLICY}): ").strip().lower() or None
             
             try:
                 print("\nValidating file...")
-                success, message, count = excel_handler.import_excel_transactions(file_path)
+                success, message, count = excel_handler.import_excel_transactions(file_path, duplicates)
                 if success:
                     print(f"\n✓ {message}")
                 else:
@@ -330,9 +502,15 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
             file_path = input("Enter file path (or press Enter for default): ").strip()
             if not file_path:
                 file_path = None
+            start_date = input("Start date (YYYY-MM-DD, or press Enter for all): ").strip() or None
+            end_date = input("End date (YYYY-MM-DD, or press Enter for all): ").strip() or None
+            by_month = input("One sheet per month with a summary sheet? (y/n): ").strip().lower() == "y"
+            months_per_file = input("Months per file (or press Enter for a single file): ").strip()
             
             try:
-                success, message = excel_handler.export_excel_transactions(file_path)
+                success, message = excel_handler.export_excel_transactions(
+                    file_path, by_month=by_month, start_date=start_date, end_date=end_date,
+                    months_per_file=int(months_per_file) if months_per_file else None)
                 if success:
                     print(f"\n✓ {message}")
                 else:
@@ -342,11 +520,53 @@ def transactions_menu(current_user: Dict[str, Any]) -> None:
             utilities.pause()
             
         elif choice == "7":
+            # Import from CSV
+            print("\n--- Import Transactions from CSV ---")
+            import data_store
+            
+            file_path = input("Enter the path to your CSV file: ").strip()
+            if not file_path:
+                print("No file path provided.")
+                utilities.pause()
+                continue
+            duplicates = input(f"Rows matching existing transactions "
+                               f"({'/'.join(manager.DUPLICATE_POLICIES)}, "
+                               f"or press Enter for {config.DUPLICATE_POLICY}): ").strip().lower() or None
+            
+            try:
+                print("\nValidating file...")
+                success, message, count = data_store.import_from_csv(current_user['id'], file_path, duplicates)
+                if success:
+                    print(f"\n✓ {message}")
+                else:
+                    print(f"\n✗ Import failed: {message}")
+            except Exception as e:
+                print(f"\nError: {e}")
+            utilities.pause()
+            
+        elif choice == "8":
+            # Export to CSV
+            print("\n--- Export Transactions to CSV ---")
+            import data_store
+            
+            file_path = input("Enter file path (or press Enter for default): ").strip()
+            if not file_path:
+                file_path = f"transactions_export_{current_user['id'][:8]}.csv"
+            start_date = input("Start date (YYYY-MM-DD, or press Enter for all): ").strip() or None
+            end_date = input("End date (YYYY-MM-DD, or press Enter for all): ").strip() or None
+            
+            if data_store.export_to_csv(current_user['id'], file_path, start_date, end_date):
+                print(f"\n✓ Transactions exported successfully to {file_path}")
+            else:
+                print("\n✗ Export failed")
+            utilities.pause()
+            
+        elif choice == "9":
             print("\nReturning to Main Menu...")
             break
             
         else:
-            print("\nInvalid choice! Please enter a number between 1 and 7.")
+            print("\nInvalid choice! Please enter a number between 1 and 9.")
             utilities.pause()
 
 class Transaction:
@@ -381,27 +601,35 @@ class Transaction:
             return date
         raise ValueError("Invalid date format. Use YYYY-MM-DD")
         
-    def add_transaction(self) -> Optional[Dict[str, Any]]:
-        """Add this transaction to storage (JSON)"""
+    def add_transaction(self, duplicates: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Add this transaction to storage (JSON)
+        
+        Args:
+            duplicates: One of TransactionManager.DUPLICATE_POLICIES
+                (default config.DUPLICATE_POLICY)
+        """
         try:
-            transactions = self._json_handler.load_transactions()
-
-            transaction = {
-                "transaction_id": self.transaction_id,
-                "user_id": self.user_id,
-                "type": self.type,
-                "amount": float(self.amount),
-                "category": self.category,
-                "date": self.date,  
-                "description": self.description,
-                "payment_method": self.payment_method
-            }
+            amount_cents = self._utilities.to_cents(self.amount)
+            if amount_cents <= 0:
+                raise ValueError("Invalid amount")
+            transaction = TransactionRecord(
+                transaction_id=self.transaction_id,
+                user_id=self.user_id,
+                type=self.type,
+                amount_cents=amount_cents,
+                category=self.category,
+                date=self.date,
+                description=self.description,
+                payment_method=self.payment_method
+            )
             
-            if self.user_id not in transactions:
-                transactions[self.user_id] = []
-            transactions[self.user_id].append(transaction)
+            kept, _ = TransactionManager.check_duplicates([transaction], duplicates)
+            if not kept:
+                print("Skipped: a transaction with the same date, amount, category, "
+                      "description and payment method already exists")
+                return None
             
-            if self._json_handler.save_transactions(transactions):
+            if self._json_handler.append_transaction(transaction):
                 return transaction
             raise RuntimeError("Failed to save transaction")
 
@@ -418,13 +646,13 @@ class Transaction:
         
         Args:
             user_id: The user's ID
-            
+        
         Returns:
-            List of transaction dictionaries
+            List of transactions as TransactionRecord objects, which can be
+            used exactly like transaction dictionaries
         """
         try:
-            transactions = cls._json_handler.load_transactions()
-            return transactions.get(user_id, [])
+            return cls._json_handler.load_user_transactions(user_id)
         except Exception as e:
             print(f"Error viewing transactions: {e}")
             return []
@@ -440,12 +668,7 @@ class Transaction:
             Transaction dictionary or None if not found
         """
         try:
-            transactions = cls._json_handler.load_transactions()
-            for user_transactions in transactions.values():
-                for transaction in user_transactions:
-                    if transaction['transaction_id'] == transaction_id:
-                        return transaction
-            return None
+            return cls._json_handler.find_transaction(transaction_id)
         except Exception as e:
             print(f"Error getting transaction: {e}")
             return None
@@ -462,61 +685,63 @@ class Transaction:
             Dict with success status and message/data
         """
         try:
-            transactions = cls._json_handler.load_transactions()
-            
-            # Allowed fields to edit
-            allowed_fields = {'type', 'amount', 'category', 'date', 'description', 'payment_method'}
-            
-            for user_id, user_transactions in transactions.items():
-                for i, transaction in enumerate(user_transactions):
-                    if transaction['transaction_id'] == transaction_id:
-                        # Validate and update fields
-                        updated_fields = {}
-                        for key, value in new_values.items():
-                            if key in allowed_fields:
-                                # Validate date if updating
-                                if key == 'date':
-                                    if cls._utilities.validate_date(value):
-                                        if cls._utilities.is_future_date(value):
-                                            return {
-                                                "success": False,
-                                                "message": "Date cannot be in the future"
-                                            }
-                                        transaction[key] = value
-                                        updated_fields[key] = value
-                                    else:
-                                        return {
-                                            "success": False,
-                                            "message": f"Invalid date format for {key}"
-                                        }
-                                elif key == 'amount':
-                                    transaction[key] = float(value)
-                                    updated_fields[key] = float(value)
-                                else:
-                                    transaction[key] = value
-                                    updated_fields[key] = value
-                        
-                        if not updated_fields:
+            transaction = cls._json_handler.find_transaction(transaction_id)
+            if transaction is None:
+                return {
+                    "success": False,
+                    "message": "Transaction not found"
+                }
+            user_id = transaction['user_id']
+            
+            # Allowed fields to edit; 'amount' is in currency units and stored as cents
+            allowed_fields = {'type', 'amount', 'amount_cents', 'category', 'date', 'description', 'payment_method'}
+            
+            # Validate and update fields
+            updated_fields = {}
+            for key, value in new_values.items():
+                if key in allowed_fields:
+                    # Validate date if updating
+                    if key == 'date':
+                        if cls._utilities.validate_date(value):
+                            if cls._utilities.is_future_date(value):
+                                return {
+                                    "success": False,
+                                    "message": "Date cannot be in the future"
+                                }
+                            updated_fields[key] = value
+                        else:
                             return {
                                 "success": False,
-                                "message": "No valid fields to update"
+                                "message": f"Invalid date format for {key}"
                             }
-                        
-                        transactions[user_id][i] = transaction
-                        if cls._json_handler.save_transactions(transactions):
+                    elif key in ('amount', 'amount_cents'):
+                        amount_cents = cls._utilities.to_cents(value) if key == 'amount' else int(value)
+                        if amount_cents <= 0:
                             return {
-                                "success": True,
-                                "message": "Transaction updated successfully",
-                                "data": transaction
+                                "success": False,
+                                "message": "Invalid amount"
                             }
-                        return {
-                            "success": False,
-                            "message": "Failed to save transaction"
-                        }
-            
+                        updated_fields['amount_cents'] = amount_cents
+                    else:
+                        updated_fields[key] = value
+            
+            if not updated_fields:
+                return {
+                    "success": False,
+                    "message": "No valid fields to update"
+                }
+            
+            # Loaded data is shared with the storage cache, so it is only
+            # changed through update_transaction once validation passed
+            if cls._json_handler.update_transaction(user_id, transaction_id, updated_fields):
+                return {
+                    "success": True,
+                    "message": "Transaction updated successfully",
+                    "data": {**transaction, **updated_fields}
+                }
             return {
                 "success": False,
-                "message": "Transaction not found"
+                "message": "Failed to save transaction"
             }
             
         except ValueError as e:
@@ -542,26 +767,22 @@ class Transaction:
             Dict with success status and message
         """
         try:
-            transactions = cls._json_handler.load_transactions()
-            
-            for user_id, user_transactions in transactions.items():
-                for transaction in user_transactions:
-                    if transaction['transaction_id'] == transaction_id:
-                        transactions[user_id].remove(transaction)
-                        if cls._json_handler.save_transactions(transactions):
-                            return {
-                                "success": True,
-                                "message": "Transaction deleted successfully",
-                                "data": {"transaction_id": transaction_id}
-                            }
-                        return {
-                            "success": False,
-                            "message": "Failed to save changes"
-                        }
-            
+            transaction = cls._json_handler.find_transaction(transaction_id)
+            if transaction is None:
+                return {
+                    "success": False,
+                    "message": "Transaction not found"
+                }
+            
+            if cls._json_handler.remove_transaction(transaction['user_id'], transaction_id):
+                return {
+                    "success": True,
+                    "message": "Transaction deleted successfully",
+                    "data": {"transaction_id": transaction_id}
+                }
             return {
                 "success": False,
-                "message": "Transaction not found"
+                "message": "Failed to save changes"
             }
             
         except Exception as e:
@@ -591,7 +812,7 @@ class Transaction:
         print(f"\n--- Your Transactions ({len(transactions)}) ---")
         for idx, t in enumerate(transactions, 1):
             print(f"\n[{idx}] {t['date']} - {t['type'].upper()}")
-            print(f"    Amount: {t['amount']} | Category: {t['category']}")
+            print(f"    Amount: {cls._utilities.format_amount(t['amount_cents'])} | Category: {t['category']}")
             print(f"    Description: {t['description']}")
             print(f"    Payment Method: {t['payment_method']}")
             print("-" * 40)
@@ -609,7 +830,8 @@ class Transaction:
                 print("Invalid selection.")
                 return None
                 
-            return transactions[choice - 1]
+            # Return a copy; the edit menu changes it before anything is saved
+            return dict(transactions[choice - 1])
         except Exception as e:
             print(f"Error selecting transaction: {e}")
             return None
\ No newline at end of file
@@ -228,15 +228,15 @@ class User:
             from transactions import Transaction
             transactions = Transaction.view_transactions(user_id)
             
-            # Calculate financial summary
-            total_income = 0.0
-            total_expenses = 0.0
+            # Calculate financial summary in integer cents
+            total_income = 0
+            total_expenses = 0
             
             for transaction in transactions:
                 if transaction['type'] == 'income':
-                    total_income += transaction['amount']
+                    total_income += transaction['amount_cents']
                 elif transaction['type'] == 'expense':
-                    total_expenses += transaction['amount']
+                    total_expenses += transaction['amount_cents']
             
             net_savings = total_income - total_expenses
             
@@ -267,7 +267,7 @@ class User:
     
     @classmethod
     def get_financial_summary(cls, user_id: str) -> Dict[str, Any]:
-        """Get financial summary data for a user"""
+        """Get financial summary data for a user (amounts in integer cents)"""
         try:
             # Get user information
             users = cls._json_handler.load_users()
@@ -284,18 +284,18 @@ class User:
             from transactions import Transaction
             transactions = Transaction.view_transactions(user_id)
             
-            # Calculate financial summary
-            total_income = 0.0
-            total_expenses = 0.0
+            # Calculate financial summary in integer cents
+            total_income = 0
+            total_expenses = 0
             income_transactions = 0
             expense_transactions = 0
             
             for transaction in transactions:
                 if transaction['type'] == 'income':
-                    total_income += transaction['amount']
+                    total_income += transaction['amount_cents']
                     income_transactions += 1
                 elif transaction['type'] == 'expense':
-                    total_expenses += transaction['amount']
+                    total_expenses += transaction['amount_cents']
                     expense_transactions += 1
             
             net_savings = total_income - total_expenses
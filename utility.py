@@ -2,7 +2,8 @@ import datetime
 import hashlib
 import os
 import uuid
-from typing import Optional
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Dict, Optional
 from datetime import datetime
 
 
@@ -37,10 +38,9 @@ class Utilities:
     
     @staticmethod
     def validate_amount(amount: str) -> bool:
-        """Validate if the amount is a valid number"""
+        """Validate that the amount is a number worth at least one cent once rounded (see to_cents)"""
         try:
-            float_amount = float(amount)
-            return float_amount > 0
+            return Utilities.to_cents(amount) > 0
         except ValueError:
             return False
 
@@ -50,15 +50,57 @@ class Utilities:
         input("\nPress Enter to continue...")
 
     @staticmethod
-    def format_currency(amount: float, currency: str = 'USD') -> str:
-        """Format amount as currency string"""
-        return f"{currency} {amount:.2f}"
+    def to_cents(amount: Any) -> int:
+        """Convert an entered amount (such as "12.34" or 12.34) to integer cents
+        
+        Goes through Decimal so 0.1 + 0.2 style float error never reaches
+        the stored value; half a cent rounds away from zero.
+        """
+        try:
+            cents = Decimal(str(amount).strip()) * 100
+            return int(cents.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"Invalid amount: {amount!r}")
+    
+    @staticmethod
+    def format_amount(amount_cents: int, signed: bool = False) -> str:
+        """Format integer cents as a decimal string such as "1234.50"
+        
+        With signed, positive amounts get a leading "+" as well.
+        """
+        amount_cents = int(amount_cents)
+        sign = "-" if amount_cents < 0 else ("+" if signed else "")
+        units, cents = divmod(abs(amount_cents), 100)
+        return f"{sign}{units}.{cents:02d}"
+    
+    @staticmethod
+    def format_currency(amount_cents: int, currency: str = 'USD') -> str:
+        """Format an amount held in integer cents as currency string"""
+        return f"{currency} {Utilities.format_amount(amount_cents)}"
 
     @staticmethod
     def get_current_date() -> str:
         """Get current date in YYYY-MM-DD format"""
         return datetime.now().strftime('%Y-%m-%d')
 
+    @staticmethod
+    def transaction_fingerprint(transaction: Dict[str, Any]) -> bytes:
+        """Digest of the fields that identify the same real-world transaction
+        
+        Built from date, amount, type, category, description (case and
+        whitespace folded) and payment method; the ID is not included.
+        """
+        description = " ".join(str(transaction.get("description") or "").lower().split())
+        key = "\x1f".join([
+            str(transaction.get("date") or ""),
+            str(int(transaction.get("amount_cents") or 0)),
+            str(transaction.get("type") or "").lower(),
+            str(transaction.get("category") or "").lower(),
+            description,
+            str(transaction.get("payment_method") or "").lower()
+        ])
+        return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
     @staticmethod
     def is_future_date(date_string: str) -> bool:
         """Check if the given date is in the future"""